@@ -80,6 +80,13 @@ def load_settings(config_path: Path) -> dict[str, Any]:
     table = config.get("MySQL SPECIFIC SETTINGS", "SQL_Table").strip()
     if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
         raise ValueError("SQL_Table must be a valid MySQL identifier")
+    alarm_event_table = config.get(
+        "MySQL SPECIFIC SETTINGS",
+        "SQL_Alarm_Event_Table",
+        fallback="",
+    ).strip()
+    if alarm_event_table and not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", alarm_event_table):
+        raise ValueError("SQL_Alarm_Event_Table must be a valid MySQL identifier")
 
     cadence = config.getint("GENERAL SETTINGS", "Cadance")
     if cadence <= 0:
@@ -91,6 +98,7 @@ def load_settings(config_path: Path) -> dict[str, Any]:
         "password": config.get("MySQL SPECIFIC SETTINGS", "SQL_Password"),
         "database": config.get("MySQL SPECIFIC SETTINGS", "SQL_Database").strip(),
         "table": table,
+        "alarm_event_table": alarm_event_table,
         "auth_plugin": config.get(
             "MySQL SPECIFIC SETTINGS",
             "SQL_Auth",
@@ -141,20 +149,74 @@ def fetch_latest(settings: dict[str, Any], generator: str) -> dict[str, Any] | N
                 `transfer_status`,
                 `fuel_level_pct`,
                 `active_alarm_count`,
-                `active_alarms`
+                `active_alarm_mask`
             FROM `{settings['table']}`
             WHERE `generator` = %s
             ORDER BY `ts` DESC
             LIMIT 1
         """
         cursor.execute(query, (generator,))
-        return cursor.fetchone()
+        row = cursor.fetchone()
+        if row is not None and settings["alarm_event_table"]:
+            indexes = alarm_mask_indexes(row.get("active_alarm_mask"))
+            if indexes:
+                row["active_alarms"] = fetch_alarm_names(
+                    cursor, settings["alarm_event_table"], generator, indexes
+                )
+        return row
     finally:
         if cursor is not None:
             cursor.close()
         connection.close()
 
 
+def alarm_mask_indexes(raw_mask: Any) -> list[int]:
+    """Return the one-based alarm indexes set in a hexadecimal alarm mask."""
+    try:
+        mask = int(str(raw_mask), 16)
+    except (TypeError, ValueError):
+        return []
+    return [bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+def fetch_alarm_names(
+    cursor: Any,
+    table: str,
+    generator: str,
+    indexes: list[int],
+) -> list[dict[str, Any]]:
+    """Describe active alarms from their latest transition events."""
+    placeholders = ", ".join(["%s"] * len(indexes))
+    query = f"""
+        SELECT
+            `event`.`alarm_index`,
+            `event`.`alarm_name`,
+            `event`.`alarm_condition`
+        FROM `{table}` AS `event`
+        JOIN (
+            SELECT `alarm_index`, MAX(`ts`) AS `ts`
+            FROM `{table}`
+            WHERE `generator` = %s AND `alarm_index` IN ({placeholders})
+            GROUP BY `alarm_index`
+        ) AS `latest`
+            ON `latest`.`alarm_index` = `event`.`alarm_index`
+            AND `latest`.`ts` = `event`.`ts`
+        WHERE `event`.`generator` = %s
+    """
+    cursor.execute(query, (generator, *indexes, generator))
+    events = {event["alarm_index"]: event for event in cursor.fetchall()}
+    alarms = []
+    for index in indexes:
+        event = events.get(index)
+        if event is None:
+            alarms.append({"name": f"Alarm {index}"})
+        else:
+            alarms.append(
+                {"name": event["alarm_name"], "condition": event["alarm_condition"]}
+            )
+    return alarms
+
+
 def check_control_mode(row: dict[str, Any]) -> Result:
     mode = clean_output(row.get("control_mode") or "Unknown")
     auto_start = parse_boolean(row.get("auto_start_enabled"))
@@ -394,7 +456,10 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--max-age",
         type=positive_integer,
-        help="maximum database row age in seconds (default: twice the configured Cadance)",
+        help=(
+            "maximum database row age in seconds (default: twice the configured "
+            "Cadance; with change detection, pass at least twice the Heartbeat)"
+        ),
     )
     return parser.parse_args()
 
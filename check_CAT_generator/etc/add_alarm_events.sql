@@ -0,0 +1,24 @@
+-- Migrate an existing installation to alarm transition events.
+--
+-- Generator rows now carry the active alarms as a hexadecimal bitmask
+-- (bit 0 is alarm 1) instead of a JSON list, and the raise, clear and change
+-- of every alarm is written to hcro_d300gc_alarm_events.  The old
+-- active_alarms column is no longer written; drop it once it is not needed:
+--
+--   ALTER TABLE `hcro_d300gc_generator` DROP COLUMN `active_alarms`;
+
+ALTER TABLE `hcro_d300gc_generator`
+  ADD COLUMN `active_alarm_mask` varchar(64) DEFAULT NULL AFTER `active_alarm_count`;
+
+CREATE TABLE IF NOT EXISTS `hcro_d300gc_alarm_events` (
+  `ts` datetime(3) NOT NULL,
+  `generator` varchar(16) NOT NULL,
+  `alarm_index` smallint unsigned NOT NULL,
+  `event` varchar(8) NOT NULL,
+  `condition_code` tinyint unsigned NOT NULL,
+  `previous_code` tinyint unsigned DEFAULT NULL,
+  `alarm_name` varchar(64) DEFAULT NULL,
+  `alarm_condition` varchar(32) DEFAULT NULL,
+  PRIMARY KEY (`generator`,`ts`,`alarm_index`),
+  KEY `idx_generator_alarm_ts` (`generator`,`alarm_index`,`ts`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,28 @@
+-- Add the table for burst capture samples.
+--
+-- After a transfer or an engine start the monitor samples the
+-- instrumentation of pages 4 and 6 every Burst_Interval seconds for
+-- Burst_Window seconds and writes the samples here in one batch.  The columns
+-- are those of hcro_d300gc_generator with the same names and types.
+
+CREATE TABLE IF NOT EXISTS `hcro_d300gc_burst_samples` (
+  `ts` datetime(3) NOT NULL,
+  `generator` varchar(16) NOT NULL,
+  `oil_pressure_kpa` smallint unsigned DEFAULT NULL,
+  `coolant_temperature_c` smallint DEFAULT NULL,
+  `oil_temperature_c` smallint DEFAULT NULL,
+  `fuel_level_pct` smallint unsigned DEFAULT NULL,
+  `charge_alternator_voltage_v` decimal(4,1) DEFAULT NULL,
+  `battery_voltage_v` decimal(4,1) DEFAULT NULL,
+  `engine_speed_rpm` smallint unsigned DEFAULT NULL,
+  `generator_frequency_hz` decimal(4,1) DEFAULT NULL,
+  `generator_l1_n_voltage_v` decimal(8,1) DEFAULT NULL,
+  `generator_l2_n_voltage_v` decimal(8,1) DEFAULT NULL,
+  `generator_l3_n_voltage_v` decimal(8,1) DEFAULT NULL,
+  `generator_l1_current_a` decimal(7,1) DEFAULT NULL,
+  `generator_l2_current_a` decimal(7,1) DEFAULT NULL,
+  `generator_l3_current_a` decimal(7,1) DEFAULT NULL,
+  `generator_total_power_w` int DEFAULT NULL,
+  `generator_power_factor` decimal(4,2) DEFAULT NULL,
+  PRIMARY KEY (`generator`,`ts`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
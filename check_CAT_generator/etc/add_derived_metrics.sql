@@ -0,0 +1,14 @@
+-- Add the derived metric columns to the generator table.
+--
+-- With [DERIVED METRICS] Enabled, the monitor computes these values once per
+-- readout (see lib/derived_metrics.py) instead of dashboards deriving them
+-- with window queries.  Rows written before the migration keep NULL.
+
+ALTER TABLE `hcro_d300gc_generator`
+  ADD COLUMN `generator_l1_kva` decimal(8,2) DEFAULT NULL AFTER `active_alarm_mask`,
+  ADD COLUMN `generator_l2_kva` decimal(8,2) DEFAULT NULL AFTER `generator_l1_kva`,
+  ADD COLUMN `generator_l3_kva` decimal(8,2) DEFAULT NULL AFTER `generator_l2_kva`,
+  ADD COLUMN `generator_current_imbalance_pct` decimal(5,1) DEFAULT NULL AFTER `generator_l3_kva`,
+  ADD COLUMN `generator_load_pct` decimal(5,1) DEFAULT NULL AFTER `generator_current_imbalance_pct`,
+  ADD COLUMN `fuel_burn_rate_pct_h` decimal(6,2) DEFAULT NULL AFTER `generator_load_pct`,
+  ADD COLUMN `generator_interval_kwh` decimal(9,3) DEFAULT NULL AFTER `fuel_burn_rate_pct_h`;
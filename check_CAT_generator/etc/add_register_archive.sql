@@ -0,0 +1,13 @@
+-- Add the table for the register archive.
+--
+-- With SQL_Register_Archive_Table set, the monitor writes the raw GenComm
+-- responses of every readout here, one blob per generator and cycle (see
+-- lib/register_archive.py for the format and the decoder).  An uncompressed
+-- full readout is well under 1 kB.
+
+CREATE TABLE IF NOT EXISTS `hcro_d300gc_register_archive` (
+  `ts` datetime(3) NOT NULL,
+  `generator` varchar(16) NOT NULL,
+  `registers` varbinary(4096) NOT NULL,
+  PRIMARY KEY (`generator`,`ts`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -54,11 +54,84 @@ CREATE TABLE `hcro_d300gc_generator` (
   `number_of_starts` int unsigned DEFAULT NULL,
   `generator_positive_kwh` decimal(11,1) DEFAULT NULL,
   `active_alarm_count` smallint unsigned DEFAULT NULL,
-  `active_alarms` json DEFAULT NULL,
+  `active_alarm_mask` varchar(64) DEFAULT NULL,
+  `generator_l1_kva` decimal(8,2) DEFAULT NULL,
+  `generator_l2_kva` decimal(8,2) DEFAULT NULL,
+  `generator_l3_kva` decimal(8,2) DEFAULT NULL,
+  `generator_current_imbalance_pct` decimal(5,1) DEFAULT NULL,
+  `generator_load_pct` decimal(5,1) DEFAULT NULL,
+  `fuel_burn_rate_pct_h` decimal(6,2) DEFAULT NULL,
+  `generator_interval_kwh` decimal(9,3) DEFAULT NULL,
   PRIMARY KEY (`ts`,`generator`),
   KEY `idx_generator_ts` (`generator`,`ts`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `hcro_d300gc_alarm_events`
+--
+
+DROP TABLE IF EXISTS `hcro_d300gc_alarm_events`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `hcro_d300gc_alarm_events` (
+  `ts` datetime(3) NOT NULL,
+  `generator` varchar(16) NOT NULL,
+  `alarm_index` smallint unsigned NOT NULL,
+  `event` varchar(8) NOT NULL,
+  `condition_code` tinyint unsigned NOT NULL,
+  `previous_code` tinyint unsigned DEFAULT NULL,
+  `alarm_name` varchar(64) DEFAULT NULL,
+  `alarm_condition` varchar(32) DEFAULT NULL,
+  PRIMARY KEY (`generator`,`ts`,`alarm_index`),
+  KEY `idx_generator_alarm_ts` (`generator`,`alarm_index`,`ts`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `hcro_d300gc_burst_samples`
+--
+
+DROP TABLE IF EXISTS `hcro_d300gc_burst_samples`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `hcro_d300gc_burst_samples` (
+  `ts` datetime(3) NOT NULL,
+  `generator` varchar(16) NOT NULL,
+  `oil_pressure_kpa` smallint unsigned DEFAULT NULL,
+  `coolant_temperature_c` smallint DEFAULT NULL,
+  `oil_temperature_c` smallint DEFAULT NULL,
+  `fuel_level_pct` smallint unsigned DEFAULT NULL,
+  `charge_alternator_voltage_v` decimal(4,1) DEFAULT NULL,
+  `battery_voltage_v` decimal(4,1) DEFAULT NULL,
+  `engine_speed_rpm` smallint unsigned DEFAULT NULL,
+  `generator_frequency_hz` decimal(4,1) DEFAULT NULL,
+  `generator_l1_n_voltage_v` decimal(8,1) DEFAULT NULL,
+  `generator_l2_n_voltage_v` decimal(8,1) DEFAULT NULL,
+  `generator_l3_n_voltage_v` decimal(8,1) DEFAULT NULL,
+  `generator_l1_current_a` decimal(7,1) DEFAULT NULL,
+  `generator_l2_current_a` decimal(7,1) DEFAULT NULL,
+  `generator_l3_current_a` decimal(7,1) DEFAULT NULL,
+  `generator_total_power_w` int DEFAULT NULL,
+  `generator_power_factor` decimal(4,2) DEFAULT NULL,
+  PRIMARY KEY (`generator`,`ts`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `hcro_d300gc_register_archive`
+--
+
+DROP TABLE IF EXISTS `hcro_d300gc_register_archive`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `hcro_d300gc_register_archive` (
+  `ts` datetime(3) NOT NULL,
+  `generator` varchar(16) NOT NULL,
+  `registers` varbinary(4096) NOT NULL,
+  PRIMARY KEY (`generator`,`ts`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
 /*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
 
 /*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
@@ -0,0 +1,108 @@
+"""Cache of the alarm page and implemented alarm count per controller.
+
+Reading active alarms needs the GenComm alarm page (154 on D300GC
+installations, 8 on older controllers) and the number of alarms the unit
+implements.  Probing for them costs one or two extra transactions per readout,
+or a full timeout when a controller does not answer for a missing page.  Both
+values are fixed by the controller firmware, so ``AlarmLayoutCache`` keeps
+them in memory and, optionally, in a JSON file shared by all controllers.
+
+An entry is only used while the configured ``alarm_page`` setting matches the
+one it was resolved with.  ``D300GC`` forgets an entry when reading the cached
+page fails with Modbus exception 2 (illegal data address), for example after a
+controller replacement, and probes again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+# Caches for different ports may run in different threads and share one file.
+_STATE_FILE_LOCK = threading.Lock()
+
+
+class AlarmLayoutCache:
+    """Remember ``(alarm page, alarm count)`` per controller key.
+
+    Args:
+        state_file: optional JSON file that keeps the entries across restarts.
+    """
+
+    def __init__(self, state_file: str | os.PathLike[str] | None = None) -> None:
+        self._state_file = Path(state_file) if state_file else None
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = self._read_state_file()
+
+    @staticmethod
+    def controller_key(port: str, slave_id: int) -> str:
+        return f"{port}#{slave_id}"
+
+    def get(self, key: str, alarm_page_setting: int | None) -> tuple[int, int] | None:
+        """Return the cached layout, or ``None`` if unknown or resolved differently."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if not isinstance(entry, dict):
+            return None
+        try:
+            if entry.get("alarm_page_setting") != alarm_page_setting:
+                return None
+            return int(entry["page"]), int(entry["count"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(
+        self,
+        key: str,
+        alarm_page_setting: int | None,
+        page: int,
+        count: int,
+    ) -> None:
+        entry = {"alarm_page_setting": alarm_page_setting, "page": page, "count": count}
+        with self._lock:
+            if self._entries.get(key) == entry:
+                return
+            self._entries[key] = entry
+        self._save(key, entry)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+        self._save(key, None)
+
+    def _read_state_file(self) -> dict[str, Any]:
+        if self._state_file is None:
+            return {}
+        try:
+            with self._state_file.open("r", encoding="utf-8") as state:
+                data = json.load(state)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            # A damaged cache only costs one probe per controller.
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self, key: str, entry: dict[str, Any] | None) -> None:
+        if self._state_file is None:
+            return
+        with _STATE_FILE_LOCK:
+            # Merge with the file so that other processes' entries survive.
+            data = self._read_state_file()
+            if entry is None:
+                data.pop(key, None)
+            else:
+                data[key] = entry
+            temporary = self._state_file.with_name(self._state_file.name + ".tmp")
+            try:
+                self._state_file.parent.mkdir(parents=True, exist_ok=True)
+                with temporary.open("w", encoding="utf-8") as state:
+                    json.dump(data, state, indent=2, sort_keys=True)
+                os.replace(temporary, self._state_file)
+            except OSError:
+                # Persistence is an optimisation; keep the cache in memory.
+                pass
@@ -0,0 +1,104 @@
+"""Alarm transition events derived from successive alarm code readouts.
+
+Each readout returns the 4-bit condition code of every alarm as one
+hexadecimal digit in ``alarm_codes``.  Storing the full list of active alarms
+with every row repeats the same alarms cycle after cycle; instead the rows
+carry a compact ``active_alarm_mask`` and ``AlarmTransitionTracker`` compares
+each readout with the previous codes of the same generator:
+
+* ``raised``: an alarm became active (warning, shutdown, trip or indication),
+* ``cleared``: an active alarm became inactive,
+* ``changed``: an active alarm moved to another active condition, for example
+  from warning to shutdown.
+
+The first readout of a generator, and the first after its alarm page changed,
+raises every alarm that is active at that point.
+"""
+
+from __future__ import annotations
+
+import datetime
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from generator_com import D300GCBase
+
+
+@dataclass(frozen=True)
+class AlarmEvent:
+    """One alarm transition of one generator."""
+
+    ts: datetime.datetime
+    generator: str
+    alarm_index: int
+    event: str
+    condition_code: int
+    previous_code: int | None
+    alarm_name: str
+    condition: str
+
+    def as_dict(self) -> dict[str, Any]:
+        event = asdict(self)
+        event["ts"] = self.ts.isoformat(timespec="milliseconds")
+        return event
+
+
+class AlarmTransitionTracker:
+    """Keep the last alarm codes per generator and report their transitions."""
+
+    def __init__(self) -> None:
+        # Alarm page and alarm code string of the last readout per generator.
+        self._previous: dict[str, tuple[int | None, str]] = {}
+        self.events_emitted = 0
+
+    def update(
+        self,
+        generator: str,
+        alarm_page: int | None,
+        alarm_codes: str,
+        ts: datetime.datetime | None = None,
+    ) -> list[AlarmEvent]:
+        """Record a readout and return the alarm transitions since the last one."""
+        ts = ts or datetime.datetime.now()
+        previous = self._previous.get(generator)
+        self._previous[generator] = (alarm_page, alarm_codes)
+        if previous is None or previous[0] != alarm_page:
+            # Alarm indexes of another page do not describe the same alarms.
+            previous_codes = ""
+        else:
+            previous_codes = previous[1]
+
+        active = D300GCBase.ACTIVE_ALARM_DIGITS
+        events = []
+        for alarm_index, digit in enumerate(alarm_codes, start=1):
+            previous_digit = (
+                previous_codes[alarm_index - 1] if alarm_index <= len(previous_codes) else None
+            )
+            if digit == previous_digit:
+                continue
+            if digit in active:
+                event = "changed" if previous_digit in active else "raised"
+            elif previous_digit in active:
+                event = "cleared"
+            else:
+                # Moves between inactive conditions are not alarm transitions.
+                continue
+            condition_code = int(digit, 16)
+            events.append(
+                AlarmEvent(
+                    ts=ts,
+                    generator=generator,
+                    alarm_index=alarm_index,
+                    event=event,
+                    condition_code=condition_code,
+                    previous_code=None if previous_digit is None else int(previous_digit, 16),
+                    alarm_name=D300GCBase.alarm_name(alarm_page, alarm_index),
+                    condition=D300GCBase.ALARM_CONDITION_NAMES[condition_code],
+                )
+            )
+        self.events_emitted += len(events)
+        return events
+
+    def forget(self, generator: str) -> None:
+        """Drop the state of *generator*; its next readout raises all active alarms."""
+        self._previous.pop(generator, None)
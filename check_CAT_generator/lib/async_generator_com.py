@@ -0,0 +1,851 @@
+"""asyncio client for the D300GC generator controller.
+
+``AsyncD300GC`` offers the read methods of ``generator_com.D300GC`` as
+coroutines, so one event loop can poll generators on several Moxa ports
+concurrently:
+
+    generators = [AsyncD300GC("socket://moxa-a:4001"), AsyncD300GC("socket://moxa-b:4001")]
+    for generator in generators:
+        await generator.open()
+    rows = await asyncio.gather(*(g.read_generator_data() for g in generators))
+
+Controllers are reached through asyncio streams, so ports must be TCP URLs:
+``socket://host:port`` for Modbus RTU through an NPort, or
+``modbus-tcp://host[:port]`` for a Modbus TCP gateway.  Local serial devices
+need the blocking ``D300GC``.
+
+Every controller on the same port shares one ``AsyncModbusBus``.  The bus owns
+the TCP connection and serialises RTU transactions, including the quiet period
+between them, because all controllers behind one NPort share one RS-485 line.
+While a bus waits out its quiet period, the event loop serves other ports.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Collection, Iterable, TypeVar
+from urllib.parse import urlsplit
+
+from alarm_cache import AlarmLayoutCache
+from gencomm_map import GENERATOR_FIELDS, GenCommField, ReadBlock, field_read_block, value_decoder
+from gencomm_snapshot import PAGE_BYTES, ControllerSnapshot, MissingRange, PageSnapshot
+from generator_com import D300GC, D300GCBase, _register_struct
+from modbus_rtu import (
+    GeneratorCommunicationError,
+    GeneratorProtocolError,
+    GeneratorTimeoutError,
+    ModbusExceptionResponse,
+    RtuFrameCodec,
+)
+from modbus_statistics import TransactionStatistics
+from modbus_transport import (
+    MBAP_READ_REQUEST,
+    MODBUS_TCP_DEFAULT_PORT,
+    MODBUS_TCP_SCHEME,
+    check_mbap_header,
+    configure_tcp_socket,
+    mbap_response_data,
+)
+from quiet_period import QuietPeriodTuner
+from retry_policy import RetryPolicy
+
+_T = TypeVar("_T")
+
+
+class AsyncModbusBus(ABC):
+    """One TCP connection shared by every controller behind a Moxa port.
+
+    Subclasses pass the ``TransactionStatistics`` sized for their framing.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        host: str,
+        port: int,
+        timeout: float,
+        tcp_keepalive: float,
+        transactions: TransactionStatistics,
+    ) -> None:
+        self.url = url
+        self.host = host
+        self.port = port
+        self.timeout = float(timeout)
+        self._tcp_keepalive = max(0.0, float(tcp_keepalive))
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        # Number of AsyncD300GC instances that have opened this bus.
+        self.users = 0
+        self.transactions = transactions
+
+    @property
+    def request_delay(self) -> float:
+        return 0.0
+
+    def is_open(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def open(self) -> None:
+        if self.is_open():
+            return
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as error:
+            raise GeneratorCommunicationError(
+                f"Could not connect to {self.url}: {error or 'timed out'}"
+            ) from error
+        configure_tcp_socket(self._writer.get_extra_info("socket"), self._tcp_keepalive)
+
+    async def close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    @abstractmethod
+    async def transact(
+        self,
+        slave_id: int,
+        function: int,
+        address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        """Perform one register-read transaction and decode its data bytes."""
+
+    def statistics(self) -> dict[str, Any]:
+        return {"transport": type(self).__name__, "bus_users": self.users}
+
+    def transaction_statistics(self) -> dict[str, Any]:
+        """Return the per-page transaction counters and latency histograms."""
+        return self.transactions.snapshot()
+
+
+class AsyncRtuBus(AsyncModbusBus):
+    """Modbus RTU frames through an NPort in TCP Server mode."""
+
+    def __init__(
+        self,
+        url: str,
+        host: str,
+        port: int,
+        timeout: float = 1.0,
+        tcp_keepalive: float = 30.0,
+        request_delay: float = 0.1,
+        quiet_period: QuietPeriodTuner | None = None,
+    ) -> None:
+        super().__init__(
+            url,
+            host,
+            port,
+            timeout,
+            tcp_keepalive,
+            TransactionStatistics(request_size=8, response_overhead=5),
+        )
+        self._request_delay = max(0.0, float(request_delay))
+        self._quiet_period = quiet_period
+        self._codec = RtuFrameCodec()
+        self._lock = asyncio.Lock()
+        self._last_transaction_finished = 0.0
+        # Set when a late response may still arrive on the connection.
+        self._stale = False
+
+    @property
+    def request_delay(self) -> float:
+        if self._quiet_period is not None:
+            return self._quiet_period.delay
+        return self._request_delay
+
+    async def transact(
+        self,
+        slave_id: int,
+        function: int,
+        address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        request = self._codec.request(slave_id, function, address, count)
+
+        async with self._lock:
+            if self._stale:
+                # Streams have no reset_input_buffer(); replace the connection
+                # rather than risk reading the previous request's response.
+                await self.close()
+                await self.open()
+                self._stale = False
+            if not self.is_open():
+                raise GeneratorCommunicationError(f"Connection to {self.url} is not open")
+
+            remaining_delay = self.request_delay - (
+                time.monotonic() - self._last_transaction_finished
+            )
+            if remaining_delay > 0:
+                await asyncio.sleep(remaining_delay)
+
+            started = time.monotonic()
+            failure: BaseException | None = None
+            try:
+                self._writer.write(request)
+                await self._writer.drain()
+                payload = await asyncio.wait_for(
+                    self._codec.read_stream_response(self._reader, slave_id, function, count),
+                    self.timeout,
+                )
+                result = decode(payload)
+            except asyncio.TimeoutError:
+                self._stale = True
+                if self._quiet_period is not None:
+                    self._quiet_period.record_timeout()
+                failure = GeneratorTimeoutError(
+                    f"No complete response within {self.timeout} seconds"
+                )
+                raise failure from None
+            except GeneratorProtocolError as error:
+                self._stale = True
+                failure = error
+                raise
+            except (ConnectionError, OSError) as error:
+                await self.close()
+                failure = GeneratorCommunicationError(str(error))
+                raise failure from error
+            except BaseException as error:
+                failure = error
+                raise
+            finally:
+                self._last_transaction_finished = time.monotonic()
+                self.transactions.record(
+                    function,
+                    address,
+                    count,
+                    self._last_transaction_finished - started,
+                    delay=max(0.0, remaining_delay),
+                    error=failure,
+                )
+
+        if self._quiet_period is not None:
+            self._quiet_period.record_success()
+        return result
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "transport": "rtu",
+            "bus_users": self.users,
+            "request_delay_s": round(self.request_delay, 4),
+            "quiet_period": (
+                None if self._quiet_period is None else self._quiet_period.snapshot()
+            ),
+        }
+
+
+class AsyncModbusTcpBus(AsyncModbusBus):
+    """Modbus TCP with up to *max_in_flight* outstanding transactions.
+
+    A background task receives responses and hands each to the coroutine
+    waiting for its transaction ID.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        host: str,
+        port: int,
+        timeout: float = 1.0,
+        tcp_keepalive: float = 30.0,
+        max_in_flight: int = 4,
+    ) -> None:
+        if not 1 <= int(max_in_flight) <= 16:
+            raise ValueError("max_in_flight must be between 1 and 16")
+        super().__init__(
+            url,
+            host,
+            port,
+            timeout,
+            tcp_keepalive,
+            TransactionStatistics(request_size=12, response_overhead=9),
+        )
+        self.max_in_flight = int(max_in_flight)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._pending: dict[int, asyncio.Future[bytes]] = {}
+        self._receiver: asyncio.Task[None] | None = None
+        self._transaction_id = 0
+        self.discarded_responses = 0
+
+    async def open(self) -> None:
+        if self.is_open():
+            return
+        await super().open()
+        self._receiver = asyncio.get_running_loop().create_task(self._receive_responses())
+
+    async def close(self) -> None:
+        receiver, self._receiver = self._receiver, None
+        if receiver is not None:
+            receiver.cancel()
+        await super().close()
+        self._fail_pending(GeneratorCommunicationError(f"Connection to {self.url} closed"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _receive_responses(self) -> None:
+        header = bytearray(7)
+        try:
+            while True:
+                header[:] = await self._reader.readexactly(7)
+                transaction_id, size = check_mbap_header(memoryview(header))
+                response = bytes(header) + await self._reader.readexactly(size - 7)
+                future = self._pending.pop(transaction_id, None)
+                if future is None or future.done():
+                    # Response to a request that already timed out.
+                    self.discarded_responses += 1
+                    continue
+                future.set_result(response)
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, OSError, GeneratorProtocolError) as error:
+            if isinstance(error, asyncio.IncompleteReadError):
+                error = GeneratorCommunicationError("Modbus TCP gateway closed the connection")
+            elif not isinstance(error, GeneratorCommunicationError):
+                error = GeneratorCommunicationError(str(error))
+            self._fail_pending(error)
+            if self._writer is not None:
+                self._writer.close()
+
+    async def transact(
+        self,
+        slave_id: int,
+        function: int,
+        address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        async with self._slots:
+            if not self.is_open():
+                raise GeneratorCommunicationError(f"Connection to {self.url} is not open")
+            self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+            transaction_id = self._transaction_id
+            future = asyncio.get_running_loop().create_future()
+            self._pending[transaction_id] = future
+            started = time.monotonic()
+            failure: BaseException | None = None
+            try:
+                self._writer.write(
+                    MBAP_READ_REQUEST.pack(
+                        transaction_id, 0, 6, slave_id, function, address, count
+                    )
+                )
+                await self._writer.drain()
+                response = await asyncio.wait_for(future, self.timeout)
+                data = mbap_response_data(memoryview(response), slave_id, function, count)
+            except asyncio.TimeoutError:
+                failure = GeneratorTimeoutError(
+                    f"No complete response within {self.timeout} seconds"
+                )
+                raise failure from None
+            except (ConnectionError, OSError) as error:
+                failure = GeneratorCommunicationError(str(error))
+                raise failure from error
+            except BaseException as error:
+                failure = error
+                raise
+            finally:
+                self._pending.pop(transaction_id, None)
+                self.transactions.record(
+                    function, address, count, time.monotonic() - started, error=failure
+                )
+        return decode(data)
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "transport": "modbus-tcp",
+            "bus_users": self.users,
+            "max_in_flight": self.max_in_flight,
+            "discarded_responses": self.discarded_responses,
+        }
+
+
+# Buses by event loop and port URL, shared by every AsyncD300GC on that port.
+_BUSES: dict[tuple[asyncio.AbstractEventLoop, str], AsyncModbusBus] = {}
+
+
+def _create_bus(
+    url: str,
+    timeout: float,
+    tcp_keepalive: float,
+    request_delay: float,
+    quiet_period: QuietPeriodTuner | None,
+    max_in_flight: int,
+) -> AsyncModbusBus:
+    location = urlsplit(url)
+    if location.scheme == MODBUS_TCP_SCHEME and location.hostname:
+        return AsyncModbusTcpBus(
+            url,
+            location.hostname,
+            location.port or MODBUS_TCP_DEFAULT_PORT,
+            timeout=timeout,
+            tcp_keepalive=tcp_keepalive,
+            max_in_flight=max_in_flight,
+        )
+    if location.scheme == "socket" and location.hostname and location.port:
+        return AsyncRtuBus(
+            url,
+            location.hostname,
+            location.port,
+            timeout=timeout,
+            tcp_keepalive=tcp_keepalive,
+            request_delay=request_delay,
+            quiet_period=quiet_period,
+        )
+    raise ValueError(
+        f"AsyncD300GC needs a socket://host:port or {MODBUS_TCP_SCHEME}://host[:port] "
+        f"URL, not {url!r}"
+    )
+
+
+class AsyncD300GC(D300GCBase):
+    """Read D300GC generator values with asyncio.
+
+    The read methods match ``D300GC`` but are coroutines.  Connection settings
+    of the first controller opened on a port (timeout, request delay, quiet
+    period tuner) apply to the whole bus.  ``baudrate`` is accepted for
+    compatibility only; the NPort's serial settings come from its own
+    configuration.
+    """
+
+    def __init__(
+        self,
+        port: str = "socket://127.0.0.1:4001",
+        slave_id: int = 10,
+        baudrate: int = 115200,
+        timeout: float = 1.0,
+        alarm_page: int | None = None,
+        request_delay: float = 0.1,
+        block_read: bool = True,
+        tcp_keepalive: float = 30.0,
+        quiet_period: QuietPeriodTuner | None = None,
+        max_in_flight: int = 4,
+        alarm_cache: AlarmLayoutCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        partial_results: bool = False,
+    ) -> None:
+        self._port_name = port
+        self._slave_id = self._validate_slave_id(slave_id)
+        self._baudrate = baudrate
+        self._timeout = float(timeout)
+        self._request_delay = max(0.0, float(request_delay))
+        self._alarm_page = alarm_page
+        self._resolved_alarm_page: int | None = alarm_page
+        self._alarm_cache = alarm_cache if alarm_cache is not None else AlarmLayoutCache()
+        self._block_read = bool(block_read)
+        self._tcp_keepalive = max(0.0, float(tcp_keepalive))
+        self._quiet_period = quiet_period
+        self._max_in_flight = int(max_in_flight)
+        self._bus: AsyncModbusBus | None = None
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._partial_results = bool(partial_results)
+        self.last_sentinel: dict[str, Any] | None = None
+        self._tier_values: dict[str, dict[str, Any]] = {}
+
+    async def initialise(
+        self,
+        port: str | None = None,
+        slave_id: int | None = None,
+        baudrate: int | None = None,
+        timeout: float | None = None,
+        request_delay: float | None = None,
+    ) -> bool:
+        """Set connection parameters without opening the connection."""
+        await self.close()
+        if port is not None:
+            self._port_name = port
+        if slave_id is not None:
+            self._slave_id = self._validate_slave_id(slave_id)
+        if baudrate is not None:
+            self._baudrate = int(baudrate)
+        if timeout is not None:
+            self._timeout = float(timeout)
+        if request_delay is not None:
+            self._request_delay = max(0.0, float(request_delay))
+        if port is not None or slave_id is not None:
+            self._tier_values.clear()
+        return True
+
+    async def open(
+        self,
+        port: str | None = None,
+        slave_id: int | None = None,
+        baudrate: int | None = None,
+        timeout: float | None = None,
+        request_delay: float | None = None,
+    ) -> bool:
+        """Join the shared bus for the port and connect it if necessary."""
+        await self.initialise(port, slave_id, baudrate, timeout, request_delay)
+        key = (asyncio.get_running_loop(), self._port_name)
+        bus = _BUSES.get(key)
+        if bus is None:
+            bus = _create_bus(
+                self._port_name,
+                self._timeout,
+                self._tcp_keepalive,
+                self._request_delay,
+                self._quiet_period,
+                self._max_in_flight,
+            )
+            _BUSES[key] = bus
+        bus.users += 1
+        self._bus = bus
+        try:
+            await bus.open()
+        except GeneratorCommunicationError:
+            await self.close()
+            raise
+        return True
+
+    async def close(self) -> bool:
+        """Leave the bus; the connection closes when its last user leaves."""
+        bus, self._bus = self._bus, None
+        if bus is None:
+            return True
+        bus.users -= 1
+        if bus.users <= 0:
+            for key, registered in list(_BUSES.items()):
+                if registered is bus:
+                    del _BUSES[key]
+            await bus.close()
+        return True
+
+    def is_open(self) -> bool:
+        """Return ``True`` if the bus connection is open, without any I/O."""
+        return self._bus is not None and self._bus.is_open()
+
+    async def reconnect(self) -> bool:
+        """Reopen the bus connection with the current settings."""
+        if self._bus is not None:
+            await self._bus.close()
+        else:
+            return await self.open()
+        await self._bus.open()
+        return True
+
+    async def is_connected(self) -> bool:
+        """Return ``True`` only if the bus is open and the generator responds."""
+        if not self.is_open():
+            return False
+        try:
+            await self.read_register(self.register_address(4, 0))
+        except (GeneratorCommunicationError, OSError):
+            return False
+        return True
+
+    @property
+    def request_delay(self) -> float:
+        """Quiet period in seconds applied before the next transaction on the bus."""
+        if self._bus is not None:
+            return self._bus.request_delay
+        if self._quiet_period is not None:
+            return self._quiet_period.delay
+        return self._request_delay
+
+    def statistics(self) -> dict[str, Any]:
+        """Return communication statistics for this generator and its bus."""
+        statistics: dict[str, Any] = {
+            "port": self._port_name,
+            "slave_id": self._slave_id,
+            "request_delay_s": round(self.request_delay, 4),
+        }
+        if self._bus is not None:
+            statistics.update(self._bus.statistics())
+        return statistics
+
+    def transaction_statistics(self) -> dict[str, Any] | None:
+        """Return per-page transaction counters of the shared bus, if open."""
+        if self._bus is None:
+            return None
+        return self._bus.transaction_statistics()
+
+    async def _transact(
+        self,
+        register_address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        """Perform one function-03 transaction and decode its data bytes."""
+        self._validate_request(register_address, count)
+        if not self.is_open():
+            raise GeneratorCommunicationError(f"Connection to {self._port_name} is not open")
+        attempt = 0
+        while True:
+            try:
+                return await self._bus.transact(
+                    self._slave_id,
+                    self.FUNCTION_READ_HOLDING_REGISTERS,
+                    register_address,
+                    count,
+                    decode,
+                )
+            except GeneratorCommunicationError as error:
+                attempt += 1
+                if not self._retry_policy.should_retry(error, attempt) or not self.is_open():
+                    raise
+                await asyncio.sleep(self._retry_policy.delay(attempt))
+
+    async def _transact_block(self, block: ReadBlock, values: dict[str, Any]) -> None:
+        await self._transact(
+            block.address,
+            block.count,
+            lambda payload: self._decode_read_block(block, payload, values),
+        )
+
+    async def read_register(self, register_address: int, count: int = 1) -> int | list[int]:
+        """Read one or more zero-based holding-register addresses (function 03)."""
+        registers = await self._transact(
+            register_address,
+            count,
+            lambda payload: list(_register_struct(count).unpack_from(payload)),
+        )
+        return registers[0] if count == 1 else registers
+
+    async def read_block(self, page: int, offset: int, count: int) -> list[int]:
+        """Read *count* consecutive registers starting at a page offset."""
+        if offset + count > self.PAGE_SIZE:
+            raise ValueError("Register block must not cross a GenComm page boundary")
+        registers = await self.read_register(self.register_address(page, offset), count)
+        return [registers] if isinstance(registers, int) else registers
+
+    async def read_page(self, page: int) -> PageSnapshot:
+        """Read all 256 registers of a GenComm page; fields decode on access."""
+        return (await self.read_pages((page,))).page(page)
+
+    async def read_pages(self, pages: Iterable[int]) -> ControllerSnapshot:
+        """Read whole GenComm pages with concurrent requests.
+
+        Like ``D300GC.read_pages()``, a request rejected with a Modbus
+        exception leaves its registers missing in the snapshot.
+        """
+        pages = tuple(dict.fromkeys(pages))
+        requests = self._page_requests(pages)
+        ts = datetime.datetime.now()
+        buffers = {page: bytearray(PAGE_BYTES) for page in pages}
+        missing: dict[int, list[MissingRange]] = {page: [] for page in pages}
+
+        def store(page: int, address: int, count: int) -> Callable[[memoryview], None]:
+            start = (address - page * self.PAGE_SIZE) * 2
+
+            def decode(payload: memoryview) -> None:
+                buffers[page][start : start + count * 2] = payload
+
+            return decode
+
+        results = await asyncio.gather(
+            *(
+                self._transact(address, count, store(page, address, count))
+                for page, address, count in requests
+            ),
+            return_exceptions=True,
+        )
+        for (page, address, count), result in zip(requests, results):
+            if isinstance(result, ModbusExceptionResponse):
+                missing[page].append(
+                    MissingRange(address - page * self.PAGE_SIZE, count, str(result))
+                )
+            elif isinstance(result, BaseException):
+                raise result
+        return self._controller_snapshot(buffers, missing, ts)
+
+    async def _read_field(self, name: str) -> int | float | None:
+        """Read one register field from the GenComm map with its own request."""
+        values: dict[str, Any] = {}
+        await self._transact_block(field_read_block(name), values)
+        return values[name]
+
+    async def _read_value(self, page: int, offset: int) -> int | None:
+        address = self.register_address(page, offset)
+        raw = await self._transact(
+            address, 1, lambda payload: int.from_bytes(payload, byteorder="big")
+        )
+        value, sentinel = value_decoder()(raw)
+        self._set_last_sentinel(page, offset, sentinel)
+        return value
+
+    # Values derived from register fields; the plain register reads such as
+    # read_oil_pressure() are generated from the GenComm field table below.
+
+    async def read_communication_status(self) -> str:
+        """Return ``CONNECTED`` when the controller answers a Modbus request."""
+        return "CONNECTED" if await self.is_connected() else "DISCONNECTED"
+
+    async def read_overall_status(self) -> str:
+        """Return an overall OK/WARNING/CRITICAL controller state."""
+        return self._overall_status_name(await self._read_field("status_flags"))
+
+    async def read_control_mode(self) -> str:
+        """Read and translate the generator control mode."""
+        return self._control_mode_name(await self.read_control_mode_code())
+
+    async def read_auto_start_enabled(self) -> bool | None:
+        """Return whether the controller is in an automatic-start mode."""
+        return self._auto_start_enabled(await self.read_control_mode_code())
+
+    async def read_transfer_to_generator(self) -> bool | None:
+        """Return whether the load is transferred to generator supply."""
+        return self._transfer_flag(await self._read_field("transfer_led"))
+
+    async def read_transfer_status(self) -> str:
+        """Return a readable generator transfer status."""
+        return self._transfer_status_name(await self.read_transfer_to_generator())
+
+    async def read_engine_state(self) -> str:
+        """Read and translate the engine operating-state code."""
+        return self._engine_state_name(await self.read_engine_state_code())
+
+    async def read_named_alarm_count(self) -> int | None:
+        """Read the number of named alarm conditions implemented by the unit."""
+        for page in self._alarm_pages():
+            try:
+                count = await self._read_value(page, 0)
+            except (GeneratorCommunicationError, OSError):
+                if self._alarm_page is not None:
+                    raise
+                continue
+            if not self._accept_alarm_count(count):
+                continue
+            self._resolved_alarm_page = page
+            self._remember_alarm_layout(page, count)
+            return count
+        self._resolved_alarm_page = None
+        return None
+
+    async def _read_alarm_codes(self, alarm_page: int, alarm_count: int) -> str:
+        registers = await self.read_block(alarm_page, 1, (alarm_count + 3) // 4)
+        return self._decode_alarm_codes(alarm_count, registers)
+
+    async def read_alarm_codes(self) -> str:
+        """Return the condition code of every alarm, one hexadecimal digit each."""
+        layout = self._cached_alarm_layout()
+        if layout is not None:
+            alarm_page, alarm_count = layout
+            if not alarm_count:
+                return ""
+            try:
+                return await self._read_alarm_codes(alarm_page, alarm_count)
+            except ModbusExceptionResponse as error:
+                if error.code != self.MODBUS_ILLEGAL_DATA_ADDRESS:
+                    raise
+                self._forget_alarm_layout()
+
+        alarm_count = await self.read_named_alarm_count()
+        if not alarm_count:
+            return ""
+        if self._resolved_alarm_page is None:
+            raise GeneratorProtocolError("Could not resolve the GenComm alarm page")
+        return await self._read_alarm_codes(self._resolved_alarm_page, alarm_count)
+
+    async def read_active_alarms(self) -> list[dict[str, Any]]:
+        """Return active warning, trip, shutdown, and indication conditions."""
+        alarm_codes = await self.read_alarm_codes()
+        return self._active_alarm_list(self._resolved_alarm_page, alarm_codes)
+
+    async def read_active_alarm_count(self) -> int:
+        """Return the number of alarm conditions that are currently active."""
+        return bin(self.active_alarm_mask(await self.read_alarm_codes())).count("1")
+
+    async def read_active_alarm_mask(self) -> str:
+        """Return the active alarms as a hexadecimal bitmask; bit 0 is alarm 1."""
+        return f"{self.active_alarm_mask(await self.read_alarm_codes()):x}"
+
+    async def read_transfer_watch(self) -> dict[str, Any]:
+        """Read only the transfer LED and the engine state, see ``D300GC``."""
+        values: dict[str, Any] = {}
+        await asyncio.gather(
+            *(self._transact_block(block, values) for block in self.WATCH_PLAN.blocks)
+        )
+        return self._watch_values(values)
+
+    async def read_burst_sample(self) -> bytes:
+        """Read the raw instrumentation registers of pages 4 and 6, see ``D300GC``."""
+        payloads = await asyncio.gather(
+            *(
+                self._transact(block.address, block.count, bytes)
+                for block in self.BURST_PLAN.blocks
+            )
+        )
+        return b"".join(payloads)
+
+    async def read_generator_data(self, tiers: Collection[str] | None = None) -> dict[str, Any]:
+        """Read all values represented by the generator database table.
+
+        Returns the same columns as ``D300GC.read_generator_data()`` and
+        accepts the same polling *tiers* and partial results.  After the first block, the
+        remaining blocks are requested concurrently; a Modbus TCP bus
+        pipelines them, an RTU bus serialises them.
+        """
+        tiers = self._tiers_to_read(tiers)
+        plan = self._tier_read_plan(tiers)
+        values: dict[str, Any] = {}
+        field_errors: dict[str, str] | None = {} if self._partial_results else None
+        if self._block_read:
+            first_block, *other_blocks = plan.blocks
+            try:
+                await self._transact_block(first_block, values)
+            except (GeneratorCommunicationError, OSError) as error:
+                raise GeneratorCommunicationError("Generator is not responding") from error
+            results = await asyncio.gather(
+                *(self._transact_block(block, values) for block in other_blocks),
+                return_exceptions=True,
+            )
+            for block, result in zip(other_blocks, results):
+                if not isinstance(result, BaseException):
+                    continue
+                if field_errors is None or not self._partial_result_allowed(result):
+                    raise result
+                self._skip_read_block(block, values, field_errors, result)
+        else:
+            if await self.read_communication_status() != "CONNECTED":
+                raise GeneratorCommunicationError("Generator is not responding")
+            for name in plan.field_names:
+                try:
+                    values[name] = await self._read_field(name)
+                except GeneratorCommunicationError as error:
+                    if field_errors is None or not self._partial_result_allowed(error):
+                        raise
+                    values[name] = None
+                    field_errors[name] = str(error)
+
+        self._carry_tier_values(values, tiers, field_errors or ())
+        values["communication_status"] = "CONNECTED"
+        try:
+            alarm_codes = await self.read_alarm_codes()
+        except GeneratorCommunicationError as error:
+            if field_errors is None or not self._partial_result_allowed(error):
+                raise
+            alarm_codes = None
+            field_errors["alarm_codes"] = str(error)
+        values.update(self._derived_values(values, alarm_codes))
+        return self._generator_row(values, field_errors)
+
+
+def _field_reader(field: GenCommField) -> Callable[[AsyncD300GC], Any]:
+    async def read(self: AsyncD300GC) -> int | float | None:
+        return await self._read_field(field.name)
+
+    read.__name__ = field.method
+    read.__qualname__ = f"AsyncD300GC.{field.method}"
+    read.__doc__ = getattr(D300GC, field.method).__doc__
+    return read
+
+
+for _field in GENERATOR_FIELDS:
+    if _field.is_register and _field.method is not None:
+        setattr(AsyncD300GC, _field.method, _field_reader(_field))
+del _field
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the Modbus RTU frame codec against the original framing.
+
+The original ``D300GC`` implementation calculated the CRC bit by bit, packed
+every request frame anew, collected response bytes in a fresh ``bytearray``,
+converted it to ``bytes``, concatenated the header, and unpacked a slice.
+This benchmark keeps a copy of that implementation and compares it with
+``modbus_rtu.RtuFrameCodec`` on identical frames.  No generator is required;
+responses are served from memory.
+
+Example:
+
+    python3 benchmark_frame_codec.py --registers 26 --number 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import struct
+import sys
+import timeit
+
+from modbus_rtu import RtuFrameCodec, crc16
+
+
+FUNCTION_READ_HOLDING_REGISTERS = 3
+
+
+def legacy_crc16(data: bytes) -> int:
+    """Original bit-by-bit CRC-16 implementation."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def legacy_request(slave_id: int, address: int, count: int) -> bytes:
+    request = struct.pack(
+        ">BBHH", slave_id, FUNCTION_READ_HOLDING_REGISTERS, address, count
+    )
+    return request + struct.pack("<H", legacy_crc16(request))
+
+
+def legacy_read_exactly(port: io.BytesIO, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = port.read(size - len(data))
+        if not chunk:
+            raise RuntimeError("response truncated")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def legacy_decode(port: io.BytesIO, count: int) -> list[int]:
+    header = legacy_read_exactly(port, 3)
+    response = header + legacy_read_exactly(port, header[2] + 2)
+    received_crc = int.from_bytes(response[-2:], byteorder="little")
+    if received_crc != legacy_crc16(response[:-2]):
+        raise RuntimeError("invalid CRC")
+    return list(struct.unpack(f">{count}H", response[3:-2]))
+
+
+def build_response(slave_id: int, count: int) -> bytes:
+    registers = [(index * 257) & 0xFFFF for index in range(count)]
+    body = struct.pack(
+        f">BBB{count}H", slave_id, FUNCTION_READ_HOLDING_REGISTERS, count * 2, *registers
+    )
+    return body + struct.pack("<H", crc16(body))
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare the Modbus RTU frame codec with the original framing code."
+    )
+    parser.add_argument(
+        "--registers",
+        type=int,
+        default=26,
+        help="Registers per response, 1..125 (default: 26, the page 4 block)",
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=20000,
+        help="Iterations per measurement (default: 20000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Measurements per case; the fastest is reported (default: 5)",
+    )
+    return parser.parse_args()
+
+
+def measure(statement, number: int, repeat: int) -> float:
+    """Return the best time per call in microseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> int:
+    args = parse_arguments()
+    if not 1 <= args.registers <= 125:
+        print("--registers must be between 1 and 125", file=sys.stderr)
+        return 2
+
+    slave_id = 10
+    address = 4 * 256
+    count = args.registers
+    response = build_response(slave_id, count)
+    unpack = struct.Struct(f">{count}H").unpack_from
+    codec = RtuFrameCodec()
+    legacy_port = io.BytesIO(response)
+    codec_port = io.BytesIO(response)
+
+    def legacy_response() -> list[int]:
+        legacy_port.seek(0)
+        return legacy_decode(legacy_port, count)
+
+    def codec_response() -> list[int]:
+        codec_port.seek(0)
+        payload = codec.read_response(
+            codec_port, slave_id, FUNCTION_READ_HOLDING_REGISTERS, count
+        )
+        return list(unpack(payload))
+
+    if legacy_response() != codec_response():
+        print("Codec and legacy decoding disagree", file=sys.stderr)
+        return 1
+    if legacy_request(slave_id, address, count) != codec.request(
+        slave_id, FUNCTION_READ_HOLDING_REGISTERS, address, count
+    ):
+        print("Codec and legacy request frames disagree", file=sys.stderr)
+        return 1
+
+    cases = (
+        (
+            "CRC-16 of response",
+            lambda: legacy_crc16(response[:-2]),
+            lambda: crc16(response[:-2]),
+        ),
+        (
+            "Build request frame",
+            lambda: legacy_request(slave_id, address, count),
+            lambda: codec.request(
+                slave_id, FUNCTION_READ_HOLDING_REGISTERS, address, count
+            ),
+        ),
+        ("Receive and decode response", legacy_response, codec_response),
+    )
+
+    print(f"Modbus RTU frame codec benchmark ({count} registers per response)")
+    print("-" * 78)
+    print(f"{'Case':<30}{'legacy [us]':>14}{'codec [us]':>14}{'speed-up':>12}")
+    for label, legacy, current in cases:
+        legacy_time = measure(legacy, args.number, args.repeat)
+        codec_time = measure(current, args.number, args.repeat)
+        print(
+            f"{label:<30}{legacy_time:>14.2f}{codec_time:>14.2f}"
+            f"{legacy_time / codec_time:>11.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
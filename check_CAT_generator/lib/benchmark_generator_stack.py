@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the generator readout, database write and plugin.
+
+Three stages run against local stand-ins, so results are reproducible and no
+generator, Moxa or MySQL server is needed:
+
+* readout: ``D300GC.read_generator_data()`` against ``gencomm_simulator.py``
+  running in a separate process, with the latency, baud rate and quiet period
+  of the real line if requested.  Reported per cycle: Modbus transactions,
+  request and response bytes on the wire, wall time and CPU time of this
+  process.
+* sql_write: ``MySQL_com.write_generator()`` of the rows read in the first
+  stage into the SQLite stand-in database in ``standin_db``.
+* plugin: ``check_CAT_generator.py all`` start-to-exit time as a separate
+  process reading the rows just written.
+
+Results are printed and, with ``--output``, saved as JSON; ``--compare``
+prints the change of the main metrics against an earlier result file.
+
+Example:
+
+    python3 benchmark_generator_stack.py --cycles 50 --latency 0.005 \\
+        --baudrate 115200 --output before.json
+    python3 benchmark_generator_stack.py --cycles 50 --latency 0.005 \\
+        --baudrate 115200 --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import configparser
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from gencomm_map import GENERATOR_DATA_COLUMNS
+
+LIB_DIRECTORY = Path(__file__).resolve().parent
+INSTALL_DIRECTORY = LIB_DIRECTORY.parent
+STANDIN_DB_DIRECTORY = LIB_DIRECTORY / "standin_db"
+RESULT_FORMAT_VERSION = 1
+
+GENERATOR_TABLE = "hcro_d300gc_generator"
+ALARM_EVENT_TABLE = "hcro_d300gc_alarm_events"
+
+# Metrics shown by --compare, as paths into the result dictionary.
+COMPARED_METRICS = (
+    ("readout", "transactions_per_cycle"),
+    ("readout", "wire_bytes_per_cycle"),
+    ("readout", "wall_s", "mean_s"),
+    ("readout", "wall_s", "p95_s"),
+    ("readout", "cpu_s", "mean_s"),
+    ("sql_write", "wall_s", "mean_s"),
+    ("sql_write", "cpu_s", "mean_s"),
+    ("plugin", "start_to_exit_s", "mean_s"),
+    ("plugin", "start_to_exit_s", "p95_s"),
+)
+
+
+def summary(samples: list[float]) -> dict[str, float] | None:
+    """Return the mean, extremes and percentiles of *samples* in seconds."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def percentile(fraction: float) -> float:
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+    return {
+        "mean_s": round(sum(ordered) / len(ordered), 6),
+        "min_s": round(ordered[0], 6),
+        "p50_s": round(percentile(0.5), 6),
+        "p95_s": round(percentile(0.95), 6),
+        "max_s": round(ordered[-1], 6),
+    }
+
+
+def start_simulator(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    """Start the controller simulator and return the process and its URL."""
+    command = [
+        sys.executable,
+        str(LIB_DIRECTORY / "gencomm_simulator.py"),
+        "--tcp-port", "0",
+        "--latency", str(args.latency),
+        "--quiet-period", str(args.quiet_period),
+    ]
+    if args.baudrate:
+        command += ["--baudrate", str(args.baudrate)]
+    for alarm in args.alarm:
+        command += ["--alarm", alarm]
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, text=True, cwd=LIB_DIRECTORY
+    )
+    line = process.stdout.readline()
+    if not line.startswith("Serving socket://"):
+        process.kill()
+        raise RuntimeError(f"Simulator did not start: {line.strip()!r}")
+    return process, line.split()[1]
+
+
+def benchmark_readout(args: argparse.Namespace) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Run the readout stage; return its results and the rows read."""
+    from generator_com import D300GC
+
+    simulator, url = start_simulator(args)
+    generator = D300GC(
+        port=url,
+        request_delay=args.request_delay,
+        block_read=not args.per_value,
+    )
+    rows = []
+    wall: list[float] = []
+    cpu: list[float] = []
+    transactions: list[int] = []
+    request_bytes: list[int] = []
+    response_bytes: list[int] = []
+    first_cycle = None
+    try:
+        generator.open()
+        for cycle in range(args.warmup + args.cycles):
+            before = generator.transaction_statistics()["totals"]
+            started_cpu = time.process_time()
+            started = time.perf_counter()
+            row = generator.read_generator_data()
+            elapsed = time.perf_counter() - started
+            elapsed_cpu = time.process_time() - started_cpu
+            after = generator.transaction_statistics()["totals"]
+            counts = {
+                key: after[key] - before[key]
+                for key in ("requests", "request_bytes", "response_bytes")
+            }
+            if cycle == 0:
+                # The first readout also probes the alarm page.
+                first_cycle = {
+                    "transactions": counts["requests"],
+                    "wall_s": round(elapsed, 6),
+                    "cpu_s": round(elapsed_cpu, 6),
+                }
+            if cycle < args.warmup:
+                continue
+            rows.append(row)
+            wall.append(elapsed)
+            cpu.append(elapsed_cpu)
+            transactions.append(counts["requests"])
+            request_bytes.append(counts["request_bytes"])
+            response_bytes.append(counts["response_bytes"])
+    finally:
+        generator.close()
+        simulator.terminate()
+        simulator.wait()
+
+    cycles = len(wall)
+    result = {
+        "cycles": cycles,
+        "warmup_cycles": args.warmup,
+        "first_cycle": first_cycle,
+        "transactions_per_cycle": sum(transactions) / cycles,
+        "request_bytes_per_cycle": sum(request_bytes) / cycles,
+        "response_bytes_per_cycle": sum(response_bytes) / cycles,
+        "wire_bytes_per_cycle": (sum(request_bytes) + sum(response_bytes)) / cycles,
+        "wall_s": summary(wall),
+        "cpu_s": summary(cpu),
+    }
+    return result, rows
+
+
+def create_standin_tables(path: Path) -> None:
+    import sqlite3
+
+    columns = ", ".join(f"`{column}`" for column in GENERATOR_DATA_COLUMNS)
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            f"CREATE TABLE `{GENERATOR_TABLE}` (`ts`, `generator`, {columns}, "
+            "PRIMARY KEY (`ts`, `generator`))"
+        )
+        connection.execute(
+            f"CREATE TABLE `{ALARM_EVENT_TABLE}` (`ts`, `generator`, `alarm_index`, "
+            "`event`, `condition_code`, `previous_code`, `alarm_name`, "
+            "`alarm_condition`, PRIMARY KEY (`generator`, `ts`, `alarm_index`))"
+        )
+
+
+def benchmark_sql_write(
+    args: argparse.Namespace,
+    rows: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """Write every row read by the readout stage, one insert per cycle."""
+    from alarm_events import AlarmTransitionTracker
+    from mysql_write import MySQL_com
+
+    sql = MySQL_com()
+    sql.open(
+        HOST="localhost",
+        USER="benchmark",
+        PASSWORD="",
+        DATABASE="standin",
+        GENERATOR_TABLE=GENERATOR_TABLE,
+        ALARM_EVENT_TABLE=ALARM_EVENT_TABLE,
+    )
+    tracker = AlarmTransitionTracker()
+    wall: list[float] = []
+    cpu: list[float] = []
+    try:
+        for row in rows:
+            records = [
+                dict(row, generator=f"{args.generator}-{index}" if index else args.generator)
+                for index in range(args.generators)
+            ]
+            started_cpu = time.process_time()
+            started = time.perf_counter()
+            events = [
+                event
+                for record in records
+                for event in tracker.update(
+                    record["generator"], record["alarm_page"], record["alarm_codes"]
+                )
+            ]
+            if events and not sql.write_alarm_events(events):
+                raise RuntimeError("Stand-in alarm event write failed")
+            if not sql.write_generator(records):
+                raise RuntimeError("Stand-in generator write failed")
+            wall.append(time.perf_counter() - started)
+            cpu.append(time.process_time() - started_cpu)
+    finally:
+        sql.close()
+    return {
+        "writes": len(wall),
+        "rows_per_write": args.generators,
+        "alarm_events": tracker.events_emitted,
+        "wall_s": summary(wall),
+        "cpu_s": summary(cpu),
+    }
+
+
+def benchmark_plugin(args: argparse.Namespace, environment: dict[str, str]) -> dict[str, Any]:
+    """Time ``check_CAT_generator.py all`` from process start to exit."""
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(INSTALL_DIRECTORY / "etc" / "check_CAT_generator.cfg")
+    config["COMMUNICATION SETTINGS"]["Generator_Type"] = args.generator
+    config["MySQL SPECIFIC SETTINGS"]["SQL_Table"] = GENERATOR_TABLE
+    config["MySQL SPECIFIC SETTINGS"]["SQL_Alarm_Event_Table"] = ALARM_EVENT_TABLE
+    config_path = Path(environment["BENCHMARK_DIRECTORY"]) / "check_CAT_generator.cfg"
+    with config_path.open("w") as handle:
+        config.write(handle)
+
+    command = [
+        sys.executable,
+        str(INSTALL_DIRECTORY / "check_CAT_generator.py"),
+        "all",
+        "--config",
+        str(config_path),
+    ]
+    wall: list[float] = []
+    completed = None
+    for _ in range(args.plugin_runs):
+        started = time.perf_counter()
+        completed = subprocess.run(command, capture_output=True, text=True, env=environment)
+        wall.append(time.perf_counter() - started)
+    return {
+        "runs": len(wall),
+        "exit_status": completed.returncode if completed else None,
+        "output": completed.stdout.strip().split(" | ")[0] if completed else None,
+        "start_to_exit_s": summary(wall),
+    }
+
+
+def metric(result: dict[str, Any], path: tuple[str, ...]) -> float | None:
+    value: Any = result
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def print_results(result: dict[str, Any]) -> None:
+    readout = result["readout"]
+    print("Generator stack benchmark")
+    print("-" * 78)
+    print(
+        f"Readout    : {readout['cycles']} cycles, "
+        f"{readout['transactions_per_cycle']:.1f} transactions and "
+        f"{readout['wire_bytes_per_cycle']:.0f} bytes per cycle"
+    )
+    for stage, key in (
+        ("readout", "wall_s"),
+        ("readout", "cpu_s"),
+        ("sql_write", "wall_s"),
+        ("sql_write", "cpu_s"),
+        ("plugin", "start_to_exit_s"),
+    ):
+        values = result[stage].get(key)
+        if values is None:
+            print(f"{stage + ' ' + key:<28}: {result[stage].get('skipped', 'no samples')}")
+            continue
+        print(
+            f"{stage + ' ' + key:<28}: mean {values['mean_s'] * 1000:9.3f} ms"
+            f"  p50 {values['p50_s'] * 1000:9.3f} ms  p95 {values['p95_s'] * 1000:9.3f} ms"
+        )
+    if "output" in result["plugin"]:
+        print(f"Plugin     : exit {result['plugin']['exit_status']}, {result['plugin']['output']}")
+
+
+def print_comparison(result: dict[str, Any], baseline: dict[str, Any]) -> None:
+    print("-" * 78)
+    print(f"{'Metric':<40}{'baseline':>12}{'current':>12}{'change':>12}")
+    for path in COMPARED_METRICS:
+        before = metric(baseline, path)
+        after = metric(result, path)
+        if before is None or after is None:
+            continue
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{'.'.join(path):<40}{before:>12.6g}{after:>12.6g}{change:>12}")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the generator readout, database write and Nagios plugin."
+    )
+    parser.add_argument("--cycles", type=int, default=20, help="Measured readout cycles (default: 20)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured first cycles (default: 1)")
+    parser.add_argument(
+        "--request-delay",
+        type=float,
+        default=0.0,
+        help="D300GC quiet period between requests in seconds (default: 0)",
+    )
+    parser.add_argument(
+        "--per-value",
+        action="store_true",
+        help="Read every value with its own request instead of block reads",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Simulated controller response latency in seconds (default: 0)",
+    )
+    parser.add_argument("--baudrate", type=int, help="Simulate the frame time at this baud rate")
+    parser.add_argument(
+        "--quiet-period",
+        type=float,
+        default=0.0,
+        help="Simulated quiet period the controller needs after a response (default: 0)",
+    )
+    parser.add_argument(
+        "--alarm",
+        action="append",
+        default=[],
+        metavar="INDEX=CONDITION",
+        help="Active alarm of the simulated controller, e.g. 2=shutdown",
+    )
+    parser.add_argument("--generator", default="D300GC", help="Generator name (default: D300GC)")
+    parser.add_argument(
+        "--generators",
+        type=int,
+        default=1,
+        help="Rows per database write, as written by main.py for several generators (default: 1)",
+    )
+    parser.add_argument(
+        "--plugin-runs",
+        type=int,
+        default=10,
+        help="Nagios plugin runs (default: 10)",
+    )
+    parser.add_argument("--output", type=Path, help="Save the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Compare with an earlier JSON result")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    if args.cycles <= 0 or args.warmup < 0 or args.generators <= 0 or args.plugin_runs < 0:
+        print("--cycles and --generators must be positive; --warmup and --plugin-runs "
+              "must not be negative", file=sys.stderr)
+        return 2
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    result: dict[str, Any] = {
+        "benchmark": "generator_stack",
+        "format_version": RESULT_FORMAT_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+        },
+    }
+    result["readout"], rows = benchmark_readout(args)
+
+    with tempfile.TemporaryDirectory(prefix="generator-benchmark-") as directory:
+        # Both this process and the plugin use the SQLite stand-in database.
+        sys.path.insert(0, str(STANDIN_DB_DIRECTORY))
+        from mysql.connector import DATABASE_PATH_ENV
+
+        database = Path(directory) / "standin.sqlite"
+        create_standin_tables(database)
+        os.environ[DATABASE_PATH_ENV] = str(database)
+        environment = dict(
+            os.environ,
+            BENCHMARK_DIRECTORY=directory,
+            PYTHONPATH=os.pathsep.join(
+                filter(None, (str(STANDIN_DB_DIRECTORY), os.environ.get("PYTHONPATH")))
+            ),
+        )
+        result["sql_write"] = benchmark_sql_write(args, rows)
+        if args.plugin_runs:
+            result["plugin"] = benchmark_plugin(args, environment)
+        else:
+            result["plugin"] = {"skipped": "--plugin-runs 0"}
+
+    print_results(result)
+    if baseline is not None:
+        print_comparison(result, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n")
+        print(f"Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
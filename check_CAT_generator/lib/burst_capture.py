@@ -0,0 +1,199 @@
+"""High-rate burst capture after a transfer or an engine start.
+
+A ``Cadance`` of 60 seconds records one row while the generator starts,
+synchronises and takes the load; the ramp-up of voltage, frequency and
+current is lost.  When ``TransferWatcher`` reports a change of
+``transfer_to_generator``, or an ``engine_state_code`` leaving "Engine
+stopped", ``BurstCapture`` opens a window of ``Burst_Window`` seconds for
+that generator.  While a window is open, the monitor reads the
+instrumentation of pages 4 and 6 (``D300GC.read_burst_sample()``, two
+requests) every ``Burst_Interval`` seconds instead of watching, and returns
+to the normal cadence when the window closes.  Regular recording cycles
+continue on time.
+
+Samples are kept undecoded in a ``BurstBuffer``, one fixed-size record per
+sample in a single ``bytearray``:
+
+    ts (float64 seconds since the epoch), generator index (uint16),
+    data bytes of the BURST_PLAN blocks (96 bytes)
+
+The buffer is decoded into rows only when it is flushed: when no window is
+open any more, or when the buffer is full.  ``main.py`` writes the rows with
+one batched insert into ``SQL_Burst_Table``.
+"""
+
+from __future__ import annotations
+
+import datetime
+import struct
+import time
+from typing import Any, Iterable
+
+from gencomm_map import BURST_READ_PLAN, ReadPlan
+from transfer_watch import WatchChange
+
+# Engine state codes that mean the engine is not turning; see
+# D300GC.ENGINE_STATE_NAMES.
+ENGINE_STOPPED_CODES = frozenset({0, 5})
+
+DEFAULT_BUFFER_SAMPLES = 4096
+_SAMPLE_HEADER = struct.Struct("<dH")
+
+
+def is_burst_trigger(change: WatchChange) -> bool:
+    """Return whether *change* opens a burst window.
+
+    Every transfer change triggers, and an engine state change only when the
+    engine leaves "Engine stopped".
+    """
+    if change.column == "transfer_to_generator":
+        return True
+    if change.column == "engine_state_code":
+        return (
+            change.previous in ENGINE_STOPPED_CODES
+            and change.value not in ENGINE_STOPPED_CODES
+        )
+    return False
+
+
+class BurstBuffer:
+    """Fixed-size records of raw burst samples in one ``bytearray``.
+
+    Args:
+        plan: read plan whose block data bytes make up one sample.
+        capacity: samples held before the buffer counts as full.
+    """
+
+    def __init__(
+        self, plan: ReadPlan = BURST_READ_PLAN, capacity: int = DEFAULT_BUFFER_SAMPLES
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.plan = plan
+        self.capacity = int(capacity)
+        self.sample_size = sum(block.count for block in plan.blocks) * 2
+        self.record_size = _SAMPLE_HEADER.size + self.sample_size
+        self._records = bytearray()
+        self._generators: list[str] = []
+        self._generator_index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._records) // self.record_size
+
+    @property
+    def full(self) -> bool:
+        return len(self) >= self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._records)
+
+    def append(self, generator: str, ts: datetime.datetime, sample: bytes) -> None:
+        """Append one sample returned by ``D300GC.read_burst_sample()``."""
+        if len(sample) != self.sample_size:
+            raise ValueError(f"A burst sample holds {self.sample_size} data bytes")
+        index = self._generator_index.get(generator)
+        if index is None:
+            index = self._generator_index[generator] = len(self._generators)
+            self._generators.append(generator)
+        self._records += _SAMPLE_HEADER.pack(ts.timestamp(), index)
+        self._records += sample
+
+    def rows(self) -> list[dict[str, Any]]:
+        """Decode every sample into a row of ``ts``, ``generator`` and the burst columns.
+
+        Sentinel values decode as ``None``.
+        """
+        records = memoryview(self._records)
+        rows = []
+        for start in range(0, len(records), self.record_size):
+            timestamp, index = _SAMPLE_HEADER.unpack_from(records, start)
+            row: dict[str, Any] = {
+                "ts": datetime.datetime.fromtimestamp(timestamp),
+                "generator": self._generators[index],
+            }
+            position = start + _SAMPLE_HEADER.size
+            for block in self.plan.blocks:
+                for field, value, _ in block.decode(records[position:]):
+                    row[field.column] = value
+                position += block.count * 2
+            rows.append(row)
+        return rows
+
+    def clear(self) -> None:
+        self._records = bytearray()
+        self._generators = []
+        self._generator_index = {}
+
+
+class BurstCapture:
+    """Open burst windows on trigger changes and buffer their samples.
+
+    Args:
+        window: seconds sampled after a trigger; a further trigger of the
+            same generator extends its window.
+        interval: seconds between two samples of a generator.
+        capacity: samples buffered before a flush is due.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        interval: float,
+        capacity: int = DEFAULT_BUFFER_SAMPLES,
+        plan: ReadPlan = BURST_READ_PLAN,
+    ) -> None:
+        if window <= 0 or interval <= 0:
+            raise ValueError("Burst window and interval must be positive")
+        self.window = float(window)
+        self.interval = float(interval)
+        self.buffer = BurstBuffer(plan, capacity)
+        self._until: dict[str, float] = {}
+        self.bursts = 0
+        self.samples = 0
+        self.flushed = 0
+
+    def trigger(self, changes: Iterable[WatchChange], now: float | None = None) -> list[str]:
+        """Open or extend the window of every generator with a trigger change.
+
+        Returns the generators whose window was opened or extended.
+        """
+        now = time.monotonic() if now is None else now
+        triggered = []
+        for change in changes:
+            if not is_burst_trigger(change) or change.generator in triggered:
+                continue
+            if self._until.get(change.generator, 0.0) <= now:
+                self.bursts += 1
+            self._until[change.generator] = now + self.window
+            triggered.append(change.generator)
+        return triggered
+
+    def active(self, now: float | None = None) -> list[str]:
+        """Return the generators whose window is open and forget closed ones."""
+        now = time.monotonic() if now is None else now
+        for generator in [name for name, until in self._until.items() if until <= now]:
+            del self._until[generator]
+        return list(self._until)
+
+    def record(self, generator: str, ts: datetime.datetime, sample: bytes) -> bool:
+        """Buffer one sample; return whether the buffer is now full."""
+        self.buffer.append(generator, ts, sample)
+        self.samples += 1
+        return self.buffer.full
+
+    def take_rows(self) -> list[dict[str, Any]]:
+        """Decode the buffered samples into rows and empty the buffer."""
+        rows = self.buffer.rows()
+        self.buffer.clear()
+        self.flushed += len(rows)
+        return rows
+
+    def statistics(self) -> dict[str, int]:
+        return {
+            "bursts": self.bursts,
+            "samples": self.samples,
+            "flushed": self.flushed,
+            "buffered": len(self.buffer),
+            "buffer_bytes": self.buffer.nbytes,
+        }
@@ -0,0 +1,306 @@
+"""Priority arbitration of one Modbus port between threads and instances.
+
+All controllers behind one Moxa NPort share one RS-485 line, and only one
+transaction can be on it at a time.  A ``BusArbiter`` grants the line to one
+transaction after another.  While the line is busy, waiting transactions are
+queued by priority class and served first come, first served within a class:
+
+``PRIORITY_URGENT``
+    live state that must be seen quickly, such as the transfer status,
+``PRIORITY_NORMAL``
+    the regular fast-tier readout,
+``PRIORITY_BULK``
+    slow-tier accumulated values and diagnostic page dumps.
+
+Arbitration is per transaction, so an urgent read waits for at most the
+transaction on the line, not for a whole readout.  The queue is bounded: when
+it is full, a new claim displaces the newest claim of a lower class, or is
+refused with ``BusBusyError`` if there is none.
+
+Transports obtain their arbiter from ``shared_arbiter()``, which returns the
+same arbiter for the same port URL, so separate ``D300GC`` instances in one
+process cannot interleave frames.  With a lock directory, the arbiter also
+holds an advisory file lock per port while a transaction runs, so a
+diagnostic script started next to the monitor waits for the line instead of
+colliding with it.  The lock file also records when the line was released,
+so the quiet period is kept between processes.  Priorities only apply within
+one process.
+
+The priority of a claim is taken from the calling context:
+
+    with bus_priority(PRIORITY_URGENT):
+        generator.read_transfer_to_generator()
+"""
+
+from __future__ import annotations
+
+import contextvars
+import itertools
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from modbus_rtu import GeneratorCommunicationError
+
+try:
+    import fcntl
+except ImportError:  # Advisory file locks are POSIX only; other systems skip them.
+    fcntl = None
+
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {PRIORITY_URGENT: "urgent", PRIORITY_NORMAL: "normal", PRIORITY_BULK: "bulk"}
+
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_CLAIM_TIMEOUT = 10.0
+# Poll interval while another process holds the port lock file.
+_FILE_LOCK_POLL = 0.002
+# Release time stored in the lock file; CLOCK_MONOTONIC is system wide.
+_RELEASE_TIME = struct.Struct("<d")
+
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "bus_priority", default=PRIORITY_NORMAL
+)
+
+
+class BusBusyError(GeneratorCommunicationError):
+    """The bus was not granted: its queue was full or the claim timed out."""
+
+
+@contextmanager
+def bus_priority(priority: int) -> Iterator[None]:
+    """Run the transactions of the enclosed block with *priority*."""
+    if priority not in PRIORITY_NAMES:
+        raise ValueError(f"Unknown bus priority: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    """Return the bus priority of the calling context."""
+    return _current_priority.get()
+
+
+class _Claim:
+    __slots__ = ("priority", "sequence", "displaced")
+
+    def __init__(self, priority: int, sequence: int) -> None:
+        self.priority = priority
+        self.sequence = sequence
+        self.displaced = False
+
+    @property
+    def rank(self) -> tuple[int, int]:
+        return self.priority, self.sequence
+
+
+class _ClassStatistics:
+    __slots__ = ("claims", "refused", "wait_total", "wait_max")
+
+    def __init__(self) -> None:
+        self.claims = 0
+        self.refused = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "claims": self.claims,
+            "refused": self.refused,
+            "wait_mean_s": round(self.wait_total / self.claims, 4) if self.claims else None,
+            "wait_max_s": round(self.wait_max, 4),
+        }
+
+
+class BusArbiter:
+    """Grant one Modbus port to one transaction at a time, by priority.
+
+    Args:
+        name: port URL, used in messages and statistics.
+        queue_size: claims that may wait for the port at the same time.
+        timeout: seconds a claim waits before ``BusBusyError`` is raised.
+        lock_path: optional lock file shared with other processes.
+
+    A thread that already holds the port may claim it again; the port is
+    released when the outermost claim ends.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        timeout: float = DEFAULT_CLAIM_TIMEOUT,
+        lock_path: str | Path | None = None,
+    ) -> None:
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.name = name
+        self.queue_size = int(queue_size)
+        self.timeout = float(timeout)
+        self.lock_path = None if lock_path is None else Path(lock_path)
+        self._lock_fd: int | None = None
+        self._file_locked = False
+        self._condition = threading.Condition()
+        self._waiting: list[_Claim] = []
+        self._sequence = itertools.count()
+        self._owner: int | None = None
+        self._depth = 0
+        # Monotonic time at which the port was last released; transports
+        # measure their quiet period from it.
+        self.idle_since = 0.0
+        self._statistics = {priority: _ClassStatistics() for priority in PRIORITY_NAMES}
+
+    @contextmanager
+    def claim(self, priority: int | None = None) -> Iterator[None]:
+        """Hold the port for the enclosed transaction."""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _refuse(self, claim_priority: int, message: str) -> BusBusyError:
+        self._statistics[claim_priority].refused += 1
+        return BusBusyError(f"{self.name}: {message}")
+
+    def acquire(self, priority: int | None = None) -> None:
+        """Wait until the port is granted to the caller."""
+        if priority is None:
+            priority = current_priority()
+        thread = threading.get_ident()
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._condition:
+            if self._owner == thread:
+                self._depth += 1
+                return
+            if self._owner is not None or self._waiting:
+                self._enqueue_and_wait(priority, deadline)
+            self._owner = thread
+            self._depth = 1
+        try:
+            self._lock_port_file(deadline)
+        except BaseException:
+            self.release()
+            raise
+        waited = time.monotonic() - started
+        statistics = self._statistics[priority]
+        with self._condition:
+            statistics.claims += 1
+            statistics.wait_total += waited
+            statistics.wait_max = max(statistics.wait_max, waited)
+
+    def _enqueue_and_wait(self, priority: int, deadline: float) -> None:
+        """Queue a claim and wait until it is first and the port is free."""
+        if len(self._waiting) >= self.queue_size:
+            lowest = max(self._waiting, key=lambda waiting: waiting.rank)
+            if lowest.priority <= priority:
+                raise self._refuse(priority, f"bus queue is full ({self.queue_size} waiting)")
+            # The newest claim of the lowest class gives way.
+            self._waiting.remove(lowest)
+            lowest.displaced = True
+            self._condition.notify_all()
+        claim = _Claim(priority, next(self._sequence))
+        self._waiting.append(claim)
+        while True:
+            if claim.displaced:
+                raise self._refuse(priority, "displaced from the bus queue by a higher priority")
+            first = min(self._waiting, key=lambda waiting: waiting.rank)
+            if self._owner is None and first is claim:
+                self._waiting.remove(claim)
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._waiting.remove(claim)
+                self._condition.notify_all()
+                raise self._refuse(priority, f"bus not granted within {self.timeout:g} s")
+            self._condition.wait(remaining)
+
+    def _lock_port_file(self, deadline: float) -> None:
+        if self.lock_path is None or fcntl is None:
+            return
+        if self._lock_fd is None:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o664)
+        while True:
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise BusBusyError(
+                        f"{self.name}: port is held by another process ({self.lock_path})"
+                    ) from None
+                time.sleep(_FILE_LOCK_POLL)
+                continue
+            self._file_locked = True
+            released = os.pread(self._lock_fd, _RELEASE_TIME.size, 0)
+            if len(released) == _RELEASE_TIME.size:
+                # A time ahead of the clock was written before a reboot.
+                released_at = min(_RELEASE_TIME.unpack(released)[0], time.monotonic())
+                self.idle_since = max(self.idle_since, released_at)
+            return
+
+    def release(self) -> None:
+        with self._condition:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("Bus released by a thread that does not hold it")
+            self._depth -= 1
+            if self._depth:
+                return
+            self.idle_since = time.monotonic()
+            if self._file_locked:
+                os.pwrite(self._lock_fd, _RELEASE_TIME.pack(self.idle_since), 0)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                self._file_locked = False
+            self._owner = None
+            self._condition.notify_all()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the claims, refusals and wait times per priority class."""
+        with self._condition:
+            return {
+                "queue_size": self.queue_size,
+                "waiting": len(self._waiting),
+                "lock_file": None if self.lock_path is None else str(self.lock_path),
+                "classes": {
+                    name: self._statistics[priority].snapshot()
+                    for priority, name in PRIORITY_NAMES.items()
+                },
+            }
+
+
+_ARBITERS: dict[str, BusArbiter] = {}
+_ARBITERS_LOCK = threading.Lock()
+
+
+def lock_file_name(port: str) -> str:
+    """Return the lock file name for a port URL."""
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", port).strip("_") + ".lock"
+
+
+def shared_arbiter(port: str, lock_directory: str | Path | None = None) -> BusArbiter:
+    """Return the arbiter of *port*, shared by every transport of this process.
+
+    A *lock_directory* enables the lock file of the port, also for an arbiter
+    that was created without one.
+    """
+    with _ARBITERS_LOCK:
+        arbiter = _ARBITERS.get(port)
+        if arbiter is None:
+            arbiter = _ARBITERS[port] = BusArbiter(port)
+        if lock_directory and arbiter.lock_path is None:
+            arbiter.lock_path = Path(lock_directory) / lock_file_name(port)
+        return arbiter
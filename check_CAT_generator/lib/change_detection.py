@@ -0,0 +1,169 @@
+"""Deadband change detection between generator readout and database write.
+
+An idle generator reports the same values cycle after cycle.  With change
+detection enabled, ``main.py`` writes a generator row only when a column has
+moved past its deadband since the last row written for that generator, or
+when the heartbeat interval has expired.  Status, mode, transfer and alarm
+columns have no deadband: any change is written immediately, so no event is
+lost.  Analog columns get an absolute or relative deadband so that noise in
+the last digit does not cause writes.
+
+Deadbands are compared with the last *written* row, so a slow drift still
+produces a row once it adds up to more than the deadband.
+"""
+
+from __future__ import annotations
+
+import configparser
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from gencomm_map import GENERATOR_DATA_COLUMNS
+
+CHANGE_DETECTION_SECTION = "CHANGE DETECTION"
+
+
+@dataclass(frozen=True)
+class Deadband:
+    """Largest change of a numeric column that is not written.
+
+    A change must exceed both the absolute and the relative limit.  The
+    default of zero for both writes every change.
+    """
+
+    absolute: float = 0.0
+    relative: float = 0.0
+
+    def exceeded(self, previous: Any, current: Any) -> bool:
+        if (
+            isinstance(previous, bool)
+            or isinstance(current, bool)
+            or not isinstance(previous, (int, float))
+            or not isinstance(current, (int, float))
+        ):
+            return previous != current
+        change = abs(current - previous)
+        if change == 0:
+            return False
+        return change > self.absolute and change > self.relative * abs(previous)
+
+
+def parse_deadband(text: str) -> Deadband:
+    """Parse ``"5"`` as an absolute and ``"2%"`` as a relative deadband."""
+    text = text.strip()
+    if text.endswith("%"):
+        value = float(text[:-1])
+        deadband = Deadband(relative=value / 100.0)
+    else:
+        value = float(text)
+        deadband = Deadband(absolute=value)
+    if value < 0 or not math.isfinite(value):
+        raise ValueError(f"Deadband must be a non-negative number: {text!r}")
+    return deadband
+
+
+class ChangeDetector:
+    """Select the generator rows worth writing.
+
+    Args:
+        deadbands: deadband per database column; other columns use *default*.
+        default: deadband for columns without their own entry.
+        heartbeat: seconds after which a row is written even without changes.
+    """
+
+    def __init__(
+        self,
+        deadbands: dict[str, Deadband] | None = None,
+        default: Deadband = Deadband(),
+        heartbeat: float = 900.0,
+    ) -> None:
+        deadbands = dict(deadbands or {})
+        unknown = set(deadbands).difference(GENERATOR_DATA_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown generator columns: {', '.join(sorted(unknown))}")
+        if heartbeat <= 0:
+            raise ValueError("Heartbeat must be greater than zero")
+        self.deadbands = {
+            column: deadbands.get(column, default) for column in GENERATOR_DATA_COLUMNS
+        }
+        self.heartbeat = float(heartbeat)
+        # Last written row and its time per generator name.
+        self._written: dict[str, tuple[float, dict[str, Any]]] = {}
+        self.rows_seen = 0
+        self.rows_written = 0
+
+    def changed_columns(self, previous: dict[str, Any], record: dict[str, Any]) -> list[str]:
+        """Return the columns of *record* that moved past their deadband."""
+        return [
+            column
+            for column, deadband in self.deadbands.items()
+            if deadband.exceeded(previous.get(column), record.get(column))
+        ]
+
+    def select(
+        self,
+        records: Iterable[dict[str, Any]],
+        now: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the records that should be written.
+
+        Every record must carry its ``generator`` name.  Call
+        ``mark_written()`` once the selected rows are stored.
+        """
+        now = time.monotonic() if now is None else now
+        selected = []
+        for record in records:
+            self.rows_seen += 1
+            written = self._written.get(record["generator"])
+            if (
+                written is None
+                or now - written[0] >= self.heartbeat
+                or self.changed_columns(written[1], record)
+            ):
+                selected.append(record)
+        return selected
+
+    def mark_written(
+        self,
+        records: Iterable[dict[str, Any]],
+        now: float | None = None,
+    ) -> None:
+        """Use *records* as the reference for later changes."""
+        now = time.monotonic() if now is None else now
+        for record in records:
+            self.rows_written += 1
+            self._written[record["generator"]] = (now, dict(record))
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "rows_seen": self.rows_seen,
+            "rows_written": self.rows_written,
+            "rows_suppressed": self.rows_seen - self.rows_written,
+        }
+
+
+def load_change_detector(config: configparser.ConfigParser) -> ChangeDetector | None:
+    """Build the detector from ``[CHANGE DETECTION]``, or ``None`` if disabled.
+
+    ``Enabled``, ``Heartbeat`` and ``Default_Deadband`` are settings; every
+    other key names a database column and its deadband.
+    """
+    if not config.has_section(CHANGE_DETECTION_SECTION):
+        return None
+    section = config[CHANGE_DETECTION_SECTION]
+    if not section.getboolean("Enabled", fallback=False):
+        return None
+    settings = {"enabled", "heartbeat", "default_deadband"}
+    # Read raw values: relative deadbands such as "2%" are not interpolated.
+    deadbands = {
+        column: parse_deadband(value)
+        for column, value in config.items(CHANGE_DETECTION_SECTION, raw=True)
+        if column.lower() not in settings and column not in config.defaults()
+    }
+    return ChangeDetector(
+        deadbands=deadbands,
+        default=parse_deadband(section.get("Default_Deadband", raw=True, fallback="0")),
+        heartbeat=section.getfloat("Heartbeat", fallback=900.0),
+    )
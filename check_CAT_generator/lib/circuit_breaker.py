@@ -0,0 +1,145 @@
+"""Circuit breaker for a controller that does not answer.
+
+When the Moxa or the controller is down, every request waits the full
+response timeout, repeated for every retry, every method and every cycle.
+A ``CircuitBreaker`` counts consecutive communication failures of one
+controller:
+
+* closed: requests are sent; ``failure_threshold`` failures in a row open it,
+* open: requests fail at once with ``CircuitOpenError``, without any I/O,
+* half-open: after the probe delay, the next request first sends a single
+  one-register probe read.  An answer closes the breaker and the request
+  proceeds; a failure opens it again with the probe delay doubled, up to
+  ``max_probe_delay``.
+
+Timeouts, CRC errors and connection failures count as failures.  A Modbus
+exception response is an answer and counts as a success; a refused bus claim
+(``BusBusyError``) says nothing about the controller and is not counted.
+
+    generator = D300GC(port, circuit_breaker=CircuitBreaker(failure_threshold=3))
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from bus_arbiter import BusBusyError
+from modbus_rtu import GeneratorCommunicationError, ModbusExceptionResponse
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(GeneratorCommunicationError):
+    """The controller was not asked because its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated communication failures of one controller.
+
+    Args:
+        failure_threshold: consecutive failures that open the breaker.
+        probe_delay: seconds until the first probe after the breaker opened.
+        max_probe_delay: longest delay between two probes.
+        backoff_factor: multiplier applied to the delay after a failed probe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        probe_delay: float = 5.0,
+        max_probe_delay: float = 300.0,
+        backoff_factor: float = 2.0,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if probe_delay < 0 or max_probe_delay < probe_delay:
+            raise ValueError("Probe delays must satisfy 0 <= probe_delay <= max_probe_delay")
+        if backoff_factor < 1:
+            raise ValueError("backoff_factor must be at least 1")
+        self.failure_threshold = int(failure_threshold)
+        self.probe_delay = float(probe_delay)
+        self.max_probe_delay = float(max_probe_delay)
+        self.backoff_factor = float(backoff_factor)
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error: str | None = None
+        self._delay = self.probe_delay
+        self._next_probe = 0.0
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+
+    @staticmethod
+    def is_failure(error: BaseException) -> bool:
+        """Return whether *error* shows that the controller did not answer."""
+        return isinstance(error, GeneratorCommunicationError) and not isinstance(
+            error, (ModbusExceptionResponse, BusBusyError, CircuitOpenError)
+        )
+
+    @property
+    def is_open(self) -> bool:
+        """``True`` while requests are refused or a probe is in progress."""
+        return self.state != CLOSED
+
+    def before_request(self) -> bool:
+        """Admit a request; return ``True`` if the caller must probe first.
+
+        Raises ``CircuitOpenError`` while the breaker is open and no probe is
+        due, and while another caller's probe is in progress.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            now = time.monotonic()
+            if self.state == OPEN and now >= self._next_probe:
+                self.state = HALF_OPEN
+                self.probes += 1
+                return True
+            self.rejected += 1
+            wait = max(0.0, self._next_probe - now)
+        raise CircuitOpenError(
+            f"Controller not answering ({self.last_error}); next probe in {wait:.1f} seconds"
+        )
+
+    def record(self, error: BaseException | None = None) -> None:
+        """Record the outcome of a request or probe; ``None`` is a success."""
+        with self._lock:
+            if error is not None and not self.is_failure(error):
+                if not isinstance(error, ModbusExceptionResponse):
+                    # Not a verdict on the controller; probe again next time.
+                    if self.state == HALF_OPEN:
+                        self.state = OPEN
+                    return
+                error = None
+            if error is None:
+                self.state = CLOSED
+                self.failures = 0
+                self._delay = self.probe_delay
+                return
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if self.state == HALF_OPEN:
+                self._delay = min(self.max_probe_delay, self._delay * self.backoff_factor)
+            elif self.state == OPEN or self.failures < self.failure_threshold:
+                return
+            else:
+                self.opened += 1
+            self.state = OPEN
+            self._next_probe = time.monotonic() + self._delay
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "probes": self.probes,
+                "probe_delay_s": round(self._delay, 3),
+                "last_error": self.last_error,
+            }
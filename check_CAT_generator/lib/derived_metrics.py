@@ -0,0 +1,203 @@
+"""Derived generator metrics, maintained incrementally at acquisition time.
+
+Dashboards used to compute per-phase apparent power, current imbalance, load,
+fuel burn rate and energy per interval from the raw columns with window
+queries over the whole generator table.  ``DerivedMetrics`` computes them
+once per readout from the current record and a few values of the previous
+one, kept per generator, and ``main.py`` stores them as columns:
+
+``generator_l1_kva`` .. ``generator_l3_kva``
+    phase-to-neutral voltage times phase current,
+``generator_current_imbalance_pct``
+    largest deviation of a phase current from the mean, in percent of the
+    mean (NEMA MG 1); ``NULL`` below 1 A mean current,
+``generator_load_pct``
+    total real power in percent of the configured ``Rated_Power_kW``,
+``fuel_burn_rate_pct_h``
+    fuel level decrease per hour, exponentially smoothed over
+    ``Fuel_Rate_Window`` seconds; a refill restarts it,
+``generator_interval_kwh``
+    total real power integrated (trapezoidal rule) since the previous row
+    written for the generator, so rows skipped by change detection lose no
+    energy.
+
+Readouts further apart than ``Max_Sample_Gap`` are not bridged: fuel rate and
+energy start again from the later readout.
+"""
+
+from __future__ import annotations
+
+import configparser
+import math
+import time
+from typing import Any, Iterable, Mapping
+
+DERIVED_METRICS_SECTION = "DERIVED METRICS"
+
+DERIVED_COLUMNS = (
+    "generator_l1_kva",
+    "generator_l2_kva",
+    "generator_l3_kva",
+    "generator_current_imbalance_pct",
+    "generator_load_pct",
+    "fuel_burn_rate_pct_h",
+    "generator_interval_kwh",
+)
+
+_PHASES = (
+    ("generator_l1_n_voltage_v", "generator_l1_current_a", "generator_l1_kva"),
+    ("generator_l2_n_voltage_v", "generator_l2_current_a", "generator_l2_kva"),
+    ("generator_l3_n_voltage_v", "generator_l3_current_a", "generator_l3_kva"),
+)
+# Mean phase current below which the imbalance is noise.
+MIN_IMBALANCE_CURRENT_A = 1.0
+
+
+class _GeneratorState:
+    """Values of the previous readout of one generator."""
+
+    __slots__ = (
+        "power_ts",
+        "power_w",
+        "fuel_ts",
+        "fuel_pct",
+        "fuel_rate",
+        "energy_kwh",
+        "integrated",
+    )
+
+    def __init__(self) -> None:
+        self.power_ts = 0.0
+        self.power_w: float | None = None
+        self.fuel_ts = 0.0
+        self.fuel_pct: float | None = None
+        self.fuel_rate: float | None = None
+        # Energy since the last written row, and whether any interval
+        # contributed to it.
+        self.energy_kwh = 0.0
+        self.integrated = False
+
+
+class DerivedMetrics:
+    """Add the derived columns to generator records.
+
+    Args:
+        rated_power_kw: rated real power per generator name; generators
+            without a positive rating get no load percentage.
+        fuel_rate_window: time constant of the fuel burn rate smoothing
+            [seconds].
+        max_sample_gap: longest time between two readouts that is still
+            integrated [seconds].
+    """
+
+    def __init__(
+        self,
+        rated_power_kw: Mapping[str, float] | None = None,
+        fuel_rate_window: float = 900.0,
+        max_sample_gap: float = 300.0,
+    ) -> None:
+        if fuel_rate_window <= 0 or max_sample_gap <= 0:
+            raise ValueError("Fuel_Rate_Window and Max_Sample_Gap must be greater than zero")
+        self.rated_power_kw = {
+            name: float(rating) for name, rating in (rated_power_kw or {}).items() if rating > 0
+        }
+        self.fuel_rate_window = float(fuel_rate_window)
+        self.max_sample_gap = float(max_sample_gap)
+        self._state: dict[str, _GeneratorState] = {}
+
+    def update(self, record: dict[str, Any], now: float | None = None) -> dict[str, Any]:
+        """Add the derived columns to *record*, which must carry ``generator``."""
+        now = time.monotonic() if now is None else now
+        state = self._state.get(record["generator"])
+        if state is None:
+            state = self._state[record["generator"]] = _GeneratorState()
+
+        currents = []
+        for voltage_column, current_column, kva_column in _PHASES:
+            voltage = record.get(voltage_column)
+            current = record.get(current_column)
+            currents.append(current)
+            record[kva_column] = (
+                round(voltage * current / 1000.0, 2)
+                if voltage is not None and current is not None
+                else None
+            )
+        record["generator_current_imbalance_pct"] = self._imbalance(currents)
+
+        power = record.get("generator_total_power_w")
+        rating = self.rated_power_kw.get(record["generator"])
+        record["generator_load_pct"] = (
+            round(power / (rating * 10.0), 1) if power is not None and rating else None
+        )
+        record["fuel_burn_rate_pct_h"] = self._fuel_rate(state, record.get("fuel_level_pct"), now)
+        self._integrate(state, power, now)
+        record["generator_interval_kwh"] = (
+            round(state.energy_kwh, 3) if state.integrated else None
+        )
+        return record
+
+    @staticmethod
+    def _imbalance(currents: list[float | None]) -> float | None:
+        if any(current is None for current in currents):
+            return None
+        mean = sum(currents) / len(currents)
+        if mean < MIN_IMBALANCE_CURRENT_A:
+            return None
+        return round(max(abs(current - mean) for current in currents) * 100.0 / mean, 1)
+
+    def _fuel_rate(self, state: _GeneratorState, level: float | None, now: float) -> float | None:
+        if level is None:
+            return None
+        elapsed = now - state.fuel_ts
+        if state.fuel_pct is None or elapsed > self.max_sample_gap or level > state.fuel_pct:
+            # First readout, a gap, or a refill: start again from here.
+            state.fuel_pct, state.fuel_ts, state.fuel_rate = level, now, None
+            return None
+        if elapsed <= 0:
+            return None if state.fuel_rate is None else round(state.fuel_rate, 2)
+        rate = (state.fuel_pct - level) * 3600.0 / elapsed
+        if state.fuel_rate is None:
+            state.fuel_rate = rate
+        else:
+            weight = 1.0 - math.exp(-elapsed / self.fuel_rate_window)
+            state.fuel_rate += weight * (rate - state.fuel_rate)
+        state.fuel_pct, state.fuel_ts = level, now
+        return round(state.fuel_rate, 2)
+
+    def _integrate(self, state: _GeneratorState, power: float | None, now: float) -> None:
+        if (
+            power is not None
+            and state.power_w is not None
+            and 0 < now - state.power_ts <= self.max_sample_gap
+        ):
+            state.energy_kwh += (state.power_w + power) / 2.0 * (now - state.power_ts) / 3.6e6
+            state.integrated = True
+        state.power_w, state.power_ts = power, now
+
+    def mark_written(self, records: Iterable[dict[str, Any]]) -> None:
+        """Start the next energy interval of the generators of *records*."""
+        for record in records:
+            state = self._state.get(record["generator"])
+            if state is not None:
+                state.energy_kwh = 0.0
+                state.integrated = False
+
+
+def load_derived_metrics(
+    config: configparser.ConfigParser,
+    rated_power_kw: Mapping[str, float] | None = None,
+) -> DerivedMetrics | None:
+    """Build the derived metrics from the ``[DERIVED METRICS]`` section.
+
+    Returns ``None`` when the section is missing or ``Enabled`` is false.
+    """
+    if not config.has_section(DERIVED_METRICS_SECTION):
+        return None
+    section = config[DERIVED_METRICS_SECTION]
+    if not section.getboolean("Enabled", fallback=False):
+        return None
+    return DerivedMetrics(
+        rated_power_kw,
+        fuel_rate_window=section.getfloat("Fuel_Rate_Window", fallback=900.0),
+        max_sample_gap=section.getfloat("Max_Sample_Gap", fallback=300.0),
+    )
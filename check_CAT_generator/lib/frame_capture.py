@@ -0,0 +1,290 @@
+"""Capture of raw Modbus RTU traffic and replay of captured logs.
+
+With a ``FrameCapture`` attached, ``RtuTransport`` writes every request frame
+and the bytes received in reply to a compact binary log.  Each record holds
+its kind, a monotonic timestamp in microseconds since the capture started,
+and the raw bytes:
+
+    file header:  b"GCAP", format version (1 byte), wall-clock start time
+                  (float64 seconds since the epoch), little-endian
+    record:       kind (1 byte), timestamp (uint64 us), length (uint16), bytes
+
+A response record holds exactly what arrived before the transaction ended,
+so a timeout is a response record with no (or too few) bytes, and a CRC error
+is kept with the corrupted bytes.  ``OPEN`` and ``CLOSE`` records mark
+connection changes and carry the port name.
+
+``ReplayTransport`` feeds a log back into ``D300GC``: each request must match
+the next captured request, and the captured response is decoded by the same
+``RtuFrameCodec`` path as live traffic.  Replay runs at full speed by default,
+or at the captured pace with ``pace=1.0``.
+
+    capture = FrameCapture("var/capture/moxa.gcap")
+    generator = D300GC(port="socket://moxa:4001", capture=capture)
+    ...
+    replay = D300GC(transport=ReplayTransport("var/capture/moxa.gcap"))
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, TypeVar
+
+from modbus_rtu import (
+    GeneratorCommunicationError,
+    GeneratorProtocolError,
+    RtuFrameCodec,
+)
+from modbus_statistics import TransactionStatistics
+from modbus_transport import CAPTURE_CLOSE, CAPTURE_OPEN, ModbusTransport
+
+_T = TypeVar("_T")
+
+CAPTURE_MAGIC = b"GCAP"
+CAPTURE_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sBd")
+_RECORD_HEADER = struct.Struct("<BQH")
+
+REQUEST = 1
+RESPONSE = 2
+OPEN = CAPTURE_OPEN
+CLOSE = CAPTURE_CLOSE
+RECORD_KINDS = {REQUEST: "request", RESPONSE: "response", OPEN: "open", CLOSE: "close"}
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    """One record of a capture log; *ts* is seconds since the capture started."""
+
+    kind: int
+    ts: float
+    data: bytes
+
+    @property
+    def kind_name(self) -> str:
+        return RECORD_KINDS.get(self.kind, f"kind {self.kind}")
+
+
+class FrameCapture:
+    """Append request and response frames to a capture log.
+
+    The log is flushed after every response, so a capture survives a crash
+    of the monitor.  One capture may be shared by the generators of a port;
+    writes are serialised.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO | None = self.path.open("wb")
+        self._file.write(_FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def record(self, kind: int, data: bytes | bytearray | memoryview, flush: bool = False) -> None:
+        """Append one record stamped with the current monotonic time."""
+        elapsed_us = int((time.monotonic() - self._started) * 1_000_000)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD_HEADER.pack(kind, elapsed_us, len(data)))
+            self._file.write(data)
+            self.records += 1
+            if flush:
+                self._file.flush()
+
+    def request(self, frame: bytes) -> None:
+        self.record(REQUEST, frame)
+
+    def response(self, data: bytes | bytearray | memoryview) -> None:
+        self.record(RESPONSE, data, flush=True)
+
+    def mark(self, kind: int, port: str) -> None:
+        self.record(kind, port.encode("utf-8", "replace"), flush=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_capture(path: str | Path) -> Iterator[CapturedFrame]:
+    """Yield the records of a capture log in order."""
+    with Path(path).open("rb") as log:
+        header = log.read(_FILE_HEADER.size)
+        if len(header) != _FILE_HEADER.size:
+            raise ValueError(f"{path} is not a capture log")
+        magic, version, _ = _FILE_HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise ValueError(f"{path} is not a version {CAPTURE_VERSION} capture log")
+        while True:
+            record = log.read(_RECORD_HEADER.size)
+            if not record:
+                return
+            if len(record) != _RECORD_HEADER.size:
+                # The monitor stopped while writing; the record is incomplete.
+                return
+            kind, elapsed_us, size = _RECORD_HEADER.unpack(record)
+            data = log.read(size)
+            if len(data) != size:
+                return
+            yield CapturedFrame(kind, elapsed_us / 1_000_000, data)
+
+
+def capture_start_time(path: str | Path) -> float:
+    """Return the wall-clock time at which a capture log was started."""
+    with Path(path).open("rb") as log:
+        magic, version, started = _FILE_HEADER.unpack(log.read(_FILE_HEADER.size))
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError(f"{path} is not a version {CAPTURE_VERSION} capture log")
+    return started
+
+
+class ReplayTransport(ModbusTransport):
+    """Answer transactions from a capture log instead of a controller.
+
+    Args:
+        path: capture log written by ``FrameCapture``.
+        pace: 0 replays as fast as possible; 1.0 waits for the captured
+            request times, 2.0 runs twice as fast, and so on.
+        strict: when true, each request must be the next captured request.
+            Otherwise responses are looked up by request frame, in captured
+            order per frame, so a changed read schedule can be replayed.
+        loop: start again from the beginning of the log when it is exhausted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        pace: float = 0.0,
+        strict: bool = True,
+        loop: bool = False,
+    ) -> None:
+        if pace < 0:
+            raise ValueError("pace must not be negative")
+        self.path = Path(path)
+        self.pace = float(pace)
+        self.strict = bool(strict)
+        self.loop = bool(loop)
+        self._exchanges = self._load_exchanges()
+        if not self._exchanges:
+            raise ValueError(f"{path} contains no request/response exchanges")
+        self._codec = RtuFrameCodec()
+        self._lock = threading.Lock()
+        self._open = False
+        self._position = 0
+        self._by_request: dict[bytes, deque[tuple[float, float, bytes]]] = {}
+        self._replay_started = 0.0
+        self.transactions = TransactionStatistics(request_size=8, response_overhead=5)
+
+    def _load_exchanges(self) -> list[tuple[float, bytes, float, bytes]]:
+        """Pair every request with the response record that follows it."""
+        exchanges = []
+        request: CapturedFrame | None = None
+        for frame in read_capture(self.path):
+            if frame.kind == REQUEST:
+                request = frame
+            elif frame.kind == RESPONSE and request is not None:
+                exchanges.append((request.ts, request.data, frame.ts, frame.data))
+                request = None
+        return exchanges
+
+    def _rewind(self) -> None:
+        self._position = 0
+        self._by_request = {}
+        for sent, request, received, response in self._exchanges:
+            self._by_request.setdefault(request, deque()).append((sent, received, response))
+        self._replay_started = time.monotonic()
+
+    def open(self) -> bool:
+        with self._lock:
+            self._rewind()
+            self._open = True
+        return True
+
+    def close(self) -> bool:
+        self._open = False
+        return True
+
+    def is_open(self) -> bool:
+        return self._open
+
+    @property
+    def remaining(self) -> int:
+        """Captured exchanges not replayed yet, in strict mode."""
+        return len(self._exchanges) - self._position
+
+    def _next_exchange(self, request: bytes) -> tuple[float, float, bytes]:
+        if self.strict:
+            if self._position >= len(self._exchanges):
+                if not self.loop:
+                    raise GeneratorCommunicationError("Replay log exhausted")
+                self._rewind()
+            sent, captured, received, response = self._exchanges[self._position]
+            if captured != request:
+                raise GeneratorProtocolError(
+                    f"Replay diverged at exchange {self._position}: request "
+                    f"{request.hex()} does not match captured {captured.hex()}"
+                )
+            self._position += 1
+            return sent, received, response
+
+        queue = self._by_request.get(request)
+        if not queue:
+            if not self.loop or request not in {exchange[1] for exchange in self._exchanges}:
+                raise GeneratorProtocolError(f"Request {request.hex()} was not captured")
+            self._rewind()
+            queue = self._by_request[request]
+        return queue.popleft()
+
+    def transact(
+        self,
+        slave_id: int,
+        function: int,
+        address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        if not self._open:
+            raise GeneratorCommunicationError("Replay transport is not open")
+        request = self._codec.request(slave_id, function, address, count)
+        with self._lock:
+            sent, received, response = self._next_exchange(request)
+            if self.pace:
+                # Wait for the captured request time, scaled by the pace.
+                wait = (
+                    self._replay_started
+                    + (sent - self._exchanges[0][0]) / self.pace
+                    - time.monotonic()
+                )
+                if wait > 0:
+                    time.sleep(wait)
+            failure: BaseException | None = None
+            try:
+                payload = self._codec.read_response(
+                    io.BytesIO(response), slave_id, function, count
+                )
+                return decode(payload)
+            except BaseException as error:
+                failure = error
+                raise
+            finally:
+                self.transactions.record(
+                    function, address, count, received - sent, error=failure
+                )
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "transport": "replay",
+            "capture": str(self.path),
+            "exchanges": len(self._exchanges),
+            "remaining": self.remaining if self.strict else None,
+        }
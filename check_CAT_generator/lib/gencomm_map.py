@@ -0,0 +1,435 @@
+"""Declarative GenComm register map for the D300GC generator controller.
+
+``GENERATOR_FIELDS`` lists every value that is stored in the generator table
+or exercised by ``test_generator_readout.py``.  Register fields name their
+GenComm page, offset, width, signedness, and scale.  Derived fields have no
+page; ``D300GC`` computes them from register fields or the alarm page.
+
+The register fields are compiled once into ``GENERATOR_READ_PLAN``.  The plan
+merges nearby offsets on the same page into as few Modbus requests as possible
+and precomputes, for each request, a single ``struct`` format that extracts
+every field from the response payload plus a decode closure per field.  Adding
+a field to the table therefore never adds a serial transaction unless it lives
+on a page, or in a part of a page, that is not read yet.
+
+Each register field also belongs to a polling tier.  ``GENERATOR_TIER_PLANS``
+holds one plan per tier so that slow-changing values can be read less often.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable
+
+
+PAGE_SIZE = 256
+MAX_READ_REGISTERS = 125
+
+# Largest run of unused registers that is still read to avoid an extra request.
+# One unused register costs two bytes on the wire; one extra transaction costs
+# a full round trip plus the request delay.
+DEFAULT_MAX_GAP = 32
+
+# Polling tiers.  Fast fields are read every recording cycle; slow fields,
+# such as accumulated counters that change by small steps, on a longer
+# interval, with their last values carried forward in between.
+TIER_FAST = "fast"
+TIER_SLOW = "slow"
+TIERS = (TIER_FAST, TIER_SLOW)
+
+SENTINEL_NAMES = {
+    0: "unimplemented",
+    1: "over measurable range",
+    2: "under measurable range",
+    3: "transducer fault",
+    4: "bad data",
+    5: "high digital input",
+    6: "low digital input",
+    7: "reserved",
+}
+
+
+@dataclass(frozen=True)
+class GenCommField:
+    """One generator value and, for register fields, its GenComm location."""
+
+    name: str
+    label: str
+    page: int | None = None
+    offset: int = 0
+    bits: int = 16
+    signed: bool = False
+    scale: float = 1.0
+    column: str | None = None
+    method: str | None = None
+    unit: str = ""
+    minimum: float | None = None
+    maximum: float | None = None
+    allow_none: bool = True
+    tier: str = TIER_FAST
+
+    @property
+    def is_register(self) -> bool:
+        return self.page is not None
+
+    @property
+    def register_count(self) -> int:
+        return self.bits // 16
+
+
+GENERATOR_FIELDS = (
+    GenCommField(
+        "communication_status", "Communication status",
+        column="communication_status", method="read_communication_status",
+        allow_none=False,
+    ),
+    GenCommField("status_flags", "Controller status flags", page=3, offset=6),
+    GenCommField(
+        "overall_status", "Overall status",
+        column="overall_status", method="read_overall_status", allow_none=False,
+    ),
+    GenCommField(
+        "control_mode_code", "Control mode code", page=3, offset=4,
+        column="control_mode_code", method="read_control_mode_code",
+        minimum=0, maximum=7,
+    ),
+    GenCommField(
+        "control_mode", "Control mode",
+        column="control_mode", method="read_control_mode", allow_none=False,
+    ),
+    GenCommField(
+        "auto_start_enabled", "Automatic start enabled",
+        column="auto_start_enabled", method="read_auto_start_enabled",
+    ),
+    # D300GC controller allocation: page 190, offset 19 is the live
+    # bus-breaker LED state.
+    GenCommField("transfer_led", "Transfer LED state", page=190, offset=19),
+    GenCommField(
+        "transfer_to_generator", "Transferred to generator",
+        column="transfer_to_generator", method="read_transfer_to_generator",
+    ),
+    GenCommField(
+        "transfer_status", "Transfer status",
+        column="transfer_status", method="read_transfer_status", allow_none=False,
+    ),
+    GenCommField(
+        "engine_state_code", "Engine state code", page=5, offset=128,
+        column="engine_state_code", method="read_engine_state_code",
+        minimum=0, maximum=15,
+    ),
+    GenCommField(
+        "engine_state", "Engine state",
+        column="engine_state", method="read_engine_state", allow_none=False,
+    ),
+    GenCommField(
+        "oil_pressure_kpa", "Oil pressure", page=4, offset=0,
+        column="oil_pressure_kpa", method="read_oil_pressure",
+        unit="kPa", minimum=0, maximum=10000,
+    ),
+    GenCommField(
+        "coolant_temperature_c", "Coolant temperature", page=4, offset=1,
+        signed=True, column="coolant_temperature_c",
+        method="read_coolant_temperature", unit="deg C", minimum=-50, maximum=200,
+    ),
+    GenCommField(
+        "oil_temperature_c", "Oil temperature", page=4, offset=2, signed=True,
+        column="oil_temperature_c", method="read_oil_temperature",
+        unit="deg C", minimum=-50, maximum=200,
+    ),
+    GenCommField(
+        "fuel_level_pct", "Fuel level", page=4, offset=3,
+        column="fuel_level_pct", method="read_fuel_level",
+        unit="%", minimum=0, maximum=130,
+    ),
+    GenCommField(
+        "charge_alternator_voltage_v", "Charge alternator voltage", page=4,
+        offset=4, scale=0.1, column="charge_alternator_voltage_v",
+        method="read_charge_alternator_voltage", unit="V", minimum=0, maximum=40,
+    ),
+    GenCommField(
+        "battery_voltage_v", "Starter battery voltage", page=4, offset=5,
+        scale=0.1, column="battery_voltage_v", method="read_battery_voltage",
+        unit="V", minimum=0, maximum=40,
+    ),
+    GenCommField(
+        "engine_speed_rpm", "Engine speed", page=4, offset=6,
+        column="engine_speed_rpm", method="read_engine_speed",
+        unit="RPM", minimum=0, maximum=6000,
+    ),
+    GenCommField(
+        "generator_frequency_hz", "Generator frequency", page=4, offset=7,
+        scale=0.1, column="generator_frequency_hz",
+        method="read_generator_frequency", unit="Hz", minimum=0, maximum=70,
+    ),
+    GenCommField(
+        "generator_l1_n_voltage_v", "Generator L1-N voltage", page=4, offset=8,
+        bits=32, scale=0.1, column="generator_l1_n_voltage_v",
+        method="read_generator_l1_n_voltage", unit="V", minimum=0, maximum=18000,
+    ),
+    GenCommField(
+        "generator_l2_n_voltage_v", "Generator L2-N voltage", page=4, offset=10,
+        bits=32, scale=0.1, column="generator_l2_n_voltage_v",
+        method="read_generator_l2_n_voltage", unit="V", minimum=0, maximum=18000,
+    ),
+    GenCommField(
+        "generator_l3_n_voltage_v", "Generator L3-N voltage", page=4, offset=12,
+        bits=32, scale=0.1, column="generator_l3_n_voltage_v",
+        method="read_generator_l3_n_voltage", unit="V", minimum=0, maximum=18000,
+    ),
+    GenCommField(
+        "generator_l1_current_a", "Generator L1 current", page=4, offset=20,
+        bits=32, scale=0.1, column="generator_l1_current_a",
+        method="read_generator_l1_current", unit="A", minimum=0, maximum=99999.9,
+    ),
+    GenCommField(
+        "generator_l2_current_a", "Generator L2 current", page=4, offset=22,
+        bits=32, scale=0.1, column="generator_l2_current_a",
+        method="read_generator_l2_current", unit="A", minimum=0, maximum=99999.9,
+    ),
+    GenCommField(
+        "generator_l3_current_a", "Generator L3 current", page=4, offset=24,
+        bits=32, scale=0.1, column="generator_l3_current_a",
+        method="read_generator_l3_current", unit="A", minimum=0, maximum=99999.9,
+    ),
+    GenCommField(
+        "generator_total_power_w", "Generator total real power", page=6,
+        offset=0, bits=32, signed=True, column="generator_total_power_w",
+        method="read_generator_total_power", unit="W",
+        minimum=-99999999, maximum=99999999,
+    ),
+    GenCommField(
+        "generator_power_factor", "Generator power factor", page=6, offset=21,
+        signed=True, scale=0.01, column="generator_power_factor",
+        method="read_generator_power_factor", minimum=-1, maximum=1,
+    ),
+    GenCommField(
+        "engine_run_time_s", "Engine run time", page=7, offset=6, bits=32,
+        column="engine_run_time_s", method="read_engine_run_time",
+        unit="s", minimum=0, maximum=4294967295,
+        tier=TIER_SLOW,
+    ),
+    GenCommField(
+        "number_of_starts", "Number of starts", page=7, offset=16, bits=32,
+        column="number_of_starts", method="read_number_of_starts",
+        minimum=0, maximum=99999,
+        tier=TIER_SLOW,
+    ),
+    GenCommField(
+        "generator_positive_kwh", "Generator positive energy", page=7, offset=8,
+        bits=32, scale=0.1, column="generator_positive_kwh",
+        method="read_generator_positive_kwh",
+        unit="kWh", minimum=0, maximum=429496729.5,
+        tier=TIER_SLOW,
+    ),
+    GenCommField(
+        "named_alarm_count", "Implemented named alarms",
+        method="read_named_alarm_count", minimum=0, maximum=256,
+    ),
+    GenCommField(
+        "active_alarm_count", "Active alarm count",
+        column="active_alarm_count", method="read_active_alarm_count",
+        minimum=0, maximum=256,
+    ),
+    GenCommField(
+        "alarm_codes", "Alarm condition codes",
+        method="read_alarm_codes", allow_none=False,
+    ),
+    GenCommField(
+        "active_alarm_mask", "Active alarm mask",
+        column="active_alarm_mask", method="read_active_alarm_mask", allow_none=False,
+    ),
+    GenCommField(
+        "active_alarms", "Active alarms",
+        method="read_active_alarms", allow_none=False,
+    ),
+)
+
+FIELDS_BY_NAME = {field.name: field for field in GENERATOR_FIELDS}
+
+# Database column order used by MySQL_com.write_generator().
+GENERATOR_DATA_COLUMNS = tuple(
+    field.column for field in GENERATOR_FIELDS if field.column is not None
+)
+
+# A decoder turns the raw, sign-extended register value of one field into
+# ``(value, sentinel reason)``.  Exactly one element of the pair is ``None``.
+Decoder = Callable[[int], "tuple[int | float | None, str | None]"]
+
+
+@lru_cache(maxsize=None)
+def value_decoder(bits: int = 16, signed: bool = False, scale: float = 1.0) -> Decoder:
+    """Return the decode closure for one register width/signedness/scale."""
+    sentinel_base = (1 << (bits - 1)) - 1 if signed else (1 << bits) - 1
+    sentinel_floor = sentinel_base - 7
+
+    def decode(raw: int) -> tuple[int | float | None, str | None]:
+        # Sentinels occupy the top eight values of the positive range, so
+        # sign-extended negative readings can never be mistaken for one.
+        if raw >= sentinel_floor:
+            return None, SENTINEL_NAMES[sentinel_base - raw]
+        return (raw if scale == 1 else raw * scale), None
+
+    return decode
+
+
+_STRUCT_CODES = {
+    (16, False): "H",
+    (16, True): "h",
+    (32, False): "I",
+    (32, True): "i",
+}
+
+
+@dataclass(frozen=True)
+class ReadBlock:
+    """One function-03 request and the fields decoded from its response."""
+
+    page: int
+    offset: int
+    count: int
+    fields: tuple[GenCommField, ...]
+    layout: struct.Struct
+    decoders: tuple[Decoder, ...]
+
+    @property
+    def address(self) -> int:
+        return self.page * PAGE_SIZE + self.offset
+
+    def decode(self, payload: bytes) -> list[tuple[GenCommField, int | float | None, str | None]]:
+        """Decode every field from the response data bytes of this block."""
+        return [
+            (field, *decoder(raw))
+            for field, decoder, raw in zip(
+                self.fields, self.decoders, self.layout.unpack_from(payload)
+            )
+        ]
+
+
+@dataclass(frozen=True)
+class ReadPlan:
+    """Ordered read blocks covering a set of register fields."""
+
+    blocks: tuple[ReadBlock, ...]
+
+    @property
+    def field_names(self) -> tuple[str, ...]:
+        return tuple(field.name for block in self.blocks for field in block.fields)
+
+
+def _compile_block(page: int, fields: list[GenCommField]) -> ReadBlock:
+    first_offset = fields[0].offset
+    layout = [">"]
+    position = first_offset
+    for field in fields:
+        if field.offset < position:
+            raise ValueError(f"GenComm field {field.name} overlaps another field")
+        try:
+            code = _STRUCT_CODES[(field.bits, field.signed)]
+        except KeyError:
+            raise ValueError(f"Unsupported register width for {field.name}") from None
+        if field.offset > position:
+            layout.append(f"{(field.offset - position) * 2}x")
+        layout.append(code)
+        position = field.offset + field.register_count
+    return ReadBlock(
+        page=page,
+        offset=first_offset,
+        count=position - first_offset,
+        fields=tuple(fields),
+        layout=struct.Struct("".join(layout)),
+        decoders=tuple(
+            value_decoder(field.bits, field.signed, field.scale) for field in fields
+        ),
+    )
+
+
+def compile_read_plan(
+    fields: Iterable[GenCommField],
+    max_gap: int = DEFAULT_MAX_GAP,
+    max_registers: int = MAX_READ_REGISTERS,
+) -> ReadPlan:
+    """Merge register fields into the fewest requests allowed by the limits.
+
+    Fields on the same page are combined into one block when the unused
+    registers between them do not exceed *max_gap* and the block stays within
+    *max_registers*.  Blocks never cross a page boundary.
+    """
+    by_page: dict[int, list[GenCommField]] = {}
+    for field in fields:
+        if not field.is_register:
+            raise ValueError(f"GenComm field {field.name} has no register location")
+        if field.offset < 0 or field.offset + field.register_count > PAGE_SIZE:
+            raise ValueError(f"GenComm field {field.name} lies outside its page")
+        by_page.setdefault(field.page, []).append(field)
+
+    blocks = []
+    for page in sorted(by_page):
+        group: list[GenCommField] = []
+        for field in sorted(by_page[page], key=lambda item: item.offset):
+            if group:
+                group_start = group[0].offset
+                group_end = group[-1].offset + group[-1].register_count
+                field_end = field.offset + field.register_count
+                if (
+                    field.offset - group_end > max_gap
+                    or field_end - group_start > max_registers
+                ):
+                    blocks.append(_compile_block(page, group))
+                    group = []
+            group.append(field)
+        blocks.append(_compile_block(page, group))
+    return ReadPlan(tuple(blocks))
+
+
+@lru_cache(maxsize=None)
+def page_read_ranges(
+    page: int,
+    offset: int = 0,
+    count: int = PAGE_SIZE,
+    max_registers: int = MAX_READ_REGISTERS,
+) -> tuple[tuple[int, int], ...]:
+    """Split registers of one page into the fewest ``(address, count)`` reads.
+
+    A whole page takes three requests: 125, 125 and 6 registers.
+    """
+    if offset < 0 or count < 1 or offset + count > PAGE_SIZE:
+        raise ValueError("Register range must lie within one GenComm page")
+    address = page * PAGE_SIZE + offset
+    end = address + count
+    return tuple(
+        (start, min(max_registers, end - start))
+        for start in range(address, end, max_registers)
+    )
+
+
+@lru_cache(maxsize=None)
+def field_read_block(name: str) -> ReadBlock:
+    """Return the single-field read block used by the per-value methods."""
+    return compile_read_plan((FIELDS_BY_NAME[name],)).blocks[0]
+
+
+REGISTER_FIELDS = tuple(field for field in GENERATOR_FIELDS if field.is_register)
+GENERATOR_READ_PLAN = compile_read_plan(REGISTER_FIELDS)
+
+# Read plans restricted to the register fields of one polling tier.
+GENERATOR_TIER_PLANS = {
+    tier: compile_read_plan(field for field in REGISTER_FIELDS if field.tier == tier)
+    for tier in TIERS
+}
+
+# Fields read by the transfer watcher between full readouts: the transfer LED
+# and the engine state, one request each.
+WATCH_FIELDS = ("transfer_led", "engine_state_code")
+WATCH_READ_PLAN = compile_read_plan(FIELDS_BY_NAME[name] for name in WATCH_FIELDS)
+
+# Fields sampled by a burst capture after a transfer or an engine start: the
+# instrumentation of pages 4 and 6, one request per page.
+BURST_PAGES = (4, 6)
+BURST_FIELDS = tuple(
+    field.name for field in REGISTER_FIELDS if field.page in BURST_PAGES and field.column
+)
+BURST_READ_PLAN = compile_read_plan(FIELDS_BY_NAME[name] for name in BURST_FIELDS)
+# Database column order used by MySQL_com.write_burst_samples().
+BURST_DATA_COLUMNS = tuple(FIELDS_BY_NAME[name].column for name in BURST_FIELDS)
@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""Local GenComm Modbus RTU controller simulator.
+
+``GenCommSimulator`` answers Modbus RTU function-03 requests from a GenComm
+register image, so ``D300GC``, ``main.py``, ``test_generator_readout.py`` and
+the Nagios checks can be exercised without a generator.  It serves the image
+over TCP, for ``socket://host:port`` ports as used with a transparent Moxa,
+and over a pseudo-terminal that stands in for the Moxa serial device.
+
+The simulated controller behaves like the D300GC on the Moxa:
+
+* registers of pages that are not implemented, and requests crossing into
+  them, are rejected with exception 2 (illegal data address); requests for
+  0 or more than 125 registers with exception 3; other functions with
+  exception 1,
+* values are encoded from the field table in ``gencomm_map``, including the
+  GenComm sentinels for unavailable values,
+* alarms are served from page 154, or from the legacy page 8 with page 154
+  unimplemented,
+* responses are delayed by a configurable latency and, optionally, by the
+  time the frames take on the wire at a given baud rate,
+* a request that arrives less than ``quiet_period`` seconds after the
+  previous response is ignored, as the controller misses requests that follow
+  its response too closely; the client then times out.
+
+Example:
+
+    python3 gencomm_simulator.py --tcp-port 5020 --pty --link /tmp/ttyGEN \\
+        --quiet-period 0.05 --set engine_speed_rpm=0 --alarm 2=shutdown
+    python3 test_generator_readout.py --port socket://127.0.0.1:5020
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+import tty
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping
+
+from gencomm_map import FIELDS_BY_NAME, MAX_READ_REGISTERS, PAGE_SIZE, SENTINEL_NAMES
+from generator_com import D300GCBase
+from modbus_rtu import ModbusExceptionResponse, crc16
+
+FUNCTION_READ_HOLDING_REGISTERS = 3
+EXCEPTION_ILLEGAL_FUNCTION = 1
+EXCEPTION_ILLEGAL_DATA_ADDRESS = 2
+EXCEPTION_ILLEGAL_DATA_VALUE = 3
+
+# A frame other than a function-03 request is complete once the line has been
+# idle this long.
+FRAME_GAP_S = 0.005
+
+_SENTINEL_CODES = {name: code for code, name in SENTINEL_NAMES.items()}
+_CONDITION_CODES = {
+    name: code for code, name in D300GCBase.ALARM_CONDITION_NAMES.items()
+}
+_REQUEST = struct.Struct(">BBHH")
+
+# Field values of a running generator in auto mode, supplying the load.
+DEFAULT_VALUES = {
+    "status_flags": 0,
+    "control_mode_code": 1,
+    "transfer_led": 1,
+    "engine_state_code": 3,
+    "oil_pressure_kpa": 410,
+    "coolant_temperature_c": 82,
+    "oil_temperature_c": 95,
+    "fuel_level_pct": 76,
+    "charge_alternator_voltage_v": 27.9,
+    "battery_voltage_v": 27.4,
+    "engine_speed_rpm": 1800,
+    "generator_frequency_hz": 60.0,
+    "generator_l1_n_voltage_v": 277.1,
+    "generator_l2_n_voltage_v": 276.8,
+    "generator_l3_n_voltage_v": 277.4,
+    "generator_l1_current_a": 120.4,
+    "generator_l2_current_a": 118.9,
+    "generator_l3_current_a": 121.7,
+    "generator_total_power_w": 98500,
+    "generator_power_factor": 0.98,
+    "engine_run_time_s": 1234567,
+    "number_of_starts": 321,
+    "generator_positive_kwh": 45678.9,
+}
+DEFAULT_ALARM_COUNT = 32
+
+
+def encode_field(name: str, value: int | float) -> list[int]:
+    """Return the registers holding *value* in GenComm field *name*."""
+    field = FIELDS_BY_NAME[name]
+    if not field.is_register:
+        raise ValueError(f"GenComm field {name} has no register location")
+    raw = round(value / field.scale)
+    sentinel_floor = ((1 << (field.bits - 1)) - 1 if field.signed else (1 << field.bits) - 1) - 7
+    low = -(1 << (field.bits - 1)) if field.signed else 0
+    if not low <= raw < sentinel_floor:
+        raise ValueError(f"Value {value} does not fit GenComm field {name}")
+    raw &= (1 << field.bits) - 1
+    if field.bits == 32:
+        return [raw >> 16, raw & 0xFFFF]
+    return [raw]
+
+
+def encode_sentinel(name: str, reason: str | int) -> list[int]:
+    """Return the registers of GenComm field *name* reporting a sentinel."""
+    field = FIELDS_BY_NAME[name]
+    if not field.is_register:
+        raise ValueError(f"GenComm field {name} has no register location")
+    code = _SENTINEL_CODES[reason] if isinstance(reason, str) else reason
+    if code not in SENTINEL_NAMES:
+        raise ValueError(f"Unknown GenComm sentinel: {reason!r}")
+    base = (1 << (field.bits - 1)) - 1 if field.signed else (1 << field.bits) - 1
+    raw = base - code
+    if field.bits == 32:
+        return [raw >> 16, raw & 0xFFFF]
+    return [raw]
+
+
+class RegisterImage:
+    """Register values of one simulated controller, by protocol address.
+
+    Only implemented pages can be read; registers of an implemented page that
+    were never set read as zero.  The image may be changed while it is being
+    served.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._registers: dict[int, int] = {}
+        self._pages: set[int] = set()
+        self._page_exceptions: dict[int, int] = {}
+
+    @classmethod
+    def default(
+        cls,
+        alarm_page: int = D300GCBase.PAGE_NAMED_ALARMS,
+        alarm_count: int = DEFAULT_ALARM_COUNT,
+    ) -> "RegisterImage":
+        """Return the image of a running generator without active alarms."""
+        image = cls()
+        for name, value in DEFAULT_VALUES.items():
+            image.set_field(name, value)
+        image.set_alarms({}, alarm_page=alarm_page, alarm_count=alarm_count)
+        return image
+
+    @property
+    def pages(self) -> frozenset[int]:
+        return frozenset(self._pages)
+
+    def implement_page(self, page: int) -> None:
+        with self._lock:
+            self._pages.add(page)
+
+    def remove_page(self, page: int) -> None:
+        """Make *page* unimplemented; reading it raises exception 2."""
+        with self._lock:
+            self._pages.discard(page)
+            base = page * PAGE_SIZE
+            for address in range(base, base + PAGE_SIZE):
+                self._registers.pop(address, None)
+
+    def set_page_exception(self, page: int, code: int | None) -> None:
+        """Answer every request for *page* with exception *code*, or stop doing so."""
+        with self._lock:
+            if code is None:
+                self._page_exceptions.pop(page, None)
+            else:
+                self._page_exceptions[page] = code
+
+    def set_registers(self, page: int, offset: int, registers: Iterable[int]) -> None:
+        with self._lock:
+            self._pages.add(page)
+            address = page * PAGE_SIZE + offset
+            for index, register in enumerate(registers):
+                if not 0 <= register <= 0xFFFF:
+                    raise ValueError(f"Register value out of range: {register}")
+                self._registers[address + index] = register
+
+    def set_field(self, name: str, value: int | float) -> None:
+        field = FIELDS_BY_NAME[name]
+        self.set_registers(field.page, field.offset, encode_field(name, value))
+
+    def set_sentinel(self, name: str, reason: str | int = "unimplemented") -> None:
+        field = FIELDS_BY_NAME[name]
+        self.set_registers(field.page, field.offset, encode_sentinel(name, reason))
+
+    def set_alarms(
+        self,
+        conditions: Mapping[int, int | str],
+        alarm_page: int = D300GCBase.PAGE_NAMED_ALARMS,
+        alarm_count: int | None = None,
+    ) -> None:
+        """Serve the alarm conditions from *alarm_page*.
+
+        *conditions* maps one-based alarm indexes to condition codes or names;
+        other alarms are "not active".  On page 8, page 154 is removed so the
+        client falls back to the legacy layout.
+        """
+        codes = {
+            index: _CONDITION_CODES[code] if isinstance(code, str) else code
+            for index, code in conditions.items()
+        }
+        if alarm_count is None:
+            alarm_count = max(codes, default=0)
+        if any(not 1 <= index <= alarm_count for index in codes):
+            raise ValueError("Alarm index outside the alarm count")
+        digits = [codes.get(index, 1) for index in range(1, alarm_count + 1)]
+        digits += [0] * (-len(digits) % 4)
+        registers = [
+            (digits[i] << 12) | (digits[i + 1] << 8) | (digits[i + 2] << 4) | digits[i + 3]
+            for i in range(0, len(digits), 4)
+        ]
+        for page in (D300GCBase.PAGE_NAMED_ALARMS, D300GCBase.PAGE_ALARMS):
+            self.remove_page(page)
+        self.set_registers(alarm_page, 0, [alarm_count, *registers])
+
+    def read(self, address: int, count: int) -> list[int]:
+        """Return *count* registers, or raise ``ModbusExceptionResponse``."""
+        if not 1 <= count <= MAX_READ_REGISTERS:
+            raise ModbusExceptionResponse(EXCEPTION_ILLEGAL_DATA_VALUE)
+        first_page = address // PAGE_SIZE
+        last_page = (address + count - 1) // PAGE_SIZE
+        with self._lock:
+            for page in range(first_page, last_page + 1):
+                if page in self._page_exceptions:
+                    raise ModbusExceptionResponse(self._page_exceptions[page])
+                if page not in self._pages:
+                    raise ModbusExceptionResponse(EXCEPTION_ILLEGAL_DATA_ADDRESS)
+            return [self._registers.get(address + index, 0) for index in range(count)]
+
+
+@dataclass
+class SimulatorStatistics:
+    requests: int = 0
+    responses: int = 0
+    exceptions: int = 0
+    ignored_quiet_period: int = 0
+    ignored_crc: int = 0
+
+
+class GenCommSimulator:
+    """Serve register images as Modbus RTU slaves over TCP and pseudo-terminals.
+
+    Args:
+        image: register image of the controller at *slave_id*; a default
+            running generator if omitted.
+        slave_id: Modbus address of that controller.  More controllers on the
+            same line are added with ``add_controller()``.
+        latency: seconds between the end of a request and the response.
+        quiet_period: shortest idle time after a response before the next
+            request is answered; earlier requests get no response.
+        baudrate: when set, responses are also delayed by the time the request
+            and response frames take on a line of this speed.
+    """
+
+    def __init__(
+        self,
+        image: RegisterImage | None = None,
+        slave_id: int = 10,
+        latency: float = 0.0,
+        quiet_period: float = 0.0,
+        baudrate: int | None = None,
+    ) -> None:
+        if latency < 0 or quiet_period < 0:
+            raise ValueError("latency and quiet_period must not be negative")
+        self.controllers: dict[int, RegisterImage] = {}
+        self.add_controller(slave_id, image or RegisterImage.default())
+        self.latency = latency
+        self.quiet_period = quiet_period
+        self.baudrate = baudrate
+        self.statistics = SimulatorStatistics()
+        # One RS-485 line: requests on all endpoints are answered one at a time.
+        self._line = threading.Lock()
+        self._last_response = float("-inf")
+        self._closing = threading.Event()
+        self._closers: list[Callable[[], None]] = []
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> "GenCommSimulator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def image(self) -> RegisterImage:
+        """Register image of the first controller."""
+        return next(iter(self.controllers.values()))
+
+    def add_controller(self, slave_id: int, image: RegisterImage) -> None:
+        if not 1 <= slave_id <= 247:
+            raise ValueError("slave_id must be between 1 and 247")
+        self.controllers[slave_id] = image
+
+    # Frame handling ------------------------------------------------------------
+
+    def _wire_time(self, size: int) -> float:
+        # Eleven bit times per byte: start, eight data bits, parity or stop, stop.
+        return size * 11 / self.baudrate if self.baudrate else 0.0
+
+    @staticmethod
+    def _frame(body: bytes) -> bytes:
+        return body + struct.pack("<H", crc16(body))
+
+    def respond(self, frame: bytes) -> bytes | None:
+        """Return the response to one request frame, or ``None`` for no response."""
+        with self._line:
+            self.statistics.requests += 1
+            if len(frame) < 4 or crc16(frame[:-2]) != int.from_bytes(frame[-2:], "little"):
+                self.statistics.ignored_crc += 1
+                return None
+            if time.monotonic() - self._last_response < self.quiet_period:
+                self.statistics.ignored_quiet_period += 1
+                return None
+            slave_id, function = frame[0], frame[1]
+            image = self.controllers.get(slave_id)
+            if image is None:
+                return None
+
+            if function != FUNCTION_READ_HOLDING_REGISTERS or len(frame) != 8:
+                response = self._frame(bytes((slave_id, function | 0x80, EXCEPTION_ILLEGAL_FUNCTION)))
+            else:
+                _, _, address, count = _REQUEST.unpack_from(frame)
+                try:
+                    registers = image.read(address, count)
+                except ModbusExceptionResponse as error:
+                    response = self._frame(bytes((slave_id, function | 0x80, error.code)))
+                else:
+                    response = self._frame(
+                        struct.pack(f">BBB{count}H", slave_id, function, 2 * count, *registers)
+                    )
+            if response[1] & 0x80:
+                self.statistics.exceptions += 1
+            self.statistics.responses += 1
+
+            delay = self.latency + self._wire_time(len(frame) + len(response))
+            if delay:
+                time.sleep(delay)
+            self._last_response = time.monotonic()
+            return response
+
+    def _split_frames(self, buffer: bytearray, idle: bool) -> list[bytes]:
+        """Remove the complete request frames from the start of *buffer*."""
+        frames = []
+        while len(buffer) >= 2:
+            if buffer[1] == FUNCTION_READ_HOLDING_REGISTERS:
+                if len(buffer) < 8:
+                    break
+                frames.append(bytes(buffer[:8]))
+                del buffer[:8]
+            elif idle:
+                frames.append(bytes(buffer))
+                buffer.clear()
+            else:
+                break
+        return frames
+
+    def _serve_stream(
+        self,
+        receive: Callable[[float], bytes | None],
+        send: Callable[[bytes], None],
+    ) -> None:
+        """Answer requests from one byte stream until it closes."""
+        buffer = bytearray()
+        while not self._closing.is_set():
+            data = receive(FRAME_GAP_S if buffer else 0.2)
+            if data == b"":
+                return
+            if data:
+                buffer.extend(data)
+            for frame in self._split_frames(buffer, idle=data is None):
+                response = self.respond(frame)
+                if response is not None:
+                    send(response)
+
+    def _start(self, target: Callable[..., None], *args: Any) -> None:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    # TCP ---------------------------------------------------------------------
+
+    def serve_tcp(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Listen on *host*:*port* and return the ``socket://`` URL to use."""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((host, port))
+        server.listen()
+        server.settimeout(0.2)
+        self._closers.append(server.close)
+        self._start(self._accept, server)
+        return f"socket://{host}:{server.getsockname()[1]}"
+
+    def _accept(self, server: socket.socket) -> None:
+        while not self._closing.is_set():
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._closers.append(connection.close)
+            self._start(self._serve_connection, connection)
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        def receive(timeout: float) -> bytes | None:
+            ready, _, _ = select.select([connection], [], [], timeout)
+            return connection.recv(512) if ready else None
+
+        try:
+            self._serve_stream(receive, connection.sendall)
+        except OSError:
+            pass
+        finally:
+            connection.close()
+
+    # Pseudo-terminal -----------------------------------------------------------
+
+    def serve_pty(self, link: str | None = None) -> str:
+        """Open a pseudo-terminal and return its device path.
+
+        With *link*, a symbolic link to the device is created at that path, for
+        example to stand in for ``/dev/ttyr00``; it is removed by ``close()``.
+        """
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        path = os.ttyname(slave)
+        if link is not None:
+            if os.path.islink(link):
+                os.unlink(link)
+            os.symlink(path, link)
+            self._closers.append(lambda: os.path.islink(link) and os.unlink(link))
+        self._closers.extend((lambda: os.close(master), lambda: os.close(slave)))
+        self._start(self._serve_pty, master)
+        return link or path
+
+    def _serve_pty(self, master: int) -> None:
+        def receive(timeout: float) -> bytes | None:
+            ready, _, _ = select.select([master], [], [], timeout)
+            # Without a client attached, a read error is not the end of the pty.
+            return os.read(master, 512) if ready else None
+
+        def send(data: bytes) -> None:
+            os.write(master, data)
+
+        while not self._closing.is_set():
+            try:
+                self._serve_stream(receive, send)
+            except OSError:
+                if self._closing.wait(0.1):
+                    return
+
+    def close(self) -> None:
+        """Stop serving and release every socket and pseudo-terminal."""
+        self._closing.set()
+        for closer in reversed(self._closers):
+            try:
+                closer()
+            except OSError:
+                pass
+        self._closers.clear()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads.clear()
+
+
+def _assignments(values: list[str], option: str) -> list[tuple[str, str]]:
+    pairs = []
+    for value in values:
+        name, separator, setting = value.partition("=")
+        if not separator:
+            raise SystemExit(f"{option} expects NAME=VALUE, received {value!r}")
+        pairs.append((name.strip(), setting.strip()))
+    return pairs
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Serve a simulated D300GC GenComm controller over TCP and a pty."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="TCP listen address (default: 127.0.0.1)")
+    parser.add_argument(
+        "--tcp-port",
+        type=int,
+        default=5020,
+        help="TCP port for socket:// clients, 0 for any free port, -1 for none (default: 5020)",
+    )
+    parser.add_argument("--pty", action="store_true", help="Also serve a pseudo-terminal")
+    parser.add_argument("--link", help="Symbolic link to create for the pseudo-terminal")
+    parser.add_argument("--slave-id", type=int, default=10, help="Modbus RTU slave ID (default: 10)")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Response latency in seconds (default: 0)",
+    )
+    parser.add_argument(
+        "--quiet-period",
+        type=float,
+        default=0.0,
+        help="Ignore requests sent sooner than this after a response, in seconds (default: 0)",
+    )
+    parser.add_argument("--baudrate", type=int, help="Add the frame time at this baud rate")
+    parser.add_argument(
+        "--alarm-page",
+        type=int,
+        choices=(D300GCBase.PAGE_NAMED_ALARMS, D300GCBase.PAGE_ALARMS),
+        default=D300GCBase.PAGE_NAMED_ALARMS,
+        help="Page serving the alarm conditions (default: 154)",
+    )
+    parser.add_argument(
+        "--alarm-count",
+        type=int,
+        default=DEFAULT_ALARM_COUNT,
+        help=f"Number of implemented alarms (default: {DEFAULT_ALARM_COUNT})",
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="Set a GenComm field, e.g. engine_speed_rpm=0",
+    )
+    parser.add_argument(
+        "--sentinel",
+        action="append",
+        default=[],
+        metavar="FIELD=REASON",
+        help="Report a sentinel, e.g. oil_temperature_c=unimplemented",
+    )
+    parser.add_argument(
+        "--alarm",
+        action="append",
+        default=[],
+        metavar="INDEX=CONDITION",
+        help="Activate an alarm, e.g. 2=shutdown or 2=3",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    image = RegisterImage.default()
+    for name, value in _assignments(args.set, "--set"):
+        image.set_field(name, float(value) if "." in value else int(value))
+    for name, reason in _assignments(args.sentinel, "--sentinel"):
+        image.set_sentinel(name, int(reason) if reason.isdigit() else reason)
+    alarms = {
+        int(index): int(condition) if condition.isdigit() else condition
+        for index, condition in _assignments(args.alarm, "--alarm")
+    }
+    image.set_alarms(alarms, alarm_page=args.alarm_page, alarm_count=args.alarm_count)
+
+    simulator = GenCommSimulator(
+        image,
+        slave_id=args.slave_id,
+        latency=args.latency,
+        quiet_period=args.quiet_period,
+        baudrate=args.baudrate,
+    )
+    try:
+        if args.tcp_port >= 0:
+            print(f"Serving {simulator.serve_tcp(args.host, args.tcp_port)}")
+        if args.pty or args.link:
+            print(f"Serving {simulator.serve_pty(args.link)}")
+        print(f"Slave ID {args.slave_id}, alarm page {args.alarm_page}; Ctrl-C to stop")
+        sys.stdout.flush()
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+        print(f"Simulator statistics: {simulator.statistics}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""Whole-page GenComm snapshots with lazily decoded fields.
+
+``D300GC.read_page()`` fetches all 256 registers of a GenComm page in the
+fewest Modbus requests (three: 125, 125 and 6 registers) and returns a
+``PageSnapshot``.  The snapshot keeps the raw response bytes; a field from
+``GENERATOR_FIELDS`` is decoded only when it is first accessed:
+
+    snapshot = generator.read_pages(D300GC.DIAGNOSTIC_PAGES)
+    snapshot["engine_speed_rpm"]            # decoded now, cached afterwards
+    snapshot.page(4).value(6, bits=32)      # any offset, width and scale
+    snapshot.page(190).registers(16, 4)     # raw register values
+
+A part of a page that the controller rejected with a Modbus exception, usually
+a page it does not implement, is kept as a missing range; its registers read
+as ``None``.  ``ControllerSnapshot.as_dict()`` and ``from_dict()`` convert a
+snapshot to and from the JSON written by the ``--dump`` mode of
+``test_generator_readout.py``, so two controllers or two site surveys can be
+compared offline.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+from gencomm_map import PAGE_SIZE, REGISTER_FIELDS, GenCommField, value_decoder
+
+PAGE_BYTES = PAGE_SIZE * 2
+_PAGE_STRUCT = struct.Struct(f">{PAGE_SIZE}H")
+
+_FIELDS_BY_PAGE: dict[int, dict[str, GenCommField]] = {}
+for _field in REGISTER_FIELDS:
+    _FIELDS_BY_PAGE.setdefault(_field.page, {})[_field.name] = _field
+del _field
+
+
+@dataclass(frozen=True)
+class MissingRange:
+    """Registers of a page that the controller did not return."""
+
+    offset: int
+    count: int
+    error: str
+
+    def covers(self, offset: int, count: int = 1) -> bool:
+        return offset < self.offset + self.count and self.offset < offset + count
+
+
+class PageSnapshot:
+    """The 256 registers of one GenComm page as read at one moment.
+
+    Args:
+        page: GenComm page number.
+        data: the 512 big-endian data bytes of the page.
+        missing: ranges the controller did not return; their bytes are zero.
+        ts: time of the readout.
+    """
+
+    def __init__(
+        self,
+        page: int,
+        data: bytes | bytearray,
+        missing: Sequence[MissingRange] = (),
+        ts: datetime.datetime | None = None,
+    ) -> None:
+        if len(data) != PAGE_BYTES:
+            raise ValueError(f"A GenComm page holds {PAGE_BYTES} data bytes")
+        self.page = page
+        self.data = bytes(data)
+        self.missing = tuple(missing)
+        self.ts = ts or datetime.datetime.now()
+        self._fields = _FIELDS_BY_PAGE.get(page, {})
+        self._decoded: dict[str, tuple[int | float | None, str | None]] = {}
+
+    @property
+    def field_names(self) -> tuple[str, ...]:
+        """Names of the ``GENERATOR_FIELDS`` stored on this page."""
+        return tuple(self._fields)
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    @property
+    def missing_count(self) -> int:
+        """Number of registers the controller did not return."""
+        return sum(missing.count for missing in self.missing)
+
+    def is_available(self, offset: int, count: int = 1) -> bool:
+        """Return whether the registers from *offset* were returned by the controller."""
+        if offset < 0 or count < 1 or offset + count > PAGE_SIZE:
+            raise ValueError("Register range must lie within one GenComm page")
+        return not any(missing.covers(offset, count) for missing in self.missing)
+
+    def register(self, offset: int) -> int | None:
+        """Return the raw value of one register, ``None`` if it is missing."""
+        if not self.is_available(offset):
+            return None
+        return int.from_bytes(self.data[offset * 2 : offset * 2 + 2], byteorder="big")
+
+    def registers(self, offset: int = 0, count: int = PAGE_SIZE) -> list[int | None]:
+        """Return raw register values, ``None`` for missing registers."""
+        if offset < 0 or count < 1 or offset + count > PAGE_SIZE:
+            raise ValueError("Register range must lie within one GenComm page")
+        registers: list[int | None] = list(
+            _PAGE_STRUCT.unpack(self.data)[offset : offset + count]
+        )
+        for missing in self.missing:
+            start = max(missing.offset, offset)
+            end = min(missing.offset + missing.count, offset + count)
+            registers[start - offset : end - offset] = [None] * max(0, end - start)
+        return registers
+
+    def decode(
+        self,
+        offset: int,
+        *,
+        bits: int = 16,
+        signed: bool = False,
+        scale: float = 1.0,
+    ) -> tuple[int | float | None, str | None]:
+        """Decode a value at *offset* as ``(value, sentinel reason)``.
+
+        A missing register decodes as ``(None, None)``.
+        """
+        count = bits // 16
+        if not self.is_available(offset, count):
+            return None, None
+        # GenComm stores the most significant word at the lowest address.
+        raw = int.from_bytes(
+            self.data[offset * 2 : (offset + count) * 2], byteorder="big", signed=signed
+        )
+        return value_decoder(bits, signed, scale)(raw)
+
+    def value(
+        self,
+        offset: int,
+        *,
+        bits: int = 16,
+        signed: bool = False,
+        scale: float = 1.0,
+    ) -> int | float | None:
+        """Return the decoded value at *offset*, ``None`` for sentinels and missing registers."""
+        return self.decode(offset, bits=bits, signed=signed, scale=scale)[0]
+
+    def _decoded_field(self, name: str) -> tuple[int | float | None, str | None]:
+        try:
+            return self._decoded[name]
+        except KeyError:
+            pass
+        try:
+            field = self._fields[name]
+        except KeyError:
+            raise KeyError(f"{name} is not a register field of GenComm page {self.page}") from None
+        decoded = self.decode(
+            field.offset, bits=field.bits, signed=field.signed, scale=field.scale
+        )
+        self._decoded[name] = decoded
+        return decoded
+
+    def __getitem__(self, name: str) -> int | float | None:
+        return self._decoded_field(name)[0]
+
+    def __getattr__(self, name: str) -> int | float | None:
+        if name.startswith("_") or name not in self._fields:
+            raise AttributeError(name)
+        return self[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._fields
+
+    def sentinel(self, name: str) -> str | None:
+        """Return the sentinel reason of field *name*, ``None`` for a valid value."""
+        return self._decoded_field(name)[1]
+
+    def fields(self) -> dict[str, int | float | None]:
+        """Decode every field of this page."""
+        return {name: self[name] for name in self._fields}
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "page": self.page,
+            "ts": self.ts.isoformat(timespec="milliseconds"),
+            "registers": self.registers(),
+            "missing": [
+                {"offset": missing.offset, "count": missing.count, "error": missing.error}
+                for missing in self.missing
+            ],
+            "fields": self.fields(),
+        }
+
+    @classmethod
+    def from_dict(cls, page: Mapping[str, Any]) -> PageSnapshot:
+        registers = page["registers"]
+        if len(registers) != PAGE_SIZE:
+            raise ValueError(f"A GenComm page holds {PAGE_SIZE} registers")
+        return cls(
+            int(page["page"]),
+            _PAGE_STRUCT.pack(*(register or 0 for register in registers)),
+            [MissingRange(**missing) for missing in page.get("missing", ())],
+            datetime.datetime.fromisoformat(page["ts"]),
+        )
+
+
+class ControllerSnapshot:
+    """Page snapshots of one controller, read in one pass."""
+
+    def __init__(
+        self,
+        pages: Iterable[PageSnapshot],
+        port: str | None = None,
+        slave_id: int | None = None,
+        ts: datetime.datetime | None = None,
+    ) -> None:
+        self.pages = {snapshot.page: snapshot for snapshot in pages}
+        self.port = port
+        self.slave_id = slave_id
+        self.ts = ts or datetime.datetime.now()
+
+    def page(self, page: int) -> PageSnapshot:
+        try:
+            return self.pages[page]
+        except KeyError:
+            raise KeyError(f"GenComm page {page} is not part of this snapshot") from None
+
+    def _page_of(self, name: str) -> PageSnapshot:
+        for snapshot in self.pages.values():
+            if name in snapshot:
+                return snapshot
+        raise KeyError(f"{name} is not a register field of the pages in this snapshot")
+
+    def __getitem__(self, name: str) -> int | float | None:
+        return self._page_of(name)[name]
+
+    def __getattr__(self, name: str) -> int | float | None:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def sentinel(self, name: str) -> str | None:
+        return self._page_of(name).sentinel(name)
+
+    def fields(self) -> dict[str, int | float | None]:
+        """Decode every register field on the snapshot pages."""
+        values: dict[str, int | float | None] = {}
+        for snapshot in self.pages.values():
+            values.update(snapshot.fields())
+        return values
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ts": self.ts.isoformat(timespec="milliseconds"),
+            "port": self.port,
+            "slave_id": self.slave_id,
+            "pages": [snapshot.as_dict() for snapshot in self.pages.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, snapshot: Mapping[str, Any]) -> ControllerSnapshot:
+        return cls(
+            (PageSnapshot.from_dict(page) for page in snapshot["pages"]),
+            snapshot.get("port"),
+            snapshot.get("slave_id"),
+            datetime.datetime.fromisoformat(snapshot["ts"]),
+        )
+
+    def write(self, path: str | Path) -> None:
+        """Write the snapshot as JSON to *path*."""
+        with Path(path).open("w", encoding="utf-8") as dump:
+            json.dump(self.as_dict(), dump, indent=1)
+            dump.write("\n")
+
+    @classmethod
+    def load(cls, path: str | Path) -> ControllerSnapshot:
+        """Read a snapshot written by ``write()``."""
+        with Path(path).open(encoding="utf-8") as dump:
+            return cls.from_dict(json.load(dump))
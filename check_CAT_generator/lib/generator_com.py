@@ -12,47 +12,62 @@ used here are zero-based Modbus protocol addresses; a value shown as register
 
 from __future__ import annotations
 
+import datetime
 import math
 import struct
-import threading
 import time
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable, Collection, Iterable, Sequence, TypeVar
 
 import serial
 
-
-class GeneratorCommunicationError(RuntimeError):
-    """Raised when communication with the generator fails."""
-
-
-class GeneratorProtocolError(GeneratorCommunicationError):
-    """Raised when the generator returns an invalid Modbus response."""
-
-
-class ModbusExceptionResponse(GeneratorCommunicationError):
-    """Raised when the generator returns a Modbus exception response."""
-
-    EXCEPTION_NAMES = {
-        1: "illegal function",
-        2: "illegal data address",
-        3: "illegal data value",
-        4: "slave device failure",
-        6: "slave device busy",
-        12: "reserved register",
-    }
-
-    def __init__(self, code: int):
-        self.code = code
-        name = self.EXCEPTION_NAMES.get(code, "unknown exception")
-        super().__init__(f"Modbus exception {code}: {name}")
-
-
-class D300GC:
-    """Read D300GC generator values through a Moxa-backed serial port.
-
-    The class deliberately exposes one method per stored generator value.  A
-    method returns ``None`` when GenComm reports an instrumentation sentinel
-    (unimplemented, out of range, transducer fault, or bad data).
+from alarm_cache import AlarmLayoutCache
+from bus_arbiter import PRIORITY_BULK, PRIORITY_URGENT, BusBusyError, bus_priority
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from frame_capture import FrameCapture
+from gencomm_map import (
+    BURST_READ_PLAN,
+    GENERATOR_FIELDS,
+    GENERATOR_READ_PLAN,
+    GENERATOR_TIER_PLANS,
+    SENTINEL_NAMES,
+    TIER_SLOW,
+    TIERS,
+    WATCH_READ_PLAN,
+    ReadBlock,
+    ReadPlan,
+    field_read_block,
+    page_read_ranges,
+    value_decoder,
+)
+from gencomm_snapshot import PAGE_BYTES, ControllerSnapshot, MissingRange, PageSnapshot
+from modbus_rtu import (
+    GeneratorCommunicationError,
+    GeneratorCrcError,
+    GeneratorProtocolError,
+    GeneratorTimeoutError,
+    ModbusExceptionResponse,
+    crc16,
+)
+from modbus_transport import ModbusTransport, create_transport
+from quiet_period import QuietPeriodTuner
+from register_archive import RegisterImage
+from retry_policy import RetryPolicy
+
+_T = TypeVar("_T")
+
+
+@lru_cache(maxsize=None)
+def _register_struct(count: int) -> struct.Struct:
+    return struct.Struct(f">{count}H")
+
+
+class D300GCBase:
+    """GenComm register map and decoding shared by the D300GC clients.
+
+    ``D300GC`` reads the controller with blocking I/O and
+    ``async_generator_com.AsyncD300GC`` with asyncio; both derive from this
+    class and add the same read methods.
     """
 
     PAGE_SIZE = 256
@@ -72,6 +87,28 @@ class D300GC:
     # LED state. A value of 1 means the load has transferred to generator supply.
     TRANSFER_STATUS_OFFSET = 19
 
+    # Single register read by a half-open circuit breaker, as in is_connected().
+    CIRCUIT_PROBE_ADDRESS = PAGE_BASIC_INSTRUMENTATION * PAGE_SIZE
+
+    # Pages written by a diagnostic dump: every page of the field table and
+    # both alarm pages.
+    DIAGNOSTIC_PAGES = tuple(
+        sorted(
+            {field.page for field in GENERATOR_FIELDS if field.is_register}
+            | {PAGE_ALARMS, PAGE_NAMED_ALARMS}
+        )
+    )
+
+    # Register reads performed by read_generator_data() in block-read mode,
+    # compiled from the declarative field table in gencomm_map.
+    READ_PLAN = GENERATOR_READ_PLAN
+    # Per polling tier, for readouts that skip the slow tier.
+    TIER_PLANS = GENERATOR_TIER_PLANS
+    # Transfer LED and engine state only, for read_transfer_watch().
+    WATCH_PLAN = WATCH_READ_PLAN
+    # Instrumentation of pages 4 and 6, for read_burst_sample().
+    BURST_PLAN = BURST_READ_PLAN
+
     ENGINE_STATE_NAMES = {
         0: "Engine stopped",
         1: "Pre-start",
@@ -122,6 +159,11 @@ class D300GC:
         15: "unimplemented",
     }
     ACTIVE_ALARM_CODES = frozenset((2, 3, 4, 5, 10))
+    # The same codes as the hexadecimal digits used in alarm code strings.
+    ACTIVE_ALARM_DIGITS = frozenset(f"{code:X}" for code in ACTIVE_ALARM_CODES)
+
+    # Modbus exception returned for a page the controller does not implement.
+    MODBUS_ILLEGAL_DATA_ADDRESS = 2
 
     # The first alarms on legacy GenComm page 8.  Controllers can implement more;
     # unknown entries are returned as "Alarm N" rather than discarded.
@@ -213,16 +255,353 @@ class D300GC:
         "High temperature switch",
     )
 
-    SENTINEL_NAMES = {
-        0: "unimplemented",
-        1: "over measurable range",
-        2: "under measurable range",
-        3: "transducer fault",
-        4: "bad data",
-        5: "high digital input",
-        6: "low digital input",
-        7: "reserved",
-    }
+    SENTINEL_NAMES = SENTINEL_NAMES
+
+    @staticmethod
+    def _validate_slave_id(slave_id: int) -> int:
+        slave_id = int(slave_id)
+        if not 1 <= slave_id <= 247:
+            raise ValueError("Modbus slave ID must be between 1 and 247")
+        return slave_id
+
+    @staticmethod
+    def _validate_request(register_address: int, count: int) -> None:
+        if not 0 <= register_address <= 0xFFFF:
+            raise ValueError("Register address must be between 0 and 65535")
+        if not 1 <= count <= 125:
+            raise ValueError("Register count must be between 1 and 125")
+        if register_address + count - 1 > 0xFFFF:
+            raise ValueError("Requested registers exceed the Modbus address range")
+
+    @classmethod
+    def register_address(cls, page: int, offset: int) -> int:
+        """Convert a GenComm page and offset to a zero-based Modbus address."""
+        if page < 0 or offset < 0 or offset >= cls.PAGE_SIZE:
+            raise ValueError("GenComm page must be positive and offset must be 0..255")
+        address = page * cls.PAGE_SIZE + offset
+        if address > 0xFFFF:
+            raise ValueError("Modbus register address is outside the 16-bit range")
+        return address
+
+    @staticmethod
+    def _page_requests(pages: Sequence[int]) -> list[tuple[int, int, int]]:
+        """Return ``(page, address, count)`` of the requests covering *pages*."""
+        return [
+            (page, address, count)
+            for page in pages
+            for address, count in page_read_ranges(page)
+        ]
+
+    def _controller_snapshot(
+        self,
+        buffers: dict[int, bytearray],
+        missing: dict[int, list[MissingRange]],
+        ts: datetime.datetime,
+    ) -> ControllerSnapshot:
+        return ControllerSnapshot(
+            (PageSnapshot(page, data, missing[page], ts) for page, data in buffers.items()),
+            port=self._port_name,
+            slave_id=self._slave_id,
+            ts=ts,
+        )
+
+    def _decode_read_block(
+        self,
+        block: ReadBlock,
+        payload: memoryview,
+        values: dict[str, Any],
+    ) -> None:
+        """Store every field of *block* decoded from *payload* in *values*."""
+        for field, value, sentinel in block.decode(payload):
+            self._set_last_sentinel(field.page, field.offset, sentinel)
+            values[field.name] = value
+
+    def _set_last_sentinel(self, page: int, offset: int, sentinel: str | None) -> None:
+        """Record the sentinel reason of the most recently decoded value."""
+        if sentinel is None:
+            self.last_sentinel = None
+            return
+        self.last_sentinel = {
+            "page": page,
+            "offset": offset,
+            "address": self.register_address(page, offset),
+            "reason": sentinel,
+        }
+
+    @staticmethod
+    def _overall_status_name(flags: int | None) -> str:
+        if flags is None:
+            return "UNKNOWN"
+        if flags & ((1 << 15) | (1 << 13) | (1 << 12) | (1 << 11) | (1 << 6)):
+            return "CRITICAL"
+        if flags & (1 << 10):
+            return "WARNING"
+        return "OK"
+
+    @classmethod
+    def _control_mode_name(cls, code: int | None) -> str:
+        if code is None:
+            return "Unknown"
+        return cls.CONTROL_MODE_NAMES.get(code, f"Reserved ({code})")
+
+    @classmethod
+    def _auto_start_enabled(cls, code: int | None) -> bool | None:
+        if code is None:
+            return None
+        return code in cls.AUTO_START_CONTROL_MODES
+
+    @staticmethod
+    def _transfer_flag(value: int | None) -> bool | None:
+        if value is None:
+            return None
+        if value not in (0, 1):
+            raise GeneratorProtocolError(
+                f"Invalid generator transfer status value: {value}"
+            )
+        return bool(value)
+
+    @staticmethod
+    def _transfer_status_name(transferred: bool | None) -> str:
+        if transferred is None:
+            return "Unknown"
+        if transferred:
+            return "Transferred to generator"
+        return "Not transferred to generator"
+
+    @classmethod
+    def _engine_state_name(cls, code: int | None) -> str:
+        if code is None:
+            return "Unknown"
+        return cls.ENGINE_STATE_NAMES.get(code, f"Unknown ({code})")
+
+    def _alarm_pages(self) -> tuple[int, ...]:
+        """Return the alarm pages to probe, in order of preference."""
+        if self._alarm_page is not None:
+            return (self._alarm_page,)
+        return (self.PAGE_NAMED_ALARMS, self.PAGE_ALARMS)
+
+    def _accept_alarm_count(self, count: int | None) -> bool:
+        """Return whether an alarm count read from a candidate page is usable."""
+        if count is None or (count == 0 and self._alarm_page is None):
+            return False
+        if count > 256:
+            if self._alarm_page is not None:
+                raise GeneratorProtocolError(f"Invalid named alarm count: {count}")
+            return False
+        return True
+
+    def _alarm_cache_key(self) -> str:
+        return AlarmLayoutCache.controller_key(self._port_name, self._slave_id)
+
+    def _cached_alarm_layout(self) -> tuple[int, int] | None:
+        """Return the cached ``(alarm page, alarm count)`` for this controller."""
+        layout = self._alarm_cache.get(self._alarm_cache_key(), self._alarm_page)
+        if layout is not None:
+            self._resolved_alarm_page = layout[0]
+        return layout
+
+    def _remember_alarm_layout(self, page: int, count: int) -> None:
+        self._alarm_cache.store(self._alarm_cache_key(), self._alarm_page, page, count)
+
+    def _forget_alarm_layout(self) -> None:
+        self._alarm_cache.invalidate(self._alarm_cache_key())
+
+    @classmethod
+    def alarm_name(cls, alarm_page: int | None, alarm_index: int) -> str:
+        """Return the name of the one-based *alarm_index* on an alarm page."""
+        alarm_names = (
+            cls.PAGE_154_ALARM_NAMES
+            if alarm_page == cls.PAGE_NAMED_ALARMS
+            else cls.PAGE_8_ALARM_NAMES
+        )
+        if 0 < alarm_index <= len(alarm_names):
+            return alarm_names[alarm_index - 1]
+        return f"Alarm {alarm_index}"
+
+    @staticmethod
+    def _decode_alarm_codes(alarm_count: int, registers: Sequence[int]) -> str:
+        """Return the 4-bit condition codes that follow the alarm count.
+
+        Every register holds four codes, the first alarm in the most
+        significant nibble, so the codes are the register digits in
+        hexadecimal: one digit per alarm.
+        """
+        return "".join([f"{register:04X}" for register in registers])[:alarm_count]
+
+    @classmethod
+    def active_alarm_mask(cls, alarm_codes: str) -> int:
+        """Return a bitmask of the active alarms; bit 0 is alarm 1."""
+        mask = 0
+        for alarm_index, digit in enumerate(alarm_codes):
+            if digit in cls.ACTIVE_ALARM_DIGITS:
+                mask |= 1 << alarm_index
+        return mask
+
+    @classmethod
+    def _active_alarm_list(
+        cls,
+        alarm_page: int | None,
+        alarm_codes: str,
+    ) -> list[dict[str, Any]]:
+        """Describe the active alarms of an alarm code string."""
+        active_alarms: list[dict[str, Any]] = []
+        for alarm_index, digit in enumerate(alarm_codes, start=1):
+            if digit not in cls.ACTIVE_ALARM_DIGITS:
+                continue
+            condition_code = int(digit, 16)
+            active_alarms.append(
+                {
+                    "index": alarm_index,
+                    "name": cls.alarm_name(alarm_page, alarm_index),
+                    "condition_code": condition_code,
+                    "condition": cls.ALARM_CONDITION_NAMES[condition_code],
+                }
+            )
+        return active_alarms
+
+    @classmethod
+    def _decode_active_alarms(
+        cls,
+        alarm_page: int,
+        alarm_count: int,
+        registers: list[int],
+    ) -> list[dict[str, Any]]:
+        """Decode the 4-bit alarm condition codes that follow the alarm count."""
+        return cls._active_alarm_list(
+            alarm_page, cls._decode_alarm_codes(alarm_count, registers)
+        )
+
+    def _tiers_to_read(self, tiers: Collection[str] | None) -> tuple[str, ...]:
+        """Return the requested tiers plus any tier with no values to carry forward."""
+        if tiers is None:
+            return TIERS
+        unknown = set(tiers).difference(TIERS)
+        if unknown:
+            raise ValueError(f"Unknown polling tier: {', '.join(sorted(unknown))}")
+        return tuple(
+            tier for tier in TIERS if tier in tiers or tier not in self._tier_values
+        )
+
+    def _tier_read_plan(self, tiers: tuple[str, ...]) -> ReadPlan:
+        if tiers == TIERS:
+            return self.READ_PLAN
+        return ReadPlan(
+            tuple(block for tier in tiers for block in self.TIER_PLANS[tier].blocks)
+        )
+
+    @staticmethod
+    def _is_bulk_block(block: ReadBlock) -> bool:
+        """Return whether *block* holds only slow-tier fields, read at bulk priority."""
+        return all(field.tier == TIER_SLOW for field in block.fields)
+
+    def _carry_tier_values(
+        self,
+        values: dict[str, Any],
+        tiers_read: tuple[str, ...],
+        failed: Collection[str] = (),
+    ) -> None:
+        """Remember the fields of the tiers just read and fill in the others.
+
+        A tier with *failed* fields is not remembered, so the next readout
+        reads it again.
+        """
+        for tier in TIERS:
+            names = self.TIER_PLANS[tier].field_names
+            if tier not in tiers_read:
+                values.update(self._tier_values[tier])
+            elif any(name in failed for name in names):
+                self._tier_values.pop(tier, None)
+            else:
+                self._tier_values[tier] = {name: values[name] for name in names}
+
+    @staticmethod
+    def _skip_read_block(
+        block: ReadBlock,
+        values: dict[str, Any],
+        field_errors: dict[str, str],
+        error: Exception,
+    ) -> None:
+        """Record a block that could not be read in a partial readout."""
+        for field in block.fields:
+            values[field.name] = None
+            field_errors[field.name] = str(error)
+
+    def _partial_result_allowed(self, error: Exception) -> bool:
+        """Return whether a partial readout may continue after *error*.
+
+        Only failures of a single transaction are tolerated; a closed or
+        failed connection aborts the readout.
+        """
+        return (
+            self._partial_results
+            and isinstance(error, GeneratorCommunicationError)
+            and self.is_open()
+        )
+
+    @staticmethod
+    def _generator_row(
+        values: dict[str, Any],
+        field_errors: dict[str, str] | None,
+    ) -> dict[str, Any]:
+        """Return the database row, with ``field_errors`` if any field failed.
+
+        Besides the database columns, the row carries ``alarm_page`` and the
+        ``alarm_codes`` string from which alarm transitions are derived.
+        """
+        row = {
+            field.column: values[field.name]
+            for field in GENERATOR_FIELDS
+            if field.column is not None
+        }
+        row["alarm_page"] = values["alarm_page"]
+        row["alarm_codes"] = values["alarm_codes"]
+        if field_errors:
+            row["field_errors"] = dict(field_errors)
+        return row
+
+    def _watch_values(self, values: dict[str, Any]) -> dict[str, Any]:
+        """Return the transfer and engine state columns of a watch readout."""
+        transfer_to_generator = self._transfer_flag(values["transfer_led"])
+        return {
+            "transfer_to_generator": transfer_to_generator,
+            "transfer_status": self._transfer_status_name(transfer_to_generator),
+            "engine_state_code": values["engine_state_code"],
+            "engine_state": self._engine_state_name(values["engine_state_code"]),
+        }
+
+    def _derived_values(
+        self,
+        values: dict[str, Any],
+        alarm_codes: str | None,
+    ) -> dict[str, Any]:
+        """Compute the derived GenComm map fields from decoded register fields.
+
+        *alarm_codes* is ``None`` when the alarm page could not be read.
+        """
+        control_mode_code = values["control_mode_code"]
+        transfer_to_generator = self._transfer_flag(values["transfer_led"])
+        mask = None if alarm_codes is None else self.active_alarm_mask(alarm_codes)
+        return {
+            "overall_status": self._overall_status_name(values["status_flags"]),
+            "control_mode": self._control_mode_name(control_mode_code),
+            "auto_start_enabled": self._auto_start_enabled(control_mode_code),
+            "transfer_to_generator": transfer_to_generator,
+            "transfer_status": self._transfer_status_name(transfer_to_generator),
+            "engine_state": self._engine_state_name(values["engine_state_code"]),
+            "alarm_page": None if alarm_codes is None else self._resolved_alarm_page,
+            "alarm_codes": alarm_codes,
+            "active_alarm_count": None if mask is None else bin(mask).count("1"),
+            "active_alarm_mask": None if mask is None else f"{mask:x}",
+        }
+
+
+class D300GC(D300GCBase):
+    """Read D300GC generator values through a Moxa-backed serial port.
+
+    The class deliberately exposes one method per stored generator value.  A
+    method returns ``None`` when GenComm reports an instrumentation sentinel
+    (unimplemented, out of range, transducer fault, or bad data).
+    """
 
     def __init__(
         self,
@@ -232,18 +611,58 @@ class D300GC:
         timeout: float = 1.0,
         alarm_page: int | None = None,
         request_delay: float = 0.1,
+        block_read: bool = True,
+        tcp_keepalive: float = 30.0,
+        quiet_period: QuietPeriodTuner | None = None,
+        transport: ModbusTransport | None = None,
+        max_in_flight: int = 4,
+        alarm_cache: AlarmLayoutCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        partial_results: bool = False,
+        capture: FrameCapture | None = None,
+        bus_lock_directory: str | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        register_images: bool = False,
     ) -> None:
-        self._serial: serial.SerialBase | None = None
         self._port_name = port
         self._slave_id = self._validate_slave_id(slave_id)
         self._baudrate = baudrate
         self._timeout = timeout
         self._request_delay = max(0.0, float(request_delay))
-        self._last_transaction_finished = 0.0
         self._alarm_page = alarm_page
         self._resolved_alarm_page: int | None = alarm_page
-        self._lock = threading.Lock()
+        # Resolved alarm page and count; probed again only after exception 2.
+        self._alarm_cache = alarm_cache if alarm_cache is not None else AlarmLayoutCache()
+        self._block_read = bool(block_read)
+        self._tcp_keepalive = max(0.0, float(tcp_keepalive))
+        # When set, the tuner replaces the fixed request delay.
+        self._quiet_period = quiet_period
+        # Pipelined requests on Modbus TCP transports.
+        self._max_in_flight = int(max_in_flight)
+        # Raw RTU frames are written to this capture log when set.
+        self._capture = capture
+        # Lock files coordinating the port with other processes; see bus_arbiter.
+        self._bus_lock_directory = bus_lock_directory
+        # A supplied transport is used as is; otherwise open() creates one from
+        # the port name and the settings above.
+        self._transport = transport
+        self._owns_transport = transport is None
+        # Transient transaction failures are repeated as the policy allows.
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        # When set, read_generator_data() returns the fields it could read and
+        # reports the others in "field_errors".
+        self._partial_results = bool(partial_results)
+        # When set, requests fail fast while the controller does not answer.
+        self._circuit_breaker = circuit_breaker
+        # When set, read_generator_data() keeps the raw responses of the
+        # readout in last_register_image; see register_archive.
+        self._register_images = bool(register_images)
+        self._image_blocks: dict[int, bytes] | None = None
+        self.last_register_image: RegisterImage | None = None
         self.last_sentinel: dict[str, Any] | None = None
+        # Last register field values per polling tier, carried forward into
+        # readouts that skip the tier.
+        self._tier_values: dict[str, dict[str, Any]] = {}
 
     def __del__(self) -> None:
         try:
@@ -252,13 +671,6 @@ class D300GC:
             # Destructors must never mask the original application error.
             pass
 
-    @staticmethod
-    def _validate_slave_id(slave_id: int) -> int:
-        slave_id = int(slave_id)
-        if not 1 <= slave_id <= 247:
-            raise ValueError("Modbus slave ID must be between 1 and 247")
-        return slave_id
-
     def initialise(
         self,
         port: str | None = None,
@@ -268,7 +680,7 @@ class D300GC:
         request_delay: float | None = None,
     ) -> bool:
         """Set connection parameters without opening the serial device."""
-        if self._serial is not None and self._serial.is_open:
+        if self.is_open():
             self.close()
         if port is not None:
             self._port_name = port
@@ -280,6 +692,11 @@ class D300GC:
             self._timeout = float(timeout)
         if request_delay is not None:
             self._request_delay = max(0.0, float(request_delay))
+        if port is not None or slave_id is not None:
+            self._tier_values.clear()
+        if self._owns_transport:
+            # Rebuilt from the new settings by the next open().
+            self._transport = None
         return True
 
     def open(
@@ -290,24 +707,44 @@ class D300GC:
         timeout: float | None = None,
         request_delay: float | None = None,
     ) -> bool:
-        """Open the Moxa TCP socket using 115200,8,N,1 by default."""
+        """Open the Moxa TCP socket using 115200,8,N,1 by default.
+
+        ``modbus-tcp://host[:port]`` port names use a Modbus TCP gateway
+        instead; see ``modbus_transport``.
+        """
         self.initialise(port, slave_id, baudrate, timeout, request_delay)
-        self._serial = serial.serial_for_url(
-            self._port_name,
-            baudrate=self._baudrate,
-            bytesize=serial.EIGHTBITS,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            timeout=self._timeout,
-            write_timeout=self._timeout,
-        )
-        return self._serial.is_open
+        if self._transport is None:
+            self._transport = create_transport(
+                self._port_name,
+                baudrate=self._baudrate,
+                timeout=self._timeout,
+                request_delay=self._request_delay,
+                tcp_keepalive=self._tcp_keepalive,
+                quiet_period=self._quiet_period,
+                max_in_flight=self._max_in_flight,
+                capture=self._capture,
+                bus_lock_directory=self._bus_lock_directory,
+            )
+        return self._transport.open()
+
+    @property
+    def transport(self) -> ModbusTransport | None:
+        """The transport carrying this controller's Modbus transactions."""
+        return self._transport
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker | None:
+        return self._circuit_breaker
+
+    def is_open(self) -> bool:
+        """Return ``True`` if the serial connection is open, without any I/O."""
+        return self._transport is not None and self._transport.is_open()
 
     def close(self) -> bool:
         """Close the serial connection; calling this repeatedly is safe."""
-        if self._serial is not None and self._serial.is_open:
-            self._serial.close()
-        return self._serial is None or not self._serial.is_open
+        if self._transport is None:
+            return True
+        return self._transport.close()
 
     def reconnect(self) -> bool:
         """Close and reopen the serial connection with the current settings."""
@@ -316,7 +753,7 @@ class D300GC:
 
     def is_connected(self) -> bool:
         """Return ``True`` only if the port is open and the generator responds."""
-        if self._serial is None or not self._serial.is_open:
+        if not self.is_open():
             return False
         try:
             self.read_register(self.register_address(4, 0))
@@ -324,125 +761,280 @@ class D300GC:
             return False
         return True
 
-    @classmethod
-    def register_address(cls, page: int, offset: int) -> int:
-        """Convert a GenComm page and offset to a zero-based Modbus address."""
-        if page < 0 or offset < 0 or offset >= cls.PAGE_SIZE:
-            raise ValueError("GenComm page must be positive and offset must be 0..255")
-        address = page * cls.PAGE_SIZE + offset
-        if address > 0xFFFF:
-            raise ValueError("Modbus register address is outside the 16-bit range")
-        return address
-
     @staticmethod
     def _crc16(data: bytes) -> int:
         """Return the Modbus RTU CRC-16 for *data*."""
-        crc = 0xFFFF
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
-        return crc
-
-    def _read_exactly(self, size: int) -> bytes:
-        if self._serial is None:
-            raise GeneratorCommunicationError("Serial port is not open")
-        data = bytearray()
-        while len(data) < size:
-            chunk = self._serial.read(size - len(data))
-            if not chunk:
-                raise GeneratorCommunicationError(
-                    f"Timed out after receiving {len(data)} of {size} response bytes"
-                )
-            data.extend(chunk)
-        return bytes(data)
-
-    def _validate_crc(self, response: bytes) -> None:
-        if len(response) < 4:
-            raise GeneratorProtocolError("Modbus response is too short")
-        received_crc = int.from_bytes(response[-2:], byteorder="little")
-        calculated_crc = self._crc16(response[:-2])
-        if received_crc != calculated_crc:
-            raise GeneratorProtocolError(
-                f"Invalid Modbus CRC: received 0x{received_crc:04X}, "
-                f"expected 0x{calculated_crc:04X}"
-            )
+        return crc16(data)
 
     def read_register(self, register_address: int, count: int = 1) -> int | list[int]:
         """Read one or more zero-based holding-register addresses (function 03)."""
-        if not 0 <= register_address <= 0xFFFF:
-            raise ValueError("Register address must be between 0 and 65535")
-        if not 1 <= count <= 125:
-            raise ValueError("Register count must be between 1 and 125")
-        if register_address + count - 1 > 0xFFFF:
-            raise ValueError("Requested registers exceed the Modbus address range")
-        if self._serial is None or not self._serial.is_open:
-            raise GeneratorCommunicationError("Serial port is not open")
-
-        request = struct.pack(
-            ">BBHH",
-            self._slave_id,
-            self.FUNCTION_READ_HOLDING_REGISTERS,
+        registers = self._transact(
             register_address,
             count,
+            lambda payload: list(_register_struct(count).unpack_from(payload)),
         )
-        request += struct.pack("<H", self._crc16(request))
-
-        with self._lock:
-            # The controller/Moxa path needs a short quiet period between RTU
-            # transactions. Without it, immediate back-to-back requests can
-            # cause every second request to time out even though its address is
-            # valid. Count time spent by the caller toward the quiet period.
-            elapsed = time.monotonic() - self._last_transaction_finished
-            remaining_delay = self._request_delay - elapsed
-            if remaining_delay > 0:
-                time.sleep(remaining_delay)
+        return registers[0] if count == 1 else registers
 
+    def _transact(
+        self,
+        register_address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        """Perform one function-03 transaction and decode its data bytes.
+
+        *decode* runs inside the transport because the data bytes are a view
+        into the transport's reused receive buffer.
+        """
+        self._validate_request(register_address, count)
+        if not self.is_open():
+            raise GeneratorCommunicationError("Serial port is not open")
+        self._admit_request()
+        if self._image_blocks is not None:
+            decode = self._imaging(register_address, decode)
+        attempt = 0
+        while True:
             try:
-                self._serial.reset_input_buffer()
-                written = self._serial.write(request)
-                self._serial.flush()
-                if written != len(request):
-                    raise GeneratorCommunicationError(
-                        f"Only {written} of {len(request)} request bytes were written"
-                    )
+                result = self._transport.transact(
+                    self._slave_id,
+                    self.FUNCTION_READ_HOLDING_REGISTERS,
+                    register_address,
+                    count,
+                    decode,
+                )
+            except GeneratorCommunicationError as error:
+                attempt += 1
+                if not self._wait_for_retry(error, attempt):
+                    self._record_outcome(error)
+                    raise
+            else:
+                self._record_outcome()
+                return result
+
+    def _keep_image(self, register_address: int, payload: memoryview) -> None:
+        """Copy a response into the register image of the running readout."""
+        if self._image_blocks is not None:
+            self._image_blocks[register_address] = bytes(payload)
+
+    def _imaging(
+        self, register_address: int, decode: Callable[[memoryview], _T]
+    ) -> Callable[[memoryview], _T]:
+        """Wrap *decode* so that the response is also kept in the register image."""
+
+        def decode_and_keep(payload: memoryview) -> _T:
+            self._keep_image(register_address, payload)
+            return decode(payload)
+
+        return decode_and_keep
+
+    def _admit_request(self) -> None:
+        """Fail fast while the circuit breaker is open; send its probe when due.
+
+        The probe is a single one-register read without retries.  A Modbus
+        exception response is an answer as well.
+        """
+        breaker = self._circuit_breaker
+        if breaker is None or not breaker.before_request():
+            return
+        try:
+            self._transport.transact(
+                self._slave_id,
+                self.FUNCTION_READ_HOLDING_REGISTERS,
+                self.CIRCUIT_PROBE_ADDRESS,
+                1,
+                bytes,
+            )
+        except BusBusyError as error:
+            breaker.record(error)
+            raise
+        except GeneratorCommunicationError as error:
+            breaker.record(error)
+            if not isinstance(error, ModbusExceptionResponse):
+                raise CircuitOpenError(f"Circuit breaker probe failed: {error}") from error
+            return
+        breaker.record()
+
+    def _record_outcome(self, error: GeneratorCommunicationError | None = None) -> None:
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record(error)
+
+    def _wait_for_retry(self, error: GeneratorCommunicationError, attempt: int) -> bool:
+        """Wait out the retry backoff and return ``True`` if *attempt* may be repeated."""
+        if not self._retry_policy.should_retry(error, attempt) or not self.is_open():
+            return False
+        time.sleep(self._retry_policy.delay(attempt))
+        return True
 
-                header = self._read_exactly(3)
-                slave, function, third_byte = header
-                if slave != self._slave_id:
-                    raise GeneratorProtocolError(
-                        f"Response came from slave {slave}, expected {self._slave_id}"
-                    )
+    def _transact_blocks(
+        self,
+        blocks: Sequence[ReadBlock],
+        values: dict[str, Any],
+        field_errors: dict[str, str] | None = None,
+        store: Callable[[ReadBlock, memoryview], None] | None = None,
+    ) -> None:
+        """Read and decode several blocks, pipelined if the transport allows.
+
+        A failed block is repeated as the retry policy allows, together with
+        the blocks that have not been answered yet.  With *field_errors*, a
+        block that still fails is recorded there and the others are read.
+        With *store*, each response is passed to it instead of being decoded
+        into *values*.
+        """
+        if not blocks:
+            return
+        for block in blocks:
+            self._validate_request(block.address, block.count)
+        if not self.is_open():
+            raise GeneratorCommunicationError("Serial port is not open")
+        self._admit_request()
+        pending = list(range(len(blocks)))
+        attempts: dict[int, int] = {}
+        while pending:
+            requested = [blocks[index] for index in pending]
+            answered: set[int] = set()
+
+            def decode(index: int, payload: memoryview) -> None:
+                self._keep_image(requested[index].address, payload)
+                if store is None:
+                    self._decode_read_block(requested[index], payload, values)
+                else:
+                    store(requested[index], payload)
+                answered.add(index)
 
-                if function == self.FUNCTION_READ_HOLDING_REGISTERS | 0x80:
-                    response = header + self._read_exactly(2)
-                    self._validate_crc(response)
-                    raise ModbusExceptionResponse(third_byte)
-                if function != self.FUNCTION_READ_HOLDING_REGISTERS:
-                    raise GeneratorProtocolError(
-                        f"Unexpected Modbus function code {function}"
-                    )
+            try:
+                self._transport.transact_many(
+                    self._slave_id,
+                    self.FUNCTION_READ_HOLDING_REGISTERS,
+                    [(block.address, block.count) for block in requested],
+                    decode,
+                )
+                self._record_outcome()
+                return
+            except GeneratorCommunicationError as error:
+                pending = [
+                    index for position, index in enumerate(pending) if position not in answered
+                ]
+                # Transports report the failure of the first unanswered block.
+                failed = pending[0]
+                attempts[failed] = attempts.get(failed, 0) + 1
+                if self._wait_for_retry(error, attempts[failed]):
+                    continue
+                self._record_outcome(error)
+                if field_errors is None or not self._partial_result_allowed(error):
+                    raise
+                self._skip_read_block(blocks[failed], values, field_errors, error)
+                del pending[0]
+
+    @property
+    def request_delay(self) -> float:
+        """Quiet period in seconds applied before the next transaction."""
+        if self._transport is not None:
+            return self._transport.request_delay
+        if self._quiet_period is not None:
+            return self._quiet_period.delay
+        return self._request_delay
+
+    def statistics(self) -> dict[str, Any]:
+        """Return communication statistics for this generator connection."""
+        statistics: dict[str, Any] = {
+            "port": self._port_name,
+            "slave_id": self._slave_id,
+            "request_delay_s": round(self.request_delay, 4),
+        }
+        if self._transport is not None:
+            statistics.update(self._transport.statistics())
+        if self._circuit_breaker is not None:
+            statistics["circuit_breaker"] = self._circuit_breaker.snapshot()
+        return statistics
+
+    def transaction_statistics(self) -> dict[str, Any] | None:
+        """Return per-page transaction counters of the transport, if any.
+
+        A transport shared with other generators reports their transactions
+        as well.
+        """
+        if self._transport is None:
+            return None
+        return self._transport.transaction_statistics()
+
+    def read_block(self, page: int, offset: int, count: int) -> list[int]:
+        """Read *count* consecutive registers starting at a page offset."""
+        if offset + count > self.PAGE_SIZE:
+            raise ValueError("Register block must not cross a GenComm page boundary")
+        registers = self.read_register(self.register_address(page, offset), count)
+        return [registers] if isinstance(registers, int) else registers
+
+    def read_page(self, page: int) -> PageSnapshot:
+        """Read all 256 registers of a GenComm page; fields decode on access."""
+        return self.read_pages((page,)).page(page)
+
+    def read_pages(self, pages: Iterable[int]) -> ControllerSnapshot:
+        """Read whole GenComm pages in one pass, pipelined if the transport allows.
+
+        Every page takes three requests, sent at bulk bus priority.  A request
+        the controller rejects with a Modbus exception, usually because it
+        does not implement the page, leaves its registers missing in the
+        snapshot; other failures are repeated as the retry policy allows and
+        then raised.
+        """
+        pages = tuple(dict.fromkeys(pages))
+        requests = self._page_requests(pages)
+        if not self.is_open():
+            raise GeneratorCommunicationError("Serial port is not open")
+        self._admit_request()
+        ts = datetime.datetime.now()
+        buffers = {page: bytearray(PAGE_BYTES) for page in pages}
+        missing: dict[int, list[MissingRange]] = {page: [] for page in pages}
+        pending = list(range(len(requests)))
+        attempts: dict[int, int] = {}
+        while pending:
+            requested = [requests[index] for index in pending]
+            answered: set[int] = set()
+
+            def decode(index: int, payload: memoryview) -> None:
+                page, address, count = requested[index]
+                start = (address - page * self.PAGE_SIZE) * 2
+                buffers[page][start : start + count * 2] = payload
+                answered.add(index)
 
-                expected_byte_count = count * 2
-                if third_byte != expected_byte_count:
-                    raise GeneratorProtocolError(
-                        f"Response contains {third_byte} data bytes; "
-                        f"expected {expected_byte_count}"
+            try:
+                with bus_priority(PRIORITY_BULK):
+                    self._transport.transact_many(
+                        self._slave_id,
+                        self.FUNCTION_READ_HOLDING_REGISTERS,
+                        [(address, count) for _, address, count in requested],
+                        decode,
                     )
-                response = header + self._read_exactly(third_byte + 2)
-                self._validate_crc(response)
-            finally:
-                self._last_transaction_finished = time.monotonic()
-
-        registers = list(struct.unpack(f">{count}H", response[3:-2]))
-        return registers[0] if count == 1 else registers
-
-    def _sentinel_name(self, raw: int, bits: int, signed: bool) -> str | None:
-        sentinel_base = (1 << (bits - 1)) - 1 if signed else (1 << bits) - 1
-        distance = sentinel_base - raw
-        if 0 <= distance <= 7:
-            return self.SENTINEL_NAMES[distance]
-        return None
+                self._record_outcome()
+                break
+            except GeneratorCommunicationError as error:
+                pending = [
+                    index for position, index in enumerate(pending) if position not in answered
+                ]
+                failed = pending[0]
+                if isinstance(error, ModbusExceptionResponse):
+                    page, address, count = requests[failed]
+                    missing[page].append(
+                        MissingRange(address - page * self.PAGE_SIZE, count, str(error))
+                    )
+                    del pending[0]
+                    continue
+                attempts[failed] = attempts.get(failed, 0) + 1
+                if not self._wait_for_retry(error, attempts[failed]):
+                    self._record_outcome(error)
+                    raise
+        return self._controller_snapshot(buffers, missing, ts)
+
+    def _read_field(self, name: str) -> int | float | None:
+        """Read one register field from the GenComm map with its own request."""
+        block = field_read_block(name)
+        values: dict[str, Any] = {}
+        self._transact(
+            block.address,
+            block.count,
+            lambda payload: self._decode_read_block(block, payload, values),
+        )
+        return values[name]
 
     def _read_value(
         self,
@@ -453,31 +1045,16 @@ class D300GC:
         signed: bool = False,
         scale: float = 1.0,
     ) -> int | float | None:
-        register_count = bits // 16
         address = self.register_address(page, offset)
-        registers = self.read_register(address, register_count)
-        if isinstance(registers, int):
-            registers = [registers]
-
         # GenComm stores the most significant word at the lowest address.
-        raw = 0
-        for register in registers:
-            raw = (raw << 16) | register
-
-        sentinel = self._sentinel_name(raw, bits, signed)
-        if sentinel is not None:
-            self.last_sentinel = {
-                "page": page,
-                "offset": offset,
-                "address": address,
-                "reason": sentinel,
-            }
-            return None
-
-        self.last_sentinel = None
-        if signed and raw & (1 << (bits - 1)):
-            raw -= 1 << bits
-        return raw if scale == 1 else raw * scale
+        raw = self._transact(
+            address,
+            bits // 16,
+            lambda payload: int.from_bytes(payload, byteorder="big", signed=signed),
+        )
+        value, sentinel = value_decoder(bits, signed, scale)(raw)
+        self._set_last_sentinel(page, offset, sentinel)
+        return value
 
     # Page 3 - controller status -------------------------------------------------
 
@@ -487,314 +1064,306 @@ class D300GC:
 
     def read_overall_status(self) -> str:
         """Return an overall OK/WARNING/CRITICAL controller state."""
-        flags = self._read_value(self.PAGE_STATUS, 6)
-        if flags is None:
-            return "UNKNOWN"
-        if flags & ((1 << 15) | (1 << 13) | (1 << 12) | (1 << 11) | (1 << 6)):
-            return "CRITICAL"
-        if flags & (1 << 10):
-            return "WARNING"
-        return "OK"
+        return self._overall_status_name(self._read_field("status_flags"))
 
     def read_control_mode_code(self) -> int | None:
         """Read the unsigned GenComm control-mode code from page 3, offset 4."""
-        return self._read_value(self.PAGE_STATUS, 4)
+        return self._read_field("control_mode_code")
 
     def read_control_mode(self) -> str:
         """Read and translate the generator control mode."""
-        code = self.read_control_mode_code()
-        if code is None:
-            return "Unknown"
-        return self.CONTROL_MODE_NAMES.get(code, f"Reserved ({code})")
+        return self._control_mode_name(self.read_control_mode_code())
 
     def read_auto_start_enabled(self) -> bool | None:
         """Return whether the controller is in an automatic-start mode."""
-        code = self.read_control_mode_code()
-        if code is None:
-            return None
-        return code in self.AUTO_START_CONTROL_MODES
+        return self._auto_start_enabled(self.read_control_mode_code())
 
     # Page 190 - live output status --------------------------------------------
 
     def read_transfer_to_generator(self) -> bool | None:
-        """Return whether the load is transferred to generator supply."""
-        value = self._read_value(
-            self.PAGE_OUTPUT_STATUS,
-            self.TRANSFER_STATUS_OFFSET,
-        )
-        if value is None:
-            return None
-        if value not in (0, 1):
-            raise GeneratorProtocolError(
-                f"Invalid generator transfer status value: {value}"
-            )
-        return bool(value)
+        """Return whether the load is transferred to generator supply.
+
+        The read is queued ahead of other transactions on a busy port.
+        """
+        with bus_priority(PRIORITY_URGENT):
+            return self._transfer_flag(self._read_field("transfer_led"))
 
     def read_transfer_status(self) -> str:
         """Return a readable generator transfer status."""
-        transferred = self.read_transfer_to_generator()
-        if transferred is None:
-            return "Unknown"
-        if transferred:
-            return "Transferred to generator"
-        return "Not transferred to generator"
+        return self._transfer_status_name(self.read_transfer_to_generator())
 
     # Page 4 - basic instrumentation -------------------------------------------
 
     def read_oil_pressure(self) -> int | None:
         """Read oil pressure in kPa (unsigned 16-bit)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 0)
+        return self._read_field("oil_pressure_kpa")
 
     def read_coolant_temperature(self) -> int | None:
         """Read coolant temperature in degrees Celsius (signed 16-bit)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 1, signed=True)
+        return self._read_field("coolant_temperature_c")
 
     def read_oil_temperature(self) -> int | None:
         """Read oil temperature in degrees Celsius (signed 16-bit)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 2, signed=True)
+        return self._read_field("oil_temperature_c")
 
     def read_fuel_level(self) -> int | None:
         """Read fuel level in percent (unsigned 16-bit)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 3)
+        return self._read_field("fuel_level_pct")
 
     def read_charge_alternator_voltage(self) -> float | None:
         """Read charge-alternator voltage in volts (unsigned 16-bit, x0.1)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 4, scale=0.1)
+        return self._read_field("charge_alternator_voltage_v")
 
     def read_battery_voltage(self) -> float | None:
         """Read starter-battery voltage in volts (unsigned 16-bit, x0.1)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 5, scale=0.1)
+        return self._read_field("battery_voltage_v")
 
     def read_engine_speed(self) -> int | None:
         """Read engine speed in RPM (unsigned 16-bit)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 6)
+        return self._read_field("engine_speed_rpm")
 
     def read_generator_frequency(self) -> float | None:
         """Read generator frequency in hertz (unsigned 16-bit, x0.1)."""
-        return self._read_value(self.PAGE_BASIC_INSTRUMENTATION, 7, scale=0.1)
+        return self._read_field("generator_frequency_hz")
 
     def read_generator_l1_n_voltage(self) -> float | None:
         """Read generator L1-N voltage (unsigned 32-bit, x0.1 V)."""
-        return self._read_value(
-            self.PAGE_BASIC_INSTRUMENTATION, 8, bits=32, scale=0.1
-        )
+        return self._read_field("generator_l1_n_voltage_v")
 
     def read_generator_l2_n_voltage(self) -> float | None:
         """Read generator L2-N voltage (unsigned 32-bit, x0.1 V)."""
-        return self._read_value(
-            self.PAGE_BASIC_INSTRUMENTATION, 10, bits=32, scale=0.1
-        )
+        return self._read_field("generator_l2_n_voltage_v")
 
     def read_generator_l3_n_voltage(self) -> float | None:
         """Read generator L3-N voltage (unsigned 32-bit, x0.1 V)."""
-        return self._read_value(
-            self.PAGE_BASIC_INSTRUMENTATION, 12, bits=32, scale=0.1
-        )
+        return self._read_field("generator_l3_n_voltage_v")
 
     def read_generator_l1_current(self) -> float | None:
         """Read generator L1 current (unsigned 32-bit, x0.1 A)."""
-        return self._read_value(
-            self.PAGE_BASIC_INSTRUMENTATION, 20, bits=32, scale=0.1
-        )
+        return self._read_field("generator_l1_current_a")
 
     def read_generator_l2_current(self) -> float | None:
         """Read generator L2 current (unsigned 32-bit, x0.1 A)."""
-        return self._read_value(
-            self.PAGE_BASIC_INSTRUMENTATION, 22, bits=32, scale=0.1
-        )
+        return self._read_field("generator_l2_current_a")
 
     def read_generator_l3_current(self) -> float | None:
         """Read generator L3 current (unsigned 32-bit, x0.1 A)."""
-        return self._read_value(
-            self.PAGE_BASIC_INSTRUMENTATION, 24, bits=32, scale=0.1
-        )
+        return self._read_field("generator_l3_current_a")
 
     # Page 5 - extended instrumentation ----------------------------------------
 
     def read_engine_state_code(self) -> int | None:
         """Read the unsigned GenComm engine operating-state code."""
-        return self._read_value(self.PAGE_EXTENDED_INSTRUMENTATION, 128)
+        return self._read_field("engine_state_code")
 
     def read_engine_state(self) -> str:
         """Read and translate the engine operating-state code."""
-        code = self.read_engine_state_code()
-        if code is None:
-            return "Unknown"
-        return self.ENGINE_STATE_NAMES.get(code, f"Unknown ({code})")
+        return self._engine_state_name(self.read_engine_state_code())
 
     # Page 6 - derived instrumentation -----------------------------------------
 
     def read_generator_total_power(self) -> int | None:
         """Read total generator real power in watts (signed 32-bit)."""
-        return self._read_value(
-            self.PAGE_DERIVED_INSTRUMENTATION, 0, bits=32, signed=True
-        )
+        return self._read_field("generator_total_power_w")
 
     def read_generator_power_factor(self) -> float | None:
         """Read average generator power factor (signed 16-bit, x0.01)."""
-        return self._read_value(
-            self.PAGE_DERIVED_INSTRUMENTATION, 21, signed=True, scale=0.01
-        )
+        return self._read_field("generator_power_factor")
 
     # Page 7 - accumulated instrumentation -------------------------------------
 
     def read_engine_run_time(self) -> int | None:
         """Read accumulated engine run time in seconds (unsigned 32-bit)."""
-        return self._read_value(
-            self.PAGE_ACCUMULATED_INSTRUMENTATION, 6, bits=32
-        )
+        return self._read_field("engine_run_time_s")
 
     def read_generator_positive_kwh(self) -> float | None:
         """Read positive generator energy in kWh (unsigned 32-bit, x0.1)."""
-        return self._read_value(
-            self.PAGE_ACCUMULATED_INSTRUMENTATION, 8, bits=32, scale=0.1
-        )
+        return self._read_field("generator_positive_kwh")
 
     def read_number_of_starts(self) -> int | None:
         """Read the accumulated number of engine starts (unsigned 32-bit)."""
-        return self._read_value(
-            self.PAGE_ACCUMULATED_INSTRUMENTATION, 16, bits=32
-        )
+        return self._read_field("number_of_starts")
 
     # Page 154/page 8 - alarm conditions ----------------------------------------
 
     def read_named_alarm_count(self) -> int | None:
         """Read the number of named alarm conditions implemented by the unit."""
-        pages = (
-            (self._alarm_page,)
-            if self._alarm_page is not None
-            else (self.PAGE_NAMED_ALARMS, self.PAGE_ALARMS)
-        )
-        for page in pages:
+        for page in self._alarm_pages():
             try:
                 count = self._read_value(page, 0)
+            except CircuitOpenError:
+                raise
             except (GeneratorCommunicationError, serial.SerialException, OSError):
                 if self._alarm_page is not None:
                     raise
                 continue
-            if count is None or (count == 0 and self._alarm_page is None):
-                continue
-            if count > 256:
-                if self._alarm_page is not None:
-                    raise GeneratorProtocolError(f"Invalid named alarm count: {count}")
+            if not self._accept_alarm_count(count):
                 continue
             self._resolved_alarm_page = page
+            self._remember_alarm_layout(page, count)
             return count
         self._resolved_alarm_page = None
         return None
 
-    def read_active_alarms(self) -> list[dict[str, Any]]:
-        """Return active warning, trip, shutdown, and indication conditions."""
+    def _read_alarm_codes(self, alarm_page: int, alarm_count: int) -> str:
+        registers = self.read_block(alarm_page, 1, math.ceil(alarm_count / 4))
+        return self._decode_alarm_codes(alarm_count, registers)
+
+    def read_alarm_codes(self) -> str:
+        """Return the condition code of every alarm, one hexadecimal digit each.
+
+        Digit N is the 4-bit GenComm condition code of alarm N+1 on the alarm
+        page resolved for this controller.  The alarm page and count come from
+        the alarm layout cache once they have been probed, so a readout
+        normally needs a single alarm request.
+        """
+        layout = self._cached_alarm_layout()
+        if layout is not None:
+            alarm_page, alarm_count = layout
+            if not alarm_count:
+                return ""
+            try:
+                return self._read_alarm_codes(alarm_page, alarm_count)
+            except ModbusExceptionResponse as error:
+                if error.code != self.MODBUS_ILLEGAL_DATA_ADDRESS:
+                    raise
+                # The controller no longer implements the cached page.
+                self._forget_alarm_layout()
+
         alarm_count = self.read_named_alarm_count()
         if not alarm_count:
-            return []
+            return ""
         if self._resolved_alarm_page is None:
             raise GeneratorProtocolError("Could not resolve the GenComm alarm page")
-        alarm_page = self._resolved_alarm_page
-        register_count = math.ceil(alarm_count / 4)
-        registers = self.read_register(
-            self.register_address(alarm_page, 1), register_count
-        )
-        if isinstance(registers, int):
-            registers = [registers]
+        return self._read_alarm_codes(self._resolved_alarm_page, alarm_count)
 
-        active_alarms: list[dict[str, Any]] = []
-        for alarm_index in range(alarm_count):
-            register = registers[alarm_index // 4]
-            shift = 12 - (alarm_index % 4) * 4
-            condition_code = (register >> shift) & 0x0F
-            if condition_code not in self.ACTIVE_ALARM_CODES:
-                continue
-            alarm_names = (
-                self.PAGE_154_ALARM_NAMES
-                if alarm_page == self.PAGE_NAMED_ALARMS
-                else self.PAGE_8_ALARM_NAMES
-            )
-            name = (
-                alarm_names[alarm_index]
-                if alarm_index < len(alarm_names)
-                else f"Alarm {alarm_index + 1}"
-            )
-            active_alarms.append(
-                {
-                    "index": alarm_index + 1,
-                    "name": name,
-                    "condition_code": condition_code,
-                    "condition": self.ALARM_CONDITION_NAMES[condition_code],
-                }
-            )
-        return active_alarms
+    def read_active_alarms(self) -> list[dict[str, Any]]:
+        """Return active warning, trip, shutdown, and indication conditions."""
+        alarm_codes = self.read_alarm_codes()
+        return self._active_alarm_list(self._resolved_alarm_page, alarm_codes)
 
     def read_active_alarm_count(self) -> int:
         """Return the number of alarm conditions that are currently active."""
-        return len(self.read_active_alarms())
-
-    def read_generator_data(self) -> dict[str, Any]:
-        """Read all values represented by the generator database table."""
-        communication_status = self.read_communication_status()
-        if communication_status != "CONNECTED":
-            raise GeneratorCommunicationError("Generator is not responding")
-
-        control_mode_code = self.read_control_mode_code()
-        engine_state_code = self.read_engine_state_code()
-        transfer_to_generator = self.read_transfer_to_generator()
-        active_alarms = self.read_active_alarms()
-        return {
-            "communication_status": communication_status,
-            "overall_status": self.read_overall_status(),
-            "control_mode_code": control_mode_code,
-            "control_mode": (
-                "Unknown"
-                if control_mode_code is None
-                else self.CONTROL_MODE_NAMES.get(
-                    control_mode_code, f"Reserved ({control_mode_code})"
-                )
-            ),
-            "auto_start_enabled": (
-                None
-                if control_mode_code is None
-                else control_mode_code in self.AUTO_START_CONTROL_MODES
-            ),
-            "transfer_to_generator": transfer_to_generator,
-            "transfer_status": (
-                "Unknown"
-                if transfer_to_generator is None
-                else (
-                    "Transferred to generator"
-                    if transfer_to_generator
-                    else "Not transferred to generator"
-                )
-            ),
-            "engine_state_code": engine_state_code,
-            "engine_state": (
-                "Unknown"
-                if engine_state_code is None
-                else self.ENGINE_STATE_NAMES.get(
-                    engine_state_code, f"Unknown ({engine_state_code})"
-                )
-            ),
-            "oil_pressure_kpa": self.read_oil_pressure(),
-            "coolant_temperature_c": self.read_coolant_temperature(),
-            "oil_temperature_c": self.read_oil_temperature(),
-            "fuel_level_pct": self.read_fuel_level(),
-            "charge_alternator_voltage_v": self.read_charge_alternator_voltage(),
-            "battery_voltage_v": self.read_battery_voltage(),
-            "engine_speed_rpm": self.read_engine_speed(),
-            "generator_frequency_hz": self.read_generator_frequency(),
-            "generator_l1_n_voltage_v": self.read_generator_l1_n_voltage(),
-            "generator_l2_n_voltage_v": self.read_generator_l2_n_voltage(),
-            "generator_l3_n_voltage_v": self.read_generator_l3_n_voltage(),
-            "generator_l1_current_a": self.read_generator_l1_current(),
-            "generator_l2_current_a": self.read_generator_l2_current(),
-            "generator_l3_current_a": self.read_generator_l3_current(),
-            "generator_total_power_w": self.read_generator_total_power(),
-            "generator_power_factor": self.read_generator_power_factor(),
-            "engine_run_time_s": self.read_engine_run_time(),
-            "number_of_starts": self.read_number_of_starts(),
-            "generator_positive_kwh": self.read_generator_positive_kwh(),
-            "active_alarm_count": len(active_alarms),
-            "active_alarms": active_alarms,
-        }
+        return bin(self.active_alarm_mask(self.read_alarm_codes())).count("1")
+
+    def read_active_alarm_mask(self) -> str:
+        """Return the active alarms as a hexadecimal bitmask; bit 0 is alarm 1."""
+        return f"{self.active_alarm_mask(self.read_alarm_codes()):x}"
+
+    def read_transfer_watch(self) -> dict[str, Any]:
+        """Read only the transfer LED and the engine state, at urgent bus priority.
+
+        Two requests instead of a full readout; returns the
+        ``transfer_to_generator``, ``transfer_status``, ``engine_state_code``
+        and ``engine_state`` columns.
+        """
+        values: dict[str, Any] = {}
+        with bus_priority(PRIORITY_URGENT):
+            self._transact_blocks(self.WATCH_PLAN.blocks, values)
+        return self._watch_values(values)
+
+    def read_burst_sample(self) -> bytes:
+        """Read the raw instrumentation registers of pages 4 and 6, at urgent bus priority.
+
+        Returns the data bytes of the ``BURST_PLAN`` blocks in plan order, two
+        requests in all; ``burst_capture.BurstBuffer`` keeps them undecoded
+        until its samples are written.
+        """
+        payloads: dict[int, bytes] = {}
+
+        def store(block: ReadBlock, payload: memoryview) -> None:
+            payloads[block.address] = bytes(payload)
+
+        with bus_priority(PRIORITY_URGENT):
+            self._transact_blocks(self.BURST_PLAN.blocks, {}, store=store)
+        return b"".join(payloads[block.address] for block in self.BURST_PLAN.blocks)
+
+    def read_generator_data(self, tiers: Collection[str] | None = None) -> dict[str, Any]:
+        """Read all values represented by the generator database table.
+
+        In block-read mode (the default) every register field is decoded from
+        the few requests in ``READ_PLAN`` plus the alarm page.  Otherwise each
+        register field is requested individually.  Both modes return identical
+        results keyed by the database columns of the GenComm field table.
+
+        *tiers* limits the register reads to the given polling tiers (see
+        ``gencomm_map.TIERS``); fields of other tiers repeat the values of the
+        last readout that included them.  A tier that has not been read yet is
+        always read.
+
+        With ``partial_results`` enabled, a request that still fails after
+        its retries leaves its fields ``None`` and the row gains a
+        ``field_errors`` dictionary of field name to error message.  The first
+        request and the connection itself must still succeed.
+
+        Blocks of slow-tier fields are read last, at bulk bus priority.
+
+        With ``register_images`` enabled, the raw responses of the readout
+        are kept in ``last_register_image`` (``None`` after a failed readout).
+        """
+        if not self._register_images:
+            return self._read_generator_row(tiers)
+        self.last_register_image = None
+        self._image_blocks = {}
+        ts = datetime.datetime.now()
+        try:
+            row = self._read_generator_row(tiers)
+        finally:
+            blocks, self._image_blocks = self._image_blocks, None
+        self.last_register_image = RegisterImage(blocks, ts)
+        return row
+
+    def _read_generator_row(self, tiers: Collection[str] | None) -> dict[str, Any]:
+        tiers = self._tiers_to_read(tiers)
+        plan = self._tier_read_plan(tiers)
+        values: dict[str, Any] = {}
+        field_errors: dict[str, str] | None = {} if self._partial_results else None
+        if self._block_read:
+            # The first block doubles as the communication check performed by
+            # read_communication_status() in per-value mode.  The remaining
+            # blocks are pipelined when the transport supports it.
+            first_block, *other_blocks = plan.blocks
+            try:
+                self._transact_blocks((first_block,), values)
+            except CircuitOpenError:
+                # Not asked at all; callers report the generator disconnected.
+                raise
+            except (GeneratorCommunicationError, serial.SerialException, OSError) as error:
+                raise GeneratorCommunicationError("Generator is not responding") from error
+            bulk_blocks = [block for block in other_blocks if self._is_bulk_block(block)]
+            self._transact_blocks(
+                [block for block in other_blocks if not self._is_bulk_block(block)],
+                values,
+                field_errors,
+            )
+            with bus_priority(PRIORITY_BULK):
+                self._transact_blocks(bulk_blocks, values, field_errors)
+        else:
+            if self.is_open():
+                # is_connected() reports an open breaker as False; raise it.
+                self._admit_request()
+            if self.read_communication_status() != "CONNECTED":
+                raise GeneratorCommunicationError("Generator is not responding")
+            for name in plan.field_names:
+                try:
+                    values[name] = self._read_field(name)
+                except GeneratorCommunicationError as error:
+                    if field_errors is None or not self._partial_result_allowed(error):
+                        raise
+                    values[name] = None
+                    field_errors[name] = str(error)
+
+        self._carry_tier_values(values, tiers, field_errors or ())
+        values["communication_status"] = "CONNECTED"
+        try:
+            alarm_codes = self.read_alarm_codes()
+        except GeneratorCommunicationError as error:
+            if field_errors is None or not self._partial_result_allowed(error):
+                raise
+            alarm_codes = None
+            field_errors["alarm_codes"] = str(error)
+        values.update(self._derived_values(values, alarm_codes))
+        return self._generator_row(values, field_errors)
 
 
 # Compatibility aliases for older callers that imported ``com`` or ``Generator``.
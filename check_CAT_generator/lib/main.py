@@ -1,13 +1,29 @@
 #START OF MAIN:
 
 import configparser
+import datetime
 import json
+import re
 import sys
 import time
+from collections import deque
 from pathlib import Path
 
-from generator_com import D300GC
+from alarm_cache import AlarmLayoutCache
+from alarm_events import AlarmTransitionTracker
+from burst_capture import BurstCapture
+from change_detection import load_change_detector
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from derived_metrics import load_derived_metrics
+from frame_capture import FrameCapture
+from gencomm_map import GENERATOR_DATA_COLUMNS, TIER_SLOW
+from generator_com import GeneratorCommunicationError
+from monitor_scheduler import PollScheduler, load_generator_settings
+from monitor_statistics import CycleStatistics
 from mysql_write import MySQL_com
+from quiet_period import QuietPeriodTuner
+from retry_policy import RetryPolicy
+from transfer_watch import NagiosCommandFile, TransferWatcher, emergency_power_result
 
 
 
@@ -21,21 +37,43 @@ def main():
 
     # Parse values into the control function.
 
-    # Communication settings to connect to the CAT Generator
-    Generator_Type = config.get('COMMUNICATION SETTINGS','Generator_Type')  # Generator Type
-    NPort_IP = config.get('COMMUNICATION SETTINGS', 'NPort_IP').strip()  # Moxa NPort IP address
-    NPort_Port = config.getint('COMMUNICATION SETTINGS', 'NPort_Port')  # Moxa NPort TCP Server data port
-    NPort_URL = f"socket://{NPort_IP}:{NPort_Port}"
-    Modbus_Address = config.getint('COMMUNICATION SETTINGS','Modbus_Address') # Modbus Address for Generator
-    Serial_Baudrate = config.getint('COMMUNICATION SETTINGS', 'Serial_Baudrate')  # Serial baudrate for CAT communication
-    Serial_Timeout = config.getfloat('COMMUNICATION SETTINGS', 'Serial_Timeout')  # Serial timeout for CAT communication
-    Serial_Request_Delay = config.getfloat('COMMUNICATION SETTINGS', 'Serial_Request_Delay')  # Serial delay for CAT communication
+    # Communication settings to connect to the CAT Generators. Each
+    # [GENERATOR <name>] section adds one generator; without such sections the
+    # single generator in [COMMUNICATION SETTINGS] is read.
+    Generators = load_generator_settings(config)
+    Max_In_Flight = config.getint('COMMUNICATION SETTINGS', 'Max_In_Flight', fallback=4)  # Pipelined Modbus TCP requests
+    TCP_Keepalive = config.getfloat('COMMUNICATION SETTINGS', 'TCP_Keepalive', fallback=30.0)  # Idle seconds before TCP keepalive probes
+    Reconnect_Delay_Min = config.getfloat('COMMUNICATION SETTINGS', 'Reconnect_Delay_Min', fallback=1.0)  # First reconnect delay [seconds]
+    Reconnect_Delay_Max = config.getfloat('COMMUNICATION SETTINGS', 'Reconnect_Delay_Max', fallback=60.0)  # Longest reconnect delay [seconds]
+    Adaptive_Request_Delay = config.getboolean('COMMUNICATION SETTINGS', 'Adaptive_Request_Delay', fallback=False)  # Learn the shortest safe request delay [True / False]
+    Request_Delay_Min = config.getfloat('COMMUNICATION SETTINGS', 'Request_Delay_Min', fallback=0.0)  # Lowest learned request delay [seconds]
+    Request_Delay_Max = config.getfloat('COMMUNICATION SETTINGS', 'Request_Delay_Max', fallback=0.5)  # Highest learned request delay [seconds]
+    Alarm_Cache_File = config.get('COMMUNICATION SETTINGS', 'Alarm_Cache_File', fallback='').strip()  # Resolved alarm pages and counts, relative to the install directory
+    Retries = config.getint('COMMUNICATION SETTINGS', 'Retries', fallback=0)  # Repetitions of a timed-out, corrupted or busy-rejected request
+    Retry_Backoff = config.getfloat('COMMUNICATION SETTINGS', 'Retry_Backoff', fallback=0.05)  # Wait before the first repetition, doubled for each further one [seconds]
+    Request_Delay_State_File = config.get('COMMUNICATION SETTINGS', 'Request_Delay_State_File', fallback='').strip()  # Learned request delays, relative to the install directory
+    Capture_Directory = config.get('COMMUNICATION SETTINGS', 'Capture_Directory', fallback='').strip()  # Raw RTU frame capture logs, relative to the install directory [empty = off]
+    Bus_Lock_Directory = config.get('COMMUNICATION SETTINGS', 'Bus_Lock_Directory', fallback='').strip()  # Per-port lock files shared with diagnostic scripts, relative to the install directory [empty = off]
+    Circuit_Failure_Threshold = config.getint('COMMUNICATION SETTINGS', 'Circuit_Failure_Threshold', fallback=0)  # Consecutive failures before a generator is no longer asked [0 = off]
+    Circuit_Probe_Delay_Min = config.getfloat('COMMUNICATION SETTINGS', 'Circuit_Probe_Delay_Min', fallback=5.0)  # First probe of an unreachable generator [seconds]
+    Circuit_Probe_Delay_Max = config.getfloat('COMMUNICATION SETTINGS', 'Circuit_Probe_Delay_Max', fallback=300.0)  # Longest delay between two probes [seconds]
 
 
     # General values for the check_CAT_generatror software
-    Cadance = config.getint('GENERAL SETTINGS','Cadance')  # Database recording cadance [seconds]
+    Cadance = config.getint('GENERAL SETTINGS','Cadance')  # Database recording cadance and fast tier interval [seconds]
+    Slow_Cadance = config.getint('GENERAL SETTINGS', 'Slow_Cadance', fallback=Cadance)  # Slow tier interval, e.g. accumulated counters [seconds]
     Display = config.getboolean('GENERAL SETTINGS', 'Display')  # Display the recorded data in the terminal [True / False]
     Write_SQL = config.getboolean('GENERAL SETTINGS','Write_SQL')  # Writes the recorded data in the SQL database [True / False]
+    Partial_Results = config.getboolean('GENERAL SETTINGS', 'Partial_Results', fallback=False)  # Write rows with the fields that could be read [True / False]
+    Statistics_Interval = config.getint('GENERAL SETTINGS', 'Statistics_Interval', fallback=0)  # Print cycle statistics every N cycles [0 = off]
+    Transaction_Statistics_Interval = config.getint('GENERAL SETTINGS', 'Transaction_Statistics_Interval', fallback=0)  # Print Modbus transaction statistics every N cycles [0 = off]
+    Watch_Interval = config.getfloat('GENERAL SETTINGS', 'Watch_Interval', fallback=0.0)  # Read only the transfer LED and engine state every N seconds between cycles [0 = off]
+    Nagios_Command_File = config.get('GENERAL SETTINGS', 'Nagios_Command_File', fallback='').strip()  # Nagios external command file for passive transfer results [empty = off]
+    Nagios_Host = config.get('GENERAL SETTINGS', 'Nagios_Host', fallback='').strip()  # Nagios host name of the generators
+    Nagios_Service = config.get('GENERAL SETTINGS', 'Nagios_Service', fallback='on_emergency_power').strip()  # Passive service description, {generator} is replaced by the generator name
+    Burst_Window = config.getfloat('GENERAL SETTINGS', 'Burst_Window', fallback=0.0)  # Sample pages 4 and 6 for N seconds after a transfer or engine start [0 = off]
+    Burst_Interval = config.getfloat('GENERAL SETTINGS', 'Burst_Interval', fallback=0.5)  # Seconds between two burst samples of a generator
+    Burst_Buffer_Samples = config.getint('GENERAL SETTINGS', 'Burst_Buffer_Samples', fallback=4096)  # Burst samples buffered before they are written
 
     # Specific variables for the SQL database writer
 
@@ -45,66 +83,431 @@ def main():
     SQL_Password = config.get('MySQL SPECIFIC SETTINGS','SQL_Password')  # MySQl user password
     SQL_Database = config.get('MySQL SPECIFIC SETTINGS','SQL_Database')  # MySQL database
     SQL_Table = config.get('MySQL SPECIFIC SETTINGS', 'SQL_Table')  # MySQL table in defined database.
+    SQL_Alarm_Event_Table = config.get('MySQL SPECIFIC SETTINGS', 'SQL_Alarm_Event_Table', fallback='').strip()  # MySQL table for alarm transition events [empty = off]
+    SQL_Pending_Rows = config.getint('MySQL SPECIFIC SETTINGS', 'SQL_Pending_Rows', fallback=10000)  # Rows per auxiliary table kept for the next write while MySQL fails; older rows are dropped
+    SQL_Burst_Table = config.get('MySQL SPECIFIC SETTINGS', 'SQL_Burst_Table', fallback='').strip()  # MySQL table for burst capture samples [empty = not written]
+    SQL_Register_Archive_Table = config.get('MySQL SPECIFIC SETTINGS', 'SQL_Register_Archive_Table', fallback='').strip()  # MySQL table for the raw register image of every readout [empty = off]
+    Register_Archive_Compress = config.getboolean('MySQL SPECIFIC SETTINGS', 'Register_Archive_Compress', fallback=True)  # Compress register images with zlib [True / False]
 
 
     ################################################################################################################
 
 
+    state_file = None
+    if Adaptive_Request_Delay and Request_Delay_State_File:
+        state_file = Path(__file__).resolve().parent.parent / Request_Delay_State_File
+
+    def quiet_period_for(url, baudrate):
+        if not Adaptive_Request_Delay:
+            return None
+        initial_delay = next(
+            generator.request_delay for generator in Generators if generator.url == url
+        )
+        return QuietPeriodTuner(
+            port_key=f"{url}@{baudrate}",
+            initial_delay=initial_delay,
+            minimum_delay=Request_Delay_Min,
+            maximum_delay=Request_Delay_Max,
+            state_file=state_file,
+        )
+
+    # The alarm page and count of each controller are probed once and kept,
+    # also across restarts when a cache file is configured.
+    alarm_cache = AlarmLayoutCache(
+        Path(__file__).resolve().parent.parent / Alarm_Cache_File if Alarm_Cache_File else None
+    )
+
+    # Optional raw frame capture: one log per Moxa port and monitor start.
+    captures = []
+
+    def capture_for(url):
+        if not Capture_Directory:
+            return None
+        name = re.sub(r'[^A-Za-z0-9.-]+', '_', url).strip('_')
+        started = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        capture = FrameCapture(
+            Path(__file__).resolve().parent.parent / Capture_Directory / f'{name}-{started}.gcap'
+        )
+        captures.append(capture)
+        return capture
+
+    # Transactions on a port are also serialised with other processes, such as
+    # test_generator_readout.py, that use the same lock directory.
+    bus_lock_directory = (
+        str(Path(__file__).resolve().parent.parent / Bus_Lock_Directory) if Bus_Lock_Directory else None
+    )
+
+    # A generator that failed Circuit_Failure_Threshold requests in a row is
+    # not asked again until a single-register probe, sent with exponential
+    # backoff, is answered; its reads fail at once in the meantime.
+    def circuit_breaker_for(settings):
+        if Circuit_Failure_Threshold <= 0:
+            return None
+        return CircuitBreaker(
+            failure_threshold=Circuit_Failure_Threshold,
+            probe_delay=Circuit_Probe_Delay_Min,
+            max_probe_delay=Circuit_Probe_Delay_Max,
+        )
+
+    # One long-lived connection per Moxa port is kept open across cycles and
+    # shared by the generators on that port. Ports are polled in parallel. A
+    # connection is closed and reopened with exponential backoff after a
+    # transport failure; Modbus exception responses do not affect it.
+    scheduler = PollScheduler(
+        Generators,
+        tcp_keepalive=TCP_Keepalive,
+        max_in_flight=Max_In_Flight,
+        quiet_period_factory=quiet_period_for,
+        reconnect_delay_min=Reconnect_Delay_Min,
+        reconnect_delay_max=Reconnect_Delay_Max,
+        tier_intervals={TIER_SLOW: Slow_Cadance},
+        alarm_cache=alarm_cache,
+        retry_policy=RetryPolicy(retries=Retries, backoff=Retry_Backoff),
+        partial_results=Partial_Results,
+        capture_factory=capture_for,
+        bus_lock_directory=bus_lock_directory,
+        circuit_breaker_factory=circuit_breaker_for,
+        register_images=Write_SQL and bool(SQL_Register_Archive_Table),
+    )
+    statistics = CycleStatistics()
+    # Optional deadband filter: only rows that changed, or whose heartbeat
+    # expired, are written.
+    change_detector = load_change_detector(config)
+    # Optional derived columns (apparent power, imbalance, load, fuel burn
+    # rate, interval energy), computed once per readout.
+    derived = load_derived_metrics(
+        config, {generator.name: generator.rated_power_kw for generator in Generators}
+    )
+    # Alarm transitions are derived from the alarm codes of successive
+    # readouts; events that could not be written are retried next cycle, up
+    # to SQL_Pending_Rows of them.
+    alarm_tracker = AlarmTransitionTracker()
+    pending_events = deque(maxlen=SQL_Pending_Rows)
+    # Rows of the auxiliary tables dropped because they could not be written.
+    dropped_rows = {"alarm_events": 0, "burst_samples": 0, "register_images": 0}
+
+    def queue_rows(table, pending, rows):
+        """Append *rows* to a bounded pending queue and count the rows it drops."""
+        rows = list(rows)
+        dropped_rows[table] += max(0, len(pending) + len(rows) - pending.maxlen)
+        pending.extend(rows)
+    # Transfer and engine state changes, seen by full readouts or by the watch
+    # reads between them, are reported at once and optionally passed to Nagios
+    # as passive results.
+    transfer_watcher = TransferWatcher()
+    nagios = (
+        NagiosCommandFile(Nagios_Command_File, Nagios_Host, Nagios_Service)
+        if Nagios_Command_File
+        else None
+    )
+    # After a transfer or an engine start, the instrumentation of the
+    # generator is sampled every Burst_Interval seconds for Burst_Window
+    # seconds. Samples are buffered raw and written in one batch.
+    burst = (
+        BurstCapture(Burst_Window, Burst_Interval, capacity=Burst_Buffer_Samples)
+        if Burst_Window > 0
+        else None
+    )
+    pending_burst_rows = deque(maxlen=SQL_Pending_Rows)
+    # Raw register images of every readout, written to the register archive
+    # whether or not change detection writes the generator row.
+    pending_images = deque(maxlen=SQL_Pending_Rows)
+    archived_images = 0
+
+    def write_pending(table, write, pending):
+        """Write the *pending* rows of an auxiliary table; return the rows written.
+
+        A failure is reported and does not raise, so it never keeps generator
+        rows from being written. Rows MySQL failed to store stay pending; rows
+        it rejected as invalid are dropped.
+        """
+        if not pending:
+            return 0
+        rows = list(pending)
+        try:
+            if not write(rows):
+                print(f"Writing {table} failed; {len(rows)} rows kept", file=sys.stderr)
+                return 0
+        except (TypeError, ValueError) as error:
+            print(f"Writing {table} failed, {len(rows)} rows dropped: {error}", file=sys.stderr)
+            dropped_rows[table] += len(rows)
+        except Exception as error:
+            print(f"Writing {table} failed; {len(rows)} rows kept: {error}", file=sys.stderr)
+            return 0
+        pending.clear()
+        return len(rows)
+
+    def write_sql(generator_data=()):
+        """Write generator rows, then the pending alarm events, burst samples and register images.
+
+        The generator rows are written first and on their own; a failure of an
+        auxiliary table is reported but does not raise.
+        """
+        nonlocal archived_images
+        # Connect to MySQL, write the collected data in batched inserts, and
+        # close the connection even when an insert fails.
+        sql = MySQL_com()
+        sql_connected = False
+        try:
+            sql_connected = sql.open(HOST=SQL_Host,USER=SQL_User,PASSWORD=SQL_Password,DATABASE=SQL_Database,GENERATOR_TABLE=SQL_Table,AUTH_PLUGIN=SQL_Auth,ALARM_EVENT_TABLE=SQL_Alarm_Event_Table or None,BURST_TABLE=SQL_Burst_Table or None,REGISTER_ARCHIVE_TABLE=SQL_Register_Archive_Table or None)
+            if not sql_connected:
+                raise ConnectionError("Unable to connect to the MySQL database")
+
+            generator_error = None
+            if generator_data:
+                try:
+                    if not sql.write_generator(generator_data=generator_data):
+                        raise RuntimeError("Failed to write generator data to MySQL")
+                    if change_detector is not None:
+                        change_detector.mark_written(generator_data)
+                    if derived is not None:
+                        derived.mark_written(generator_data)
+                except Exception as error:
+                    generator_error = error
+
+            write_pending("alarm_events", sql.write_alarm_events, pending_events)
+            write_pending("burst_samples", sql.write_burst_samples, pending_burst_rows)
+            archived_images += write_pending(
+                "register_images", sql.write_register_images, pending_images
+            )
+            if generator_error is not None:
+                raise generator_error
+        finally:
+            if sql_connected:
+                sql.close()
+
+    def flush_burst():
+        rows = burst.take_rows()
+        if Display and rows:
+            print(f"Burst capture: {len(rows)} samples")
+        if not (Write_SQL and SQL_Burst_Table):
+            return
+        queue_rows("burst_samples", pending_burst_rows, rows)
+        try:
+            write_sql()
+        except Exception as error:
+            print(f"Writing burst samples failed: {error}", file=sys.stderr)
+
+    def burst_until(next_cycle):
+        """Sample the generators with an open burst window until *next_cycle*."""
+        while True:
+            generators = burst.active()
+            if not generators:
+                if len(burst.buffer):
+                    flush_burst()
+                return
+            sample_started = time.monotonic()
+            if sample_started >= next_cycle:
+                return
+            for result in scheduler.burst(generators):
+                if result.ok and burst.record(result.settings.name, result.ts, result.data):
+                    flush_burst()
+            time.sleep(max(0.0, min(sample_started + Burst_Interval, next_cycle) - time.monotonic()))
+
+    # Generators that are disconnected: a port that cannot be connected or an
+    # open circuit breaker. Their rows only carry the communication status, so
+    # the Nagios communication check sees fresh data.
+    disconnected = set()
+
+    def disconnected_record(name):
+        return dict(
+            dict.fromkeys(GENERATOR_DATA_COLUMNS),
+            communication_status="DISCONNECTED",
+            generator=name,
+        )
+
+    def report_changes(changes):
+        if burst is not None:
+            burst.trigger(changes)
+        for change in changes:
+            if Display:
+                print(json.dumps(change.as_dict(), sort_keys=True))
+            if nagios is None or change.column != 'transfer_to_generator':
+                continue
+            status, output = emergency_power_result(change.value)
+            try:
+                nagios.submit(change.generator, status, output, ts=change.ts)
+            except OSError as error:
+                print(f"Passive Nagios result for {change.generator} failed: {error}", file=sys.stderr)
+
+    def watch_until(next_cycle):
+        """Watch the transfer state until *next_cycle*; return True on a change."""
+        while time.monotonic() + Watch_Interval < next_cycle:
+            time.sleep(Watch_Interval)
+            watch_time = datetime.datetime.now()
+            changes = []
+            for result in scheduler.watch():
+                if result.ok:
+                    changes.extend(transfer_watcher.update(result.settings.name, result.data, ts=watch_time))
+            if changes:
+                report_changes(changes)
+                return True
+        return False
+
     try:
         while True:
             cycle_started = time.monotonic()
+            read_seconds = None
 
             try:
-                # Collect complete generator readings in a list.
-                generator_data = []
-                generator = D300GC(
-                    port=NPort_URL,
-                    slave_id=Modbus_Address,
-                    baudrate=Serial_Baudrate,
-                    timeout=Serial_Timeout,
-                    request_delay=Serial_Request_Delay,
+                results = scheduler.poll()
+                for connect_seconds in scheduler.take_connect_times():
+                    statistics.record_connect(connect_seconds)
+                for result in results:
+                    name = result.settings.name
+                    if isinstance(result.error, CircuitOpenError):
+                        # Reported once, not every cycle.
+                        if name not in disconnected:
+                            disconnected.add(name)
+                            print(f"Generator {name} disconnected: {result.error}", file=sys.stderr)
+                        continue
+                    if result.ok and name in disconnected:
+                        disconnected.discard(name)
+                        print(f"Generator {name} reconnected", file=sys.stderr)
+                    if not result.ok:
+                        print(
+                            f"Generator {result.settings.name} readout failed: {result.error}",
+                            file=sys.stderr,
+                        )
+                    elif result.data.get("field_errors"):
+                        print(
+                            f"Generator {result.settings.name} readout incomplete: "
+                            + "; ".join(
+                                f"{name}: {error}"
+                                for name, error in result.data["field_errors"].items()
+                            ),
+                            file=sys.stderr,
+                        )
+
+                # Collect complete generator readings in a list; the generator
+                # name is stored with each record. Disconnected generators
+                # add a row without values.
+                generator_data = [
+                    dict(result.data, generator=result.settings.name)
+                    if result.ok
+                    else disconnected_record(result.settings.name)
+                    for result in results
+                    if result.ok or isinstance(result.error, CircuitOpenError)
+                ]
+                if not generator_data:
+                    raise GeneratorCommunicationError("No generator responded")
+                if any(result.ok for result in results):
+                    read_seconds = time.monotonic() - cycle_started
+                if derived is not None:
+                    for record in generator_data:
+                        derived.update(record)
+                queue_rows(
+                    "register_images",
+                    pending_images,
+                    (
+                        {
+                            "ts": result.image.ts,
+                            "generator": result.settings.name,
+                            "registers": result.image.to_blob(compress=Register_Archive_Compress),
+                        }
+                        for result in results
+                        if result.image is not None
+                    ),
                 )
 
-                try:
-                    generator.open()
-                    generator_data.append(generator.read_generator_data())
-                finally:
-                    generator.close()
+                events = []
+                readout_time = datetime.datetime.now()
+                for record in generator_data:
+                    if record.get("alarm_codes") is not None:
+                        events.extend(
+                            alarm_tracker.update(
+                                record["generator"],
+                                record["alarm_page"],
+                                record["alarm_codes"],
+                                ts=readout_time,
+                            )
+                        )
+                if SQL_Alarm_Event_Table:
+                    queue_rows("alarm_events", pending_events, events)
+                report_changes([
+                    change
+                    for record in generator_data
+                    for change in transfer_watcher.update(record["generator"], record, ts=readout_time)
+                ])
 
                 if Display:
                     print(json.dumps(generator_data, indent=2, sort_keys=True))
+                    for event in events:
+                        print(json.dumps(event.as_dict(), sort_keys=True))
 
-                if Write_SQL:
-                    # Connect to MySQL, write the collected generator data, and
-                    # close the connection even when an insert fails.
-                    sql = MySQL_com()
-                    sql_connected = False
-                    try:
-                        sql_connected = sql.open(HOST=SQL_Host,USER=SQL_User,PASSWORD=SQL_Password,DATABASE=SQL_Database,GENERATOR_TABLE=SQL_Table,AUTH_PLUGIN=SQL_Auth)
-                        if not sql_connected:
-                            raise ConnectionError("Unable to connect to the MySQL database")
-
-                        write_successful = sql.write_generator(
-                            generator_data=generator_data,
-                            generator_name=Generator_Type,
-                        )
-                        if not write_successful:
-                            raise RuntimeError("Failed to write generator data to MySQL")
-                    finally:
-                        if sql_connected:
-                            sql.close()
+                if change_detector is not None:
+                    generator_data = change_detector.select(generator_data)
+
+                if Write_SQL and (generator_data or pending_events or pending_burst_rows or pending_images):
+                    write_sql(generator_data)
             except Exception as error:
                 print(f"Generator recording cycle failed: {error}", file=sys.stderr)
 
             cycle_elapsed = time.monotonic() - cycle_started
-            time.sleep(max(0.0, Cadance - cycle_elapsed))
+            statistics.record_cycle(
+                cycle_elapsed,
+                read_seconds=read_seconds,
+                failed=read_seconds is None,
+            )
+            if Statistics_Interval > 0 and statistics.cycles % Statistics_Interval == 0:
+                snapshot = statistics.snapshot()
+                snapshot["ports"] = scheduler.statistics()
+                if change_detector is not None:
+                    snapshot["change_detection"] = change_detector.statistics()
+                snapshot["alarm_events"] = {
+                    "emitted": alarm_tracker.events_emitted,
+                    "pending": len(pending_events),
+                    "dropped": dropped_rows["alarm_events"],
+                }
+                snapshot["transfer_watch"] = transfer_watcher.statistics()
+                if burst is not None:
+                    snapshot["burst_capture"] = dict(
+                        burst.statistics(),
+                        pending=len(pending_burst_rows),
+                        dropped=dropped_rows["burst_samples"],
+                    )
+                if SQL_Register_Archive_Table:
+                    snapshot["register_archive"] = {
+                        "written": archived_images,
+                        "pending": len(pending_images),
+                        "dropped": dropped_rows["register_images"],
+                    }
+                print(
+                    "Generator cycle statistics: "
+                    + json.dumps(snapshot, sort_keys=True),
+                    file=sys.stderr,
+                )
+            if (
+                Transaction_Statistics_Interval > 0
+                and statistics.cycles % Transaction_Statistics_Interval == 0
+            ):
+                print(
+                    "Modbus transaction statistics: "
+                    + json.dumps(scheduler.transaction_statistics(), sort_keys=True),
+                    file=sys.stderr,
+                )
+            next_cycle = cycle_started + Cadance
+            # An open burst window is sampled first; the recording cycles keep
+            # their cadence meanwhile.
+            if burst is not None:
+                burst_until(next_cycle)
+            # A transfer or engine state change seen between cycles starts the
+            # next full readout at once.
+            if Watch_Interval > 0 and watch_until(next_cycle):
+                continue
+            time.sleep(max(0.0, next_cycle - time.monotonic()))
     except KeyboardInterrupt:
         print("Generator recording stopped.", file=sys.stderr)
+    finally:
+        if burst is not None and len(burst.buffer):
+            flush_burst()
+        scheduler.close()
+        for capture in captures:
+            capture.close()
 
     return
 
 
 
-
 if __name__ == '__main__':
     generator_data = main()
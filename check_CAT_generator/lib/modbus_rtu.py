@@ -0,0 +1,214 @@
+"""Modbus RTU framing for the D300GC generator controller.
+
+The codec builds function-03 request frames and validates response frames
+without creating intermediate byte strings.  The CRC-16 is calculated from a
+precomputed 256-entry table, request frames are cached per (slave, function,
+address, count), and responses are received with ``readinto()`` into one
+preallocated buffer per codec.  The data bytes of a response are returned as a
+``memoryview`` into that buffer, so callers decode them with
+``struct.unpack_from()`` before the next transaction on the same codec.
+``read_stream_response()`` does the same for an asyncio ``StreamReader``.
+
+The exceptions raised for failed transactions are defined here so that every
+transport shares them; ``generator_com`` re-exports them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+from typing import Any
+
+
+class GeneratorCommunicationError(RuntimeError):
+    """Raised when communication with the generator fails."""
+
+
+class GeneratorTimeoutError(GeneratorCommunicationError):
+    """Raised when the generator does not send a complete response in time."""
+
+
+class GeneratorProtocolError(GeneratorCommunicationError):
+    """Raised when the generator returns an invalid Modbus response."""
+
+
+class GeneratorCrcError(GeneratorProtocolError):
+    """Raised when a response frame fails its CRC check."""
+
+
+class ModbusExceptionResponse(GeneratorCommunicationError):
+    """Raised when the generator returns a Modbus exception response."""
+
+    EXCEPTION_NAMES = {
+        1: "illegal function",
+        2: "illegal data address",
+        3: "illegal data value",
+        4: "slave device failure",
+        6: "slave device busy",
+        12: "reserved register",
+    }
+
+    def __init__(self, code: int):
+        self.code = code
+        name = self.EXCEPTION_NAMES.get(code, "unknown exception")
+        super().__init__(f"Modbus exception {code}: {name}")
+
+
+def _build_crc16_table() -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = _build_crc16_table()
+
+MAX_READ_REGISTERS = 125
+# Slave, function, byte count, 250 data bytes, and the CRC.
+MAX_RESPONSE_SIZE = 3 + MAX_READ_REGISTERS * 2 + 2
+
+_REQUEST_HEADER = struct.Struct(">BBHH")
+_CRC = struct.Struct("<H")
+_REQUEST_CACHE_LIMIT = 1024
+
+
+def crc16(data: Any) -> int:
+    """Return the Modbus RTU CRC-16 for a bytes-like object."""
+    crc = 0xFFFF
+    table = CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+class RtuFrameCodec:
+    """Encode Modbus RTU requests and decode responses into a reused buffer."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray(MAX_RESPONSE_SIZE)
+        self._view = memoryview(self._buffer)
+        self._requests: dict[tuple[int, int, int, int], bytes] = {}
+
+    def request(self, slave_id: int, function: int, address: int, count: int) -> bytes:
+        """Return the complete request frame, including its CRC."""
+        key = (slave_id, function, address, count)
+        frame = self._requests.get(key)
+        if frame is None:
+            frame = bytearray(8)
+            _REQUEST_HEADER.pack_into(frame, 0, slave_id, function, address, count)
+            _CRC.pack_into(frame, 6, crc16(memoryview(frame)[:6]))
+            frame = bytes(frame)
+            if len(self._requests) >= _REQUEST_CACHE_LIMIT:
+                self._requests.clear()
+            self._requests[key] = frame
+        return frame
+
+    @staticmethod
+    def _read_into(port: Any, target: memoryview) -> None:
+        size = len(target)
+        received = 0
+        while received < size:
+            chunk_size = port.readinto(target[received:])
+            if not chunk_size:
+                raise GeneratorTimeoutError(
+                    f"Timed out after receiving {received} of {size} response bytes"
+                )
+            received += chunk_size
+
+    def _check_crc(self, end: int) -> None:
+        view = self._view
+        received_crc = view[end] | (view[end + 1] << 8)
+        calculated_crc = crc16(view[:end])
+        if received_crc != calculated_crc:
+            raise GeneratorCrcError(
+                f"Invalid Modbus CRC: received 0x{received_crc:04X}, "
+                f"expected 0x{calculated_crc:04X}"
+            )
+
+    def _check_header(self, slave_id: int, function: int, count: int) -> int | None:
+        """Validate the first three response bytes.
+
+        Returns the number of data bytes, or ``None`` for an exception response.
+        """
+        view = self._view
+        slave, received_function, third_byte = view[0], view[1], view[2]
+        if slave != slave_id:
+            raise GeneratorProtocolError(
+                f"Response came from slave {slave}, expected {slave_id}"
+            )
+
+        if received_function == function | 0x80:
+            return None
+        if received_function != function:
+            raise GeneratorProtocolError(
+                f"Unexpected Modbus function code {received_function}"
+            )
+
+        expected_byte_count = count * 2
+        if third_byte != expected_byte_count:
+            raise GeneratorProtocolError(
+                f"Response contains {third_byte} data bytes; "
+                f"expected {expected_byte_count}"
+            )
+        return third_byte
+
+    def read_response(
+        self,
+        port: Any,
+        slave_id: int,
+        function: int,
+        count: int,
+    ) -> memoryview:
+        """Receive one register-read response and return its data bytes.
+
+        The returned view stays valid until the next response is received by
+        this codec.
+        """
+        view = self._view
+        self._read_into(port, view[:3])
+        byte_count = self._check_header(slave_id, function, count)
+        if byte_count is None:
+            self._read_into(port, view[3:5])
+            self._check_crc(3)
+            raise ModbusExceptionResponse(view[2])
+        end = 3 + byte_count
+        self._read_into(port, view[3:end + 2])
+        self._check_crc(end)
+        return view[3:end]
+
+    @staticmethod
+    async def _read_stream_into(reader: asyncio.StreamReader, target: memoryview) -> None:
+        try:
+            target[:] = await reader.readexactly(len(target))
+        except asyncio.IncompleteReadError as error:
+            raise GeneratorCommunicationError(
+                f"Connection closed after {len(error.partial)} of "
+                f"{len(target)} response bytes"
+            ) from None
+
+    async def read_stream_response(
+        self,
+        reader: asyncio.StreamReader,
+        slave_id: int,
+        function: int,
+        count: int,
+    ) -> memoryview:
+        """``read_response()`` for an asyncio stream.
+
+        The caller applies the response timeout, for example with
+        ``asyncio.wait_for()``.
+        """
+        view = self._view
+        await self._read_stream_into(reader, view[:3])
+        byte_count = self._check_header(slave_id, function, count)
+        if byte_count is None:
+            await self._read_stream_into(reader, view[3:5])
+            self._check_crc(3)
+            raise ModbusExceptionResponse(view[2])
+        end = 3 + byte_count
+        await self._read_stream_into(reader, view[3:end + 2])
+        self._check_crc(end)
+        return view[3:end]
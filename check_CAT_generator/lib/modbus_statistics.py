@@ -0,0 +1,184 @@
+"""Per-transaction Modbus counters and latency histograms.
+
+Every transport owns a ``TransactionStatistics`` and records each register
+transaction in it, grouped by GenComm page and Modbus function:
+
+* requests, and the request and response bytes on the wire,
+* a round-trip time histogram, measured from sending the request to the end
+  of the response,
+* time spent waiting out the quiet period (``request_delay``) before sending,
+* timeouts, CRC failures, other protocol errors, and Modbus exception codes.
+
+Slow cycles can then be attributed to the quiet period, the Moxa, the
+controller or timeouts.  ``snapshot()`` returns the cumulative counters since
+the transport was created as a JSON-serialisable dictionary; ``main.py``
+prints it every Transaction_Statistics_Interval cycles.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any
+
+from modbus_rtu import (
+    GeneratorCrcError,
+    GeneratorProtocolError,
+    GeneratorTimeoutError,
+    ModbusExceptionResponse,
+)
+
+# Upper bounds of the round-trip time histogram buckets [seconds].  A final
+# bucket collects everything slower.
+RTT_BUCKETS_S = (0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+PAGE_SIZE = 256
+
+
+class _PageCounters:
+    """Counters of one (page, function) pair."""
+
+    __slots__ = (
+        "requests",
+        "request_bytes",
+        "response_bytes",
+        "rtt_total",
+        "rtt_min",
+        "rtt_max",
+        "rtt_histogram",
+        "delay_total",
+        "timeouts",
+        "crc_failures",
+        "protocol_errors",
+        "other_errors",
+        "exceptions",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.rtt_total = 0.0
+        self.rtt_min: float | None = None
+        self.rtt_max: float | None = None
+        self.rtt_histogram = [0] * (len(RTT_BUCKETS_S) + 1)
+        self.delay_total = 0.0
+        self.timeouts = 0
+        self.crc_failures = 0
+        self.protocol_errors = 0
+        self.other_errors = 0
+        self.exceptions: dict[int, int] = {}
+
+    def snapshot(self, page: int, function: int) -> dict[str, Any]:
+        responses = sum(self.rtt_histogram)
+        histogram = {
+            f"le_{bound:g}s": count for bound, count in zip(RTT_BUCKETS_S, self.rtt_histogram)
+        }
+        histogram[f"gt_{RTT_BUCKETS_S[-1]:g}s"] = self.rtt_histogram[-1]
+        return {
+            "page": page,
+            "function": function,
+            "requests": self.requests,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "responses": responses,
+            "rtt_mean_s": round(self.rtt_total / responses, 4) if responses else None,
+            "rtt_min_s": None if self.rtt_min is None else round(self.rtt_min, 4),
+            "rtt_max_s": None if self.rtt_max is None else round(self.rtt_max, 4),
+            "rtt_histogram": histogram,
+            "request_delay_total_s": round(self.delay_total, 4),
+            "timeouts": self.timeouts,
+            "crc_failures": self.crc_failures,
+            "protocol_errors": self.protocol_errors,
+            "other_errors": self.other_errors,
+            "exceptions": {str(code): count for code, count in sorted(self.exceptions.items())},
+        }
+
+
+class TransactionStatistics:
+    """Collect per-page and per-function transaction statistics.
+
+    Args:
+        request_size: bytes of one register-read request frame.
+        response_overhead: bytes of a response frame besides the register
+            data; also the size of an exception response.
+    """
+
+    def __init__(self, request_size: int, response_overhead: int) -> None:
+        self.request_size = request_size
+        self.response_overhead = response_overhead
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[int, int], _PageCounters] = {}
+
+    def record(
+        self,
+        function: int,
+        address: int,
+        count: int,
+        round_trip: float,
+        delay: float = 0.0,
+        error: BaseException | None = None,
+    ) -> None:
+        """Record one transaction.
+
+        *round_trip* is only counted for transactions that received a valid
+        response, including Modbus exception responses.  *error* is the
+        exception the transaction failed with, if any.
+        """
+        key = (address // PAGE_SIZE, function)
+        with self._lock:
+            counters = self._counters.get(key)
+            if counters is None:
+                counters = self._counters[key] = _PageCounters()
+            counters.requests += 1
+            counters.request_bytes += self.request_size
+            counters.delay_total += delay
+
+            if error is None:
+                counters.response_bytes += self.response_overhead + 2 * count
+            elif isinstance(error, ModbusExceptionResponse):
+                counters.response_bytes += self.response_overhead
+                counters.exceptions[error.code] = counters.exceptions.get(error.code, 0) + 1
+            else:
+                if isinstance(error, GeneratorTimeoutError):
+                    counters.timeouts += 1
+                elif isinstance(error, GeneratorCrcError):
+                    counters.crc_failures += 1
+                elif isinstance(error, GeneratorProtocolError):
+                    counters.protocol_errors += 1
+                else:
+                    counters.other_errors += 1
+                return
+
+            counters.rtt_total += round_trip
+            if counters.rtt_min is None or round_trip < counters.rtt_min:
+                counters.rtt_min = round_trip
+            if counters.rtt_max is None or round_trip > counters.rtt_max:
+                counters.rtt_max = round_trip
+            counters.rtt_histogram[bisect.bisect_left(RTT_BUCKETS_S, round_trip)] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters per page and function, and their totals."""
+        with self._lock:
+            pages = [
+                counters.snapshot(page, function)
+                for (page, function), counters in sorted(self._counters.items())
+            ]
+        totals = {
+            key: sum(page[key] for page in pages)
+            for key in (
+                "requests",
+                "request_bytes",
+                "response_bytes",
+                "responses",
+                "timeouts",
+                "crc_failures",
+                "protocol_errors",
+                "other_errors",
+            )
+        }
+        totals["request_delay_total_s"] = round(
+            sum(page["request_delay_total_s"] for page in pages), 4
+        )
+        totals["exceptions"] = sum(sum(page["exceptions"].values()) for page in pages)
+        return {"totals": totals, "pages": pages}
@@ -0,0 +1,577 @@
+"""Transports that carry Modbus register reads to the D300GC controller.
+
+``D300GC`` decodes GenComm registers; a transport moves function-03 requests
+and responses.  Two transports are provided:
+
+``RtuTransport``
+    Modbus RTU frames, including the CRC, through a pyserial URL.  This is the
+    original path: a local serial device or a Moxa NPort in TCP Server mode
+    (``socket://host:port``) acting as a transparent RS-485 converter.  One
+    transaction is on the bus at a time, separated by the quiet period.
+
+``ModbusTcpTransport``
+    Native Modbus TCP (MBAP header, no CRC) to a Modbus gateway such as a Moxa
+    MGate, selected with a ``modbus-tcp://host[:port]`` URL.  The gateway does
+    the RTU timing on the serial side, so requests are pipelined: several
+    transactions are kept in flight and matched to their responses by
+    transaction ID.
+
+Both transports call a ``decode`` callback with the response data bytes as a
+``memoryview`` into a reused buffer.  The view is only valid during the call.
+Each transaction is recorded in the transport's ``TransactionStatistics``.
+``RtuTransport`` also writes its raw frames to a ``frame_capture.FrameCapture``
+when one is attached.  Transports to the same port URL share one
+``bus_arbiter.BusArbiter``, which orders their transactions by priority.
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Callable, Sequence, TypeVar
+from urllib.parse import urlsplit
+
+import serial
+
+from bus_arbiter import BusArbiter, shared_arbiter
+from modbus_rtu import (
+    GeneratorCommunicationError,
+    GeneratorProtocolError,
+    GeneratorTimeoutError,
+    ModbusExceptionResponse,
+    RtuFrameCodec,
+)
+from modbus_statistics import TransactionStatistics
+from quiet_period import QuietPeriodTuner
+
+if TYPE_CHECKING:
+    from frame_capture import FrameCapture
+
+_T = TypeVar("_T")
+
+MODBUS_TCP_SCHEME = "modbus-tcp"
+MODBUS_TCP_DEFAULT_PORT = 502
+
+# Capture record kinds for connection changes; see frame_capture.
+CAPTURE_OPEN = 3
+CAPTURE_CLOSE = 4
+
+
+def configure_tcp_socket(connection: socket.socket, keepalive: float) -> None:
+    """Disable Nagle's algorithm and enable TCP keepalive on *connection*.
+
+    Requests are small and latency-bound.  Keepalive probes detect a Moxa that
+    has silently dropped a long-lived connection after *keepalive* idle
+    seconds; ``0`` leaves keepalive off.
+    """
+    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if not keepalive:
+        return
+    connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    idle = max(1, int(keepalive))
+    # The per-socket keepalive timers are platform specific.
+    for option, value in (
+        ("TCP_KEEPIDLE", idle),
+        ("TCP_KEEPINTVL", max(1, idle // 3)),
+        ("TCP_KEEPCNT", 3),
+    ):
+        if hasattr(socket, option):
+            connection.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+class _RecordingPort:
+    """Pass ``readinto()`` through to a port and keep a copy of the bytes read."""
+
+    def __init__(self, port: Any) -> None:
+        self._port = port
+        self.received = bytearray()
+
+    def readinto(self, buffer: memoryview) -> int | None:
+        size = self._port.readinto(buffer)
+        if size:
+            self.received += buffer[:size]
+        return size
+
+
+class ModbusTransport(ABC):
+    """Interface shared by the Modbus transports.
+
+    Subclasses set ``transactions`` in ``__init__``.
+    """
+
+    # Number of transactions the transport keeps outstanding in transact_many().
+    max_in_flight = 1
+    transactions: TransactionStatistics
+
+    @abstractmethod
+    def open(self) -> bool:
+        """Connect; return whether the transport is open."""
+
+    @abstractmethod
+    def close(self) -> bool:
+        """Disconnect; return whether the transport is closed."""
+
+    @abstractmethod
+    def is_open(self) -> bool:
+        """Return whether the transport is connected."""
+
+    @property
+    def request_delay(self) -> float:
+        """Quiet period in seconds applied before the next transaction."""
+        return 0.0
+
+    @abstractmethod
+    def transact(
+        self,
+        slave_id: int,
+        function: int,
+        address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        """Perform one register-read transaction and decode its data bytes."""
+
+    def transact_many(
+        self,
+        slave_id: int,
+        function: int,
+        requests: Sequence[tuple[int, int]],
+        decode: Callable[[int, memoryview], None],
+    ) -> None:
+        """Perform several ``(address, count)`` reads.
+
+        *decode* receives the request index and the data bytes of each
+        response.  The default implementation runs the requests one by one.
+        """
+        for index, (address, count) in enumerate(requests):
+            self.transact(
+                slave_id,
+                function,
+                address,
+                count,
+                lambda payload, index=index: decode(index, payload),
+            )
+
+    def statistics(self) -> dict[str, Any]:
+        return {"transport": type(self).__name__}
+
+    def transaction_statistics(self) -> dict[str, Any]:
+        """Return the per-page transaction counters and latency histograms."""
+        return self.transactions.snapshot()
+
+
+class RtuTransport(ModbusTransport):
+    """Modbus RTU frames through a serial device or pyserial URL."""
+
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 115200,
+        timeout: float = 1.0,
+        request_delay: float = 0.1,
+        tcp_keepalive: float = 30.0,
+        quiet_period: QuietPeriodTuner | None = None,
+        capture: FrameCapture | None = None,
+        arbiter: BusArbiter | None = None,
+    ) -> None:
+        self.port = port
+        self.baudrate = int(baudrate)
+        self.timeout = float(timeout)
+        self._request_delay = max(0.0, float(request_delay))
+        self._tcp_keepalive = max(0.0, float(tcp_keepalive))
+        # When set, the tuner replaces the fixed request delay.
+        self._quiet_period = quiet_period
+        # Raw request and response frames are logged here when set.
+        self._capture = capture
+        self._serial: serial.SerialBase | None = None
+        self._codec = RtuFrameCodec()
+        # Grants the line to one transaction at a time, across every transport
+        # of this port, and remembers when the last transaction finished.
+        self.arbiter = arbiter if arbiter is not None else shared_arbiter(port)
+        # Request: slave, function, address, count, CRC.  Response: slave,
+        # function, byte count, data, CRC.
+        self.transactions = TransactionStatistics(request_size=8, response_overhead=5)
+
+    def open(self) -> bool:
+        """Open the port using 8,N,1 framing."""
+        self._serial = serial.serial_for_url(
+            self.port,
+            baudrate=self.baudrate,
+            bytesize=serial.EIGHTBITS,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            timeout=self.timeout,
+            write_timeout=self.timeout,
+        )
+        # Only socket:// ports carry a TCP socket; serial devices are unchanged.
+        connection = getattr(self._serial, "_socket", None)
+        if isinstance(connection, socket.socket):
+            configure_tcp_socket(connection, self._tcp_keepalive)
+        if self._capture is not None:
+            self._capture.mark(CAPTURE_OPEN, self.port)
+        return self._serial.is_open
+
+    def close(self) -> bool:
+        if self._serial is not None and self._serial.is_open:
+            self._serial.close()
+            if self._capture is not None:
+                self._capture.mark(CAPTURE_CLOSE, self.port)
+        return self._serial is None or not self._serial.is_open
+
+    def is_open(self) -> bool:
+        return self._serial is not None and self._serial.is_open
+
+    @property
+    def request_delay(self) -> float:
+        if self._quiet_period is not None:
+            return self._quiet_period.delay
+        return self._request_delay
+
+    def transact(
+        self,
+        slave_id: int,
+        function: int,
+        address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        if self._serial is None or not self._serial.is_open:
+            raise GeneratorCommunicationError("Serial port is not open")
+
+        request = self._codec.request(slave_id, function, address, count)
+
+        with self.arbiter.claim():
+            # The controller/Moxa path needs a short quiet period between RTU
+            # transactions. Without it, immediate back-to-back requests can
+            # cause every second request to time out even though its address is
+            # valid. Count time spent by the caller toward the quiet period.
+            elapsed = time.monotonic() - self.arbiter.idle_since
+            remaining_delay = self.request_delay - elapsed
+            if remaining_delay > 0:
+                time.sleep(remaining_delay)
+
+            started = time.monotonic()
+            failure: BaseException | None = None
+            port = self._serial if self._capture is None else _RecordingPort(self._serial)
+            try:
+                self._serial.reset_input_buffer()
+                written = self._serial.write(request)
+                self._serial.flush()
+                if written != len(request):
+                    raise GeneratorCommunicationError(
+                        f"Only {written} of {len(request)} request bytes were written"
+                    )
+                if self._capture is not None:
+                    self._capture.request(request)
+
+                payload = self._codec.read_response(port, slave_id, function, count)
+                result = decode(payload)
+            except GeneratorTimeoutError as error:
+                failure = error
+                if self._quiet_period is not None:
+                    self._quiet_period.record_timeout()
+                raise
+            except BaseException as error:
+                failure = error
+                raise
+            finally:
+                finished = time.monotonic()
+                if self._capture is not None and port is not self._serial:
+                    self._capture.response(port.received)
+                self.transactions.record(
+                    function,
+                    address,
+                    count,
+                    finished - started,
+                    delay=max(0.0, remaining_delay),
+                    error=failure,
+                )
+
+        if self._quiet_period is not None:
+            self._quiet_period.record_success()
+        return result
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "transport": "rtu",
+            "request_delay_s": round(self.request_delay, 4),
+            "quiet_period": (
+                None if self._quiet_period is None else self._quiet_period.snapshot()
+            ),
+            "bus": self.arbiter.snapshot(),
+        }
+
+
+MBAP_HEADER = struct.Struct(">HHHB")
+MBAP_READ_REQUEST = struct.Struct(">HHHBBHH")
+# MBAP header, function, byte count, 250 data bytes.
+MBAP_MAX_RESPONSE_SIZE = 7 + 2 + 250
+
+
+def check_mbap_header(header: memoryview) -> tuple[int, int]:
+    """Validate a received MBAP header.
+
+    Returns the transaction ID and the total ADU size in bytes.
+    """
+    transaction_id, protocol_id, length, _ = MBAP_HEADER.unpack_from(header)
+    if protocol_id != 0:
+        raise GeneratorProtocolError(f"Unexpected Modbus TCP protocol ID {protocol_id}")
+    if not 3 <= length <= MBAP_MAX_RESPONSE_SIZE - 6:
+        raise GeneratorProtocolError(f"Invalid Modbus TCP length field {length}")
+    return transaction_id, 6 + length
+
+
+def mbap_response_data(
+    response: memoryview,
+    slave_id: int,
+    function: int,
+    count: int,
+) -> memoryview:
+    """Validate a register-read ADU and return its data bytes."""
+    unit_id, received_function, third_byte = response[6], response[7], response[8]
+    if unit_id != slave_id:
+        raise GeneratorProtocolError(
+            f"Response came from unit {unit_id}, expected {slave_id}"
+        )
+    if received_function == function | 0x80:
+        raise ModbusExceptionResponse(third_byte)
+    if received_function != function:
+        raise GeneratorProtocolError(
+            f"Unexpected Modbus function code {received_function}"
+        )
+    data = response[9:]
+    if third_byte != len(data) or third_byte != count * 2:
+        raise GeneratorProtocolError(
+            f"Response contains {len(data)} data bytes; expected {count * 2}"
+        )
+    return data
+
+
+class ModbusTcpTransport(ModbusTransport):
+    """Native Modbus TCP with pipelined transactions.
+
+    Up to *max_in_flight* requests are sent before their responses are read.
+    Responses are matched by transaction ID, so late answers to a request that
+    already timed out are recognised and discarded.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = MODBUS_TCP_DEFAULT_PORT,
+        timeout: float = 1.0,
+        max_in_flight: int = 4,
+        tcp_keepalive: float = 30.0,
+        arbiter: BusArbiter | None = None,
+    ) -> None:
+        if not 1 <= int(max_in_flight) <= 16:
+            raise ValueError("max_in_flight must be between 1 and 16")
+        self.host = host
+        self.port = int(port)
+        self.timeout = float(timeout)
+        self.max_in_flight = int(max_in_flight)
+        self._tcp_keepalive = max(0.0, float(tcp_keepalive))
+        self._socket: socket.socket | None = None
+        self._buffer = bytearray(MBAP_MAX_RESPONSE_SIZE)
+        self._view = memoryview(self._buffer)
+        # One pipelined batch holds the gateway connection at a time.
+        self.arbiter = (
+            arbiter
+            if arbiter is not None
+            else shared_arbiter(f"{MODBUS_TCP_SCHEME}://{host}:{self.port}")
+        )
+        self._transaction_id = 0
+        self.discarded_responses = 0
+        # Request: MBAP header, function, address, count.  Response: MBAP
+        # header, function, byte count, data.
+        self.transactions = TransactionStatistics(request_size=12, response_overhead=9)
+
+    def open(self) -> bool:
+        self.close()
+        try:
+            connection = socket.create_connection(
+                (self.host, self.port), timeout=self.timeout
+            )
+        except OSError as error:
+            raise GeneratorCommunicationError(
+                f"Could not connect to Modbus TCP gateway {self.host}:{self.port}: {error}"
+            ) from error
+        configure_tcp_socket(connection, self._tcp_keepalive)
+        connection.settimeout(self.timeout)
+        self._socket = connection
+        return True
+
+    def close(self) -> bool:
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            finally:
+                self._socket = None
+        return True
+
+    def is_open(self) -> bool:
+        return self._socket is not None
+
+    def _next_transaction_id(self) -> int:
+        self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+        return self._transaction_id
+
+    def _receive_into(self, target: memoryview, within_adu: bool = False) -> None:
+        """Fill *target*; *within_adu* means the start of the ADU was already read."""
+        size = len(target)
+        received = 0
+        while received < size:
+            try:
+                chunk_size = self._socket.recv_into(target[received:])
+            except socket.timeout:
+                if received or within_adu:
+                    # The rest of this ADU may still arrive; the next read
+                    # would parse from its middle, so drop the connection.
+                    self.close()
+                raise GeneratorTimeoutError(
+                    f"Timed out after receiving {received} of {size} response bytes"
+                ) from None
+            if not chunk_size:
+                self.close()
+                raise GeneratorCommunicationError("Modbus TCP gateway closed the connection")
+            received += chunk_size
+
+    def _receive(self) -> tuple[int, memoryview]:
+        """Receive one ADU and return its transaction ID and the whole ADU."""
+        view = self._view
+        self._receive_into(view[:7])
+        transaction_id, end = check_mbap_header(view)
+        self._receive_into(view[7:end], within_adu=True)
+        return transaction_id, view[:end]
+
+    def transact(
+        self,
+        slave_id: int,
+        function: int,
+        address: int,
+        count: int,
+        decode: Callable[[memoryview], _T],
+    ) -> _T:
+        results: list[_T] = []
+        self.transact_many(
+            slave_id,
+            function,
+            ((address, count),),
+            lambda index, payload: results.append(decode(payload)),
+        )
+        return results[0]
+
+    def transact_many(
+        self,
+        slave_id: int,
+        function: int,
+        requests: Sequence[tuple[int, int]],
+        decode: Callable[[int, memoryview], None],
+    ) -> None:
+        if self._socket is None:
+            raise GeneratorCommunicationError("Modbus TCP connection is not open")
+
+        with self.arbiter.claim():
+            # Request index, address, count and send time by transaction ID.
+            pending: dict[int, tuple[int, int, int, float]] = {}
+            errors: dict[int, GeneratorCommunicationError] = {}
+            next_request = 0
+
+            def send_requests(limit: int) -> None:
+                nonlocal next_request
+                frames = bytearray()
+                while next_request < len(requests) and len(pending) < limit:
+                    address, count = requests[next_request]
+                    transaction_id = self._next_transaction_id()
+                    frames += MBAP_READ_REQUEST.pack(
+                        transaction_id, 0, 6, slave_id, function, address, count
+                    )
+                    pending[transaction_id] = (next_request, address, count, time.monotonic())
+                    next_request += 1
+                if frames:
+                    self._socket.sendall(frames)
+
+            try:
+                send_requests(self.max_in_flight)
+                while pending:
+                    transaction_id, response = self._receive()
+                    request = pending.pop(transaction_id, None)
+                    if request is None:
+                        # Response to a request that already timed out.
+                        self.discarded_responses += 1
+                        continue
+                    index, address, count, sent = request
+                    round_trip = time.monotonic() - sent
+                    try:
+                        data = mbap_response_data(response, slave_id, function, count)
+                    except GeneratorCommunicationError as error:
+                        errors[index] = error
+                        self.transactions.record(
+                            function, address, count, round_trip, error=error
+                        )
+                    else:
+                        decode(index, data)
+                        self.transactions.record(function, address, count, round_trip)
+                    send_requests(self.max_in_flight)
+            except (GeneratorCommunicationError, OSError) as error:
+                # Every outstanding request failed with the connection.
+                now = time.monotonic()
+                for _, address, count, sent in pending.values():
+                    self.transactions.record(function, address, count, now - sent, error=error)
+                raise
+
+        if errors:
+            raise errors[min(errors)]
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "transport": "modbus-tcp",
+            "max_in_flight": self.max_in_flight,
+            "discarded_responses": self.discarded_responses,
+            "bus": self.arbiter.snapshot(),
+        }
+
+
+def create_transport(
+    port: str,
+    baudrate: int = 115200,
+    timeout: float = 1.0,
+    request_delay: float = 0.1,
+    tcp_keepalive: float = 30.0,
+    quiet_period: QuietPeriodTuner | None = None,
+    max_in_flight: int = 4,
+    capture: FrameCapture | None = None,
+    bus_lock_directory: str | None = None,
+) -> ModbusTransport:
+    """Return the transport for a port name or URL.
+
+    ``modbus-tcp://host[:port]`` selects native Modbus TCP; anything else is
+    passed to pyserial and spoken as Modbus RTU.  Only RTU traffic is
+    captured; *capture* is ignored for Modbus TCP.  The transport uses the
+    shared arbiter of *port*, with a lock file in *bus_lock_directory* if set.
+    """
+    arbiter = shared_arbiter(port, bus_lock_directory)
+    if port.startswith(f"{MODBUS_TCP_SCHEME}://"):
+        location = urlsplit(port)
+        if not location.hostname:
+            raise ValueError(f"Modbus TCP URL has no host: {port}")
+        return ModbusTcpTransport(
+            location.hostname,
+            location.port or MODBUS_TCP_DEFAULT_PORT,
+            timeout=timeout,
+            max_in_flight=max_in_flight,
+            tcp_keepalive=tcp_keepalive,
+            arbiter=arbiter,
+        )
+    return RtuTransport(
+        port,
+        baudrate=baudrate,
+        timeout=timeout,
+        request_delay=request_delay,
+        tcp_keepalive=tcp_keepalive,
+        quiet_period=quiet_period,
+        capture=capture,
+        arbiter=arbiter,
+    )
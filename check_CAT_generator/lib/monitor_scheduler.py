@@ -0,0 +1,510 @@
+"""Poll several D300GC generators from one monitor process.
+
+Each generator is described by a ``GeneratorSettings`` entry, read from the
+``[GENERATOR <name>]`` sections of ``check_CAT_generator.cfg``.  Generators
+behind the same Moxa port share one RS-485 bus, so they share one transport:
+its lock serialises their transactions and the quiet period applies across
+them.  Different ports are polled in parallel, one worker thread per port.
+
+``PollScheduler.poll()`` returns the readings of one recording cycle in
+configuration order; ``main.py`` writes them with a single batched insert.
+Slow polling tiers are only read when their interval has elapsed.  A port
+that cannot be connected, and a generator whose circuit breaker is open,
+fail with ``CircuitOpenError`` without waiting for a timeout.
+``PollScheduler.watch()`` reads only the transfer LED and engine state of the
+generators on connected ports, between recording cycles, and
+``PollScheduler.burst()`` reads the raw burst samples of selected generators.
+"""
+
+from __future__ import annotations
+
+import configparser
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Collection
+
+import serial
+
+from alarm_cache import AlarmLayoutCache
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from frame_capture import FrameCapture
+from gencomm_map import TIERS
+from generator_com import D300GC
+from modbus_rtu import GeneratorCommunicationError, ModbusExceptionResponse
+from modbus_transport import ModbusTransport, create_transport
+from quiet_period import QuietPeriodTuner
+from register_archive import RegisterImage
+from retry_policy import RetryPolicy
+
+COMMUNICATION_SECTION = "COMMUNICATION SETTINGS"
+GENERATOR_SECTION_PREFIX = "GENERATOR "
+
+
+@dataclass(frozen=True)
+class GeneratorSettings:
+    """Connection settings of one generator controller."""
+
+    name: str
+    url: str
+    slave_id: int = 10
+    baudrate: int = 115200
+    timeout: float = 1.0
+    request_delay: float = 0.1
+    # Rated real power [kW]; 0 when not configured.
+    rated_power_kw: float = 0.0
+
+
+@dataclass(frozen=True)
+class PollResult:
+    """Outcome of reading one generator in a recording cycle."""
+
+    settings: GeneratorSettings
+    # Decoded columns, or the raw data bytes of a burst sample.
+    data: dict[str, Any] | bytes | None = None
+    error: Exception | None = None
+    read_seconds: float | None = None
+    ts: datetime.datetime | None = None
+    # Raw responses of the readout, when register images are enabled.
+    image: RegisterImage | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def port_url(ip: str, port: int, protocol: str = "RTU") -> str:
+    """Return the transport URL for a Moxa address and protocol name."""
+    if protocol.strip().upper() == "MODBUS_TCP":
+        return f"modbus-tcp://{ip}:{port}"
+    return f"socket://{ip}:{port}"
+
+
+def load_generator_settings(config: configparser.ConfigParser) -> list[GeneratorSettings]:
+    """Read the generators to poll from a parsed configuration.
+
+    Every ``[GENERATOR <name>]`` section defines one generator; keys missing
+    from a section fall back to ``[COMMUNICATION SETTINGS]``.  Without any
+    generator section, a single generator named ``Generator_Type`` is read
+    with the ``[COMMUNICATION SETTINGS]`` values.
+    """
+    sections = [
+        section
+        for section in config.sections()
+        if section.upper().startswith(GENERATOR_SECTION_PREFIX)
+    ]
+    if not sections:
+        sections = [COMMUNICATION_SECTION]
+
+    generators = []
+    for section in sections:
+        def value(key: str, read: Callable[..., Any] = config.get) -> Any:
+            if config.has_option(section, key):
+                return read(section, key)
+            return read(COMMUNICATION_SECTION, key)
+
+        if section == COMMUNICATION_SECTION:
+            name = config.get(COMMUNICATION_SECTION, "Generator_Type").strip()
+        else:
+            name = section[len(GENERATOR_SECTION_PREFIX):].strip()
+        if not name or len(name) > 16:
+            raise ValueError(f"Generator name {name!r} must be 1 to 16 characters long")
+
+        protocol = "RTU"
+        if config.has_option(section, "NPort_Protocol") or config.has_option(
+            COMMUNICATION_SECTION, "NPort_Protocol"
+        ):
+            protocol = value("NPort_Protocol")
+        rated_power_kw = 0.0
+        if config.has_option(section, "Rated_Power_kW") or config.has_option(
+            COMMUNICATION_SECTION, "Rated_Power_kW"
+        ):
+            rated_power_kw = value("Rated_Power_kW", config.getfloat)
+        generators.append(
+            GeneratorSettings(
+                name=name,
+                url=port_url(
+                    value("NPort_IP").strip(), value("NPort_Port", config.getint), protocol
+                ),
+                slave_id=value("Modbus_Address", config.getint),
+                baudrate=value("Serial_Baudrate", config.getint),
+                timeout=value("Serial_Timeout", config.getfloat),
+                request_delay=value("Serial_Request_Delay", config.getfloat),
+                rated_power_kw=rated_power_kw,
+            )
+        )
+
+    names = [generator.name for generator in generators]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate generator names: {', '.join(duplicates)}")
+    return generators
+
+
+class PortPoller:
+    """Read every generator behind one Moxa port over a shared connection.
+
+    The connection stays open across cycles.  It is closed and reopened with
+    exponential backoff when it fails or when no generator on the port
+    answers; a single silent generator does not disconnect its neighbours.
+    """
+
+    def __init__(
+        self,
+        generators: list[GeneratorSettings],
+        tcp_keepalive: float = 30.0,
+        max_in_flight: int = 4,
+        quiet_period: QuietPeriodTuner | None = None,
+        reconnect_delay_min: float = 1.0,
+        reconnect_delay_max: float = 60.0,
+        tier_intervals: dict[str, float] | None = None,
+        alarm_cache: AlarmLayoutCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        partial_results: bool = False,
+        capture: FrameCapture | None = None,
+        bus_lock_directory: str | None = None,
+        circuit_breaker_factory: Callable[[GeneratorSettings], CircuitBreaker | None] | None = None,
+        register_images: bool = False,
+    ) -> None:
+        # Bus settings come from the first generator configured on the port.
+        first = generators[0]
+        self.url = first.url
+        self.transport: ModbusTransport = create_transport(
+            first.url,
+            baudrate=first.baudrate,
+            timeout=first.timeout,
+            request_delay=first.request_delay,
+            tcp_keepalive=tcp_keepalive,
+            quiet_period=quiet_period,
+            max_in_flight=max_in_flight,
+            capture=capture,
+            bus_lock_directory=bus_lock_directory,
+        )
+        self.generators = [
+            (
+                settings,
+                D300GC(
+                    port=settings.url,
+                    slave_id=settings.slave_id,
+                    timeout=settings.timeout,
+                    transport=self.transport,
+                    alarm_cache=alarm_cache,
+                    retry_policy=retry_policy,
+                    partial_results=partial_results,
+                    circuit_breaker=(
+                        circuit_breaker_factory(settings)
+                        if circuit_breaker_factory is not None
+                        else None
+                    ),
+                    register_images=register_images,
+                ),
+            )
+            for settings in generators
+        ]
+        self.reconnect_delay_min = reconnect_delay_min
+        self.reconnect_delay_max = reconnect_delay_max
+        self._reconnect_delay = reconnect_delay_min
+        self._next_connect_attempt = 0.0
+        self.connect_times: list[float] = []
+        # Seconds between reads of each polling tier; tiers not listed are
+        # read every cycle.
+        self.tier_intervals = dict(tier_intervals or {})
+        self._next_tier_read: dict[tuple[str, str], float] = {}
+
+    def _due_tiers(self, name: str, now: float) -> tuple[str, ...]:
+        return tuple(
+            tier for tier in TIERS if now >= self._next_tier_read.get((name, tier), 0.0)
+        )
+
+    def _back_off(self) -> None:
+        self.transport.close()
+        self._next_connect_attempt = time.monotonic() + self._reconnect_delay
+        self._reconnect_delay = min(self.reconnect_delay_max, self._reconnect_delay * 2)
+
+    def _connect(self) -> None:
+        """Open the port; while it cannot be opened, fail with ``CircuitOpenError``."""
+        now = time.monotonic()
+        if now < self._next_connect_attempt:
+            raise CircuitOpenError(
+                f"Reconnecting to {self.url} in "
+                f"{self._next_connect_attempt - now:.1f} seconds"
+            )
+        try:
+            self.transport.open()
+        except (GeneratorCommunicationError, serial.SerialException, OSError) as error:
+            self._back_off()
+            raise CircuitOpenError(f"Connection to {self.url} failed: {error}") from error
+        self.connect_times.append(time.monotonic() - now)
+
+    def poll(self) -> list[PollResult]:
+        """Read all generators on the port, one after the other."""
+        if not self.transport.is_open():
+            try:
+                self._connect()
+            except (GeneratorCommunicationError, serial.SerialException, OSError) as error:
+                return [PollResult(settings, error=error) for settings, _ in self.generators]
+
+        results = []
+        for settings, generator in self.generators:
+            started = time.monotonic()
+            tiers = self._due_tiers(settings.name, started)
+            try:
+                data = generator.read_generator_data(tiers)
+            except (GeneratorCommunicationError, serial.SerialException, OSError) as error:
+                results.append(PollResult(settings, error=error))
+                if not self.transport.is_open():
+                    break
+                continue
+            for tier in tiers:
+                self._next_tier_read[(settings.name, tier)] = (
+                    started + self.tier_intervals.get(tier, 0.0)
+                )
+            results.append(
+                PollResult(
+                    settings,
+                    data=data,
+                    read_seconds=time.monotonic() - started,
+                    image=generator.last_register_image,
+                )
+            )
+
+        # Results missing after a connection loss count as failed as well.
+        for settings, _ in self.generators[len(results):]:
+            results.append(
+                PollResult(settings, error=GeneratorCommunicationError("Connection lost"))
+            )
+        # Generators whose breaker is open were not asked and say nothing
+        # about the port; only real I/O failures close it.
+        asked = [result for result in results if not isinstance(result.error, CircuitOpenError)]
+        transport_failed = bool(asked) and not any(
+            result.ok or isinstance(result.error, ModbusExceptionResponse)
+            for result in asked
+        )
+        if transport_failed or not self.transport.is_open():
+            self._back_off()
+        else:
+            self._reconnect_delay = self.reconnect_delay_min
+        return results
+
+    def _read_each(
+        self,
+        read: Callable[[D300GC], Any],
+        names: Collection[str] | None = None,
+    ) -> list[PollResult]:
+        """Call *read* for the generators on the port, stamped with the time it returned.
+
+        A port that is not connected is left to the next ``poll()``, which
+        reconnects it with backoff.
+        """
+        if not self.transport.is_open():
+            return []
+        results = []
+        for settings, generator in self.generators:
+            if names is not None and settings.name not in names:
+                continue
+            started = time.monotonic()
+            try:
+                data = read(generator)
+            except (GeneratorCommunicationError, serial.SerialException, OSError) as error:
+                results.append(PollResult(settings, error=error))
+                if not self.transport.is_open():
+                    break
+                continue
+            results.append(
+                PollResult(
+                    settings,
+                    data=data,
+                    read_seconds=time.monotonic() - started,
+                    ts=datetime.datetime.now(),
+                )
+            )
+        return results
+
+    def watch(self) -> list[PollResult]:
+        """Read the transfer LED and engine state of every generator on the port."""
+        return self._read_each(D300GC.read_transfer_watch)
+
+    def burst(self, names: Collection[str]) -> list[PollResult]:
+        """Read a raw burst sample of the generators in *names* on the port."""
+        return self._read_each(D300GC.read_burst_sample, names)
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def statistics(self) -> dict[str, Any]:
+        statistics = {
+            "port": self.url,
+            "generators": [settings.name for settings, _ in self.generators],
+        }
+        statistics.update(self.transport.statistics())
+        breakers = {
+            settings.name: generator.circuit_breaker.snapshot()
+            for settings, generator in self.generators
+            if generator.circuit_breaker is not None
+        }
+        if breakers:
+            statistics["circuit_breakers"] = breakers
+        return statistics
+
+    def transaction_statistics(self) -> dict[str, Any]:
+        statistics = {"port": self.url}
+        statistics.update(self.transport.transaction_statistics())
+        return statistics
+
+
+class PollScheduler:
+    """Poll generators on different ports in parallel.
+
+    Args:
+        generators: generators in the order results should be returned.
+        quiet_period_factory: optional callable returning the quiet-period
+            tuner for a ``(url, baudrate)`` pair, or ``None``.
+        tier_intervals: seconds between reads per polling tier, for example
+            ``{"slow": 600}``.  Tiers not listed are read every cycle; rows
+            carry forward the last values of tiers that are not due.
+        alarm_cache: alarm layout cache shared by all generators.
+        retry_policy: repetition of transient transaction failures.
+        partial_results: return rows with the fields that could be read,
+            see ``D300GC.read_generator_data()``.
+        capture_factory: optional callable returning the raw frame capture
+            for a port URL, or ``None``.
+        bus_lock_directory: directory of the per-port lock files shared with
+            other processes, see ``bus_arbiter``.
+        circuit_breaker_factory: optional callable returning the circuit
+            breaker of a generator, or ``None``.
+        register_images: keep the raw responses of every readout in
+            ``PollResult.image``, see ``register_archive``.
+        Remaining arguments are passed to every ``PortPoller``.
+    """
+
+    def __init__(
+        self,
+        generators: list[GeneratorSettings],
+        tcp_keepalive: float = 30.0,
+        max_in_flight: int = 4,
+        quiet_period_factory: Callable[[str, int], QuietPeriodTuner | None] | None = None,
+        reconnect_delay_min: float = 1.0,
+        reconnect_delay_max: float = 60.0,
+        tier_intervals: dict[str, float] | None = None,
+        alarm_cache: AlarmLayoutCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        partial_results: bool = False,
+        capture_factory: Callable[[str], FrameCapture | None] | None = None,
+        bus_lock_directory: str | None = None,
+        circuit_breaker_factory: Callable[[GeneratorSettings], CircuitBreaker | None] | None = None,
+        register_images: bool = False,
+    ) -> None:
+        if not generators:
+            raise ValueError("At least one generator must be configured")
+        self.generators = list(generators)
+        by_port: dict[str, list[GeneratorSettings]] = {}
+        for settings in self.generators:
+            by_port.setdefault(settings.url, []).append(settings)
+        self.pollers = [
+            PortPoller(
+                port_generators,
+                tcp_keepalive=tcp_keepalive,
+                max_in_flight=max_in_flight,
+                quiet_period=(
+                    quiet_period_factory(url, port_generators[0].baudrate)
+                    if quiet_period_factory is not None
+                    else None
+                ),
+                reconnect_delay_min=reconnect_delay_min,
+                reconnect_delay_max=reconnect_delay_max,
+                tier_intervals=tier_intervals,
+                alarm_cache=alarm_cache,
+                retry_policy=retry_policy,
+                partial_results=partial_results,
+                capture=capture_factory(url) if capture_factory is not None else None,
+                bus_lock_directory=bus_lock_directory,
+                circuit_breaker_factory=circuit_breaker_factory,
+                register_images=register_images,
+            )
+            for url, port_generators in by_port.items()
+        ]
+        self._executor = (
+            ThreadPoolExecutor(
+                max_workers=len(self.pollers), thread_name_prefix="generator-port"
+            )
+            if len(self.pollers) > 1
+            else None
+        )
+
+    def poll(self) -> list[PollResult]:
+        """Read every generator once and return the results in configured order."""
+        if self._executor is None:
+            port_results = [poller.poll() for poller in self.pollers]
+        else:
+            port_results = list(self._executor.map(PortPoller.poll, self.pollers))
+        by_name = {
+            result.settings.name: result
+            for results in port_results
+            for result in results
+        }
+        return [by_name[settings.name] for settings in self.generators]
+
+    def watch(self) -> list[PollResult]:
+        """Read the transfer LED and engine state on every connected port.
+
+        Results are in configuration order; generators on disconnected ports
+        are left out.
+        """
+        if self._executor is None:
+            port_results = [poller.watch() for poller in self.pollers]
+        else:
+            port_results = list(self._executor.map(PortPoller.watch, self.pollers))
+        return self._in_order(port_results)
+
+    def _in_order(self, port_results: list[list[PollResult]]) -> list[PollResult]:
+        """Merge per-port results into configuration order, skipping absent generators."""
+        by_name = {
+            result.settings.name: result
+            for results in port_results
+            for result in results
+        }
+        return [
+            by_name[settings.name] for settings in self.generators if settings.name in by_name
+        ]
+
+    def burst(self, names: Collection[str]) -> list[PollResult]:
+        """Read a raw burst sample of the generators in *names*.
+
+        Ports without such a generator are not touched; results are in
+        configuration order, without generators on disconnected ports.
+        """
+        pollers = [
+            poller
+            for poller in self.pollers
+            if any(settings.name in names for settings, _ in poller.generators)
+        ]
+        if self._executor is None or len(pollers) < 2:
+            port_results = [poller.burst(names) for poller in pollers]
+        else:
+            port_results = list(
+                self._executor.map(lambda poller: poller.burst(names), pollers)
+            )
+        return self._in_order(port_results)
+
+    def take_connect_times(self) -> list[float]:
+        """Return and clear the connection setup times since the last call."""
+        connect_times = []
+        for poller in self.pollers:
+            connect_times.extend(poller.connect_times)
+            poller.connect_times.clear()
+        return connect_times
+
+    def close(self) -> None:
+        for poller in self.pollers:
+            poller.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def statistics(self) -> list[dict[str, Any]]:
+        return [poller.statistics() for poller in self.pollers]
+
+    def transaction_statistics(self) -> list[dict[str, Any]]:
+        """Return the Modbus transaction counters and histograms per port."""
+        return [poller.transaction_statistics() for poller in self.pollers]
+
@@ -0,0 +1,84 @@
+"""Cycle timing statistics for the generator monitor loop.
+
+``main.py`` records how long each recording cycle, generator readout, and
+connection setup takes.  Keeping one persistent connection to the Moxa means
+connection setup should appear only after a failure; the snapshot makes that
+visible next to the readout and cycle times.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _summary(samples: deque[float]) -> dict[str, float] | None:
+    if not samples:
+        return None
+    values = list(samples)
+    return {
+        "mean_s": round(sum(values) / len(values), 4),
+        "min_s": round(min(values), 4),
+        "p50_s": round(_percentile(values, 0.5), 4),
+        "p95_s": round(_percentile(values, 0.95), 4),
+        "max_s": round(max(values), 4),
+    }
+
+
+class CycleStatistics:
+    """Collect monitor cycle, readout, and connection timings.
+
+    Totals cover the whole run; the timing summaries cover the most recent
+    *window* samples.
+    """
+
+    def __init__(self, window: int = 1000) -> None:
+        self._cycle_times: deque[float] = deque(maxlen=window)
+        self._read_times: deque[float] = deque(maxlen=window)
+        self._connect_times: deque[float] = deque(maxlen=window)
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.connects = 0
+        self.connect_time_total = 0.0
+
+    def record_connect(self, seconds: float) -> None:
+        """Record the time taken to open the generator connection."""
+        self.connects += 1
+        self.connect_time_total += seconds
+        self._connect_times.append(seconds)
+
+    def record_cycle(
+        self,
+        seconds: float,
+        read_seconds: float | None = None,
+        failed: bool = False,
+    ) -> None:
+        """Record one complete cycle and, if it succeeded, its readout time."""
+        self.cycles += 1
+        self._cycle_times.append(seconds)
+        if failed:
+            self.failed_cycles += 1
+        if read_seconds is not None:
+            self._read_times.append(read_seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serialisable summary of the collected timings."""
+        return {
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            "connects": self.connects,
+            "connect_time_total_s": round(self.connect_time_total, 4),
+            "connect_time_per_cycle_s": (
+                round(self.connect_time_total / self.cycles, 4) if self.cycles else None
+            ),
+            "connect": _summary(self._connect_times),
+            "readout": _summary(self._read_times),
+            "cycle": _summary(self._cycle_times),
+        }
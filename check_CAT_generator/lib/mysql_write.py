@@ -4,8 +4,11 @@ The :class:`MySQL_com` class manages the connection to a MySQL database and
 writes the complete data returned by ``D300GC.read_generator_data()`` into the
 ``hcro_d300gc_generator`` table. Each stored row includes a timestamp and
 generator name together with operating mode, engine status, instrumentation,
-accumulated values, and active alarms. Active alarms are serialized as JSON for
-storage in the table's JSON column.
+accumulated values, and the active alarm count and bitmask. Alarm transitions
+reported by ``AlarmTransitionTracker`` are written to a separate events table
+with ``write_alarm_events()``, the high-rate samples of a burst capture
+to a burst table with ``write_burst_samples()``, and the raw register images
+of the register archive with ``write_register_images()``.
 
 The database connection requires a valid host, username, password, database
 name, and authentication method. Generator readings can be passed to
@@ -13,55 +16,33 @@ name, and authentication method. Generator readings can be passed to
 collected by ``main.py``.
 """
 import datetime
-import json
 import re
 
 import mysql.connector
 #import logging
 
+from derived_metrics import DERIVED_COLUMNS
+from gencomm_map import BURST_DATA_COLUMNS, GENERATOR_DATA_COLUMNS
+
 
 # EMBEDDING Pylontech CLASS ----------------------------------------------------
 
 class MySQL_com():
     """Manage the MySQL connection and write D300GC generator readings."""
 
-    GENERATOR_DATA_COLUMNS = (
-        "communication_status",
-        "overall_status",
-        "control_mode_code",
-        "control_mode",
-        "auto_start_enabled",
-        "transfer_to_generator",
-        "transfer_status",
-        "engine_state_code",
-        "engine_state",
-        "oil_pressure_kpa",
-        "coolant_temperature_c",
-        "oil_temperature_c",
-        "fuel_level_pct",
-        "charge_alternator_voltage_v",
-        "battery_voltage_v",
-        "engine_speed_rpm",
-        "generator_frequency_hz",
-        "generator_l1_n_voltage_v",
-        "generator_l2_n_voltage_v",
-        "generator_l3_n_voltage_v",
-        "generator_l1_current_a",
-        "generator_l2_current_a",
-        "generator_l3_current_a",
-        "generator_total_power_w",
-        "generator_power_factor",
-        "engine_run_time_s",
-        "number_of_starts",
-        "generator_positive_kwh",
-        "active_alarm_count",
-        "active_alarms",
-    )
+    # Derived from the declarative GenComm field table shared with D300GC.
+    GENERATOR_DATA_COLUMNS = GENERATOR_DATA_COLUMNS
+    BURST_DATA_COLUMNS = BURST_DATA_COLUMNS
+    # Written only when every record carries them (see derived_metrics).
+    DERIVED_DATA_COLUMNS = DERIVED_COLUMNS
 
     def __init__(self):
         ''' Constructor for this class. '''
         self._port = 0
         self._generator_table = None
+        self._alarm_event_table = None
+        self._burst_table = None
+        self._register_archive_table = None
 
 
     def __del__(self):
@@ -73,7 +54,7 @@ class MySQL_com():
             # Destructors must never emit errors during interpreter shutdown.
             pass
 
-    def open (self,HOST,USER ,PASSWORD,DATABASE, GENERATOR_TABLE,AUTH_PLUGIN = "mysql_native_password"):
+    def open (self,HOST,USER ,PASSWORD,DATABASE, GENERATOR_TABLE,AUTH_PLUGIN = "mysql_native_password",ALARM_EVENT_TABLE = None,BURST_TABLE = None,REGISTER_ARCHIVE_TABLE = None):
         """Establishing the connection to the mqsql database
 
         Args:
@@ -83,6 +64,9 @@ class MySQL_com():
             DATABASE: specifies the mysql database.
             GENERATOR_TABLE: specifies the mysql table name.
             AUTH_PLUGIN: specifies the login method to the mysql server. Default='mysql_native_password'
+            ALARM_EVENT_TABLE: specifies the mysql table for alarm transition events. Default=None
+            BURST_TABLE: specifies the mysql table for burst capture samples. Default=None
+            REGISTER_ARCHIVE_TABLE: specifies the mysql table for raw register images. Default=None
 
         Returns: Boolean value True or False
 
@@ -91,8 +75,23 @@ class MySQL_com():
             r"[A-Za-z_][A-Za-z0-9_]*", GENERATOR_TABLE
         ):
             raise ValueError("GENERATOR_TABLE must be a valid MySQL identifier")
+        if ALARM_EVENT_TABLE is not None and not re.fullmatch(
+            r"[A-Za-z_][A-Za-z0-9_]*", str(ALARM_EVENT_TABLE)
+        ):
+            raise ValueError("ALARM_EVENT_TABLE must be a valid MySQL identifier")
+        if BURST_TABLE is not None and not re.fullmatch(
+            r"[A-Za-z_][A-Za-z0-9_]*", str(BURST_TABLE)
+        ):
+            raise ValueError("BURST_TABLE must be a valid MySQL identifier")
+        if REGISTER_ARCHIVE_TABLE is not None and not re.fullmatch(
+            r"[A-Za-z_][A-Za-z0-9_]*", str(REGISTER_ARCHIVE_TABLE)
+        ):
+            raise ValueError("REGISTER_ARCHIVE_TABLE must be a valid MySQL identifier")
 
         self._generator_table = GENERATOR_TABLE
+        self._alarm_event_table = ALARM_EVENT_TABLE
+        self._burst_table = BURST_TABLE
+        self._register_archive_table = REGISTER_ARCHIVE_TABLE
         self._port = mysql.connector.connect(user=USER, password=PASSWORD, host=HOST, database=DATABASE, auth_plugin=AUTH_PLUGIN)
         if not self._port.is_connected():
             print("Unable to connect to " + str(HOST))
@@ -129,7 +128,8 @@ class MySQL_com():
         dictionaries collected by ``main.py``. The database timestamp and
         generator name are supplied here because they are not Modbus values.
         A record may optionally contain its own ``ts`` and ``generator`` keys,
-        which take precedence over the method arguments.
+        which take precedence over the method arguments.  Derived metric
+        columns are written when every record contains them.
 
         Returns ``True`` after a successful commit and ``False`` after a MySQL
         error. Invalid input raises ``TypeError`` or ``ValueError`` before any
@@ -153,7 +153,13 @@ class MySQL_com():
         if self._generator_table is None:
             raise RuntimeError("MySQL generator table is not configured")
 
-        columns = ("ts", "generator") + self.GENERATOR_DATA_COLUMNS
+        derived_columns = tuple(
+            column
+            for column in self.DERIVED_DATA_COLUMNS
+            if all(isinstance(record, dict) and column in record for record in records)
+        )
+        data_columns = self.GENERATOR_DATA_COLUMNS + derived_columns
+        columns = ("ts", "generator") + data_columns
         quoted_columns = ", ".join("`{}`".format(column) for column in columns)
         placeholders = ", ".join(["%s"] * len(columns))
         sql = "INSERT INTO `{}` ({}) VALUES ({})".format(
@@ -192,14 +198,9 @@ class MySQL_com():
             if len(record_generator) > 16:
                 raise ValueError("generator must not exceed 16 characters")
 
-            active_alarms = record["active_alarms"]
-            if active_alarms is not None:
-                active_alarms = json.dumps(active_alarms, sort_keys=True)
-
             row = [record_timestamp, record_generator]
-            for column in self.GENERATOR_DATA_COLUMNS:
-                value = active_alarms if column == "active_alarms" else record[column]
-                row.append(value)
+            for column in data_columns:
+                row.append(record[column])
             values.append(tuple(row))
 
         cursor = self._port.cursor()
@@ -214,4 +215,117 @@ class MySQL_com():
         finally:
             cursor.close()
 
+    def write_alarm_events(self, events):
+        """Write alarm transitions returned by ``AlarmTransitionTracker.update()``.
+
+        Returns ``True`` after a successful commit, or when there is nothing
+        to write, and ``False`` after a MySQL error.
+        """
+        events = list(events)
+        if not events:
+            return True
+        if self._port == 0 or not self._port.is_connected():
+            raise RuntimeError("MySQL connection is not open")
+        if self._alarm_event_table is None:
+            raise RuntimeError("MySQL alarm event table is not configured")
+
+        sql = (
+            "INSERT INTO `{}` (`ts`, `generator`, `alarm_index`, `event`, "
+            "`condition_code`, `previous_code`, `alarm_name`, `alarm_condition`) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+        ).format(self._alarm_event_table)
+        values = [
+            (
+                event.ts,
+                event.generator,
+                event.alarm_index,
+                event.event,
+                event.condition_code,
+                event.previous_code,
+                event.alarm_name,
+                event.condition,
+            )
+            for event in events
+        ]
+
+        cursor = self._port.cursor()
+        try:
+            cursor.executemany(sql, values)
+            self._port.commit()
+            return True
+        except mysql.connector.Error as error:
+            self._port.rollback()
+            print("Failed to write alarm events to database: {}".format(error))
+            return False
+        finally:
+            cursor.close()
+
+    def write_burst_samples(self, samples):
+        """Write burst rows returned by ``BurstCapture.take_rows()``.
+
+        Every row holds ``ts``, ``generator`` and the ``BURST_DATA_COLUMNS``.
+        Returns ``True`` after a successful commit, or when there is nothing
+        to write, and ``False`` after a MySQL error.
+        """
+        samples = list(samples)
+        if not samples:
+            return True
+        if self._port == 0 or not self._port.is_connected():
+            raise RuntimeError("MySQL connection is not open")
+        if self._burst_table is None:
+            raise RuntimeError("MySQL burst table is not configured")
+
+        columns = ("ts", "generator") + self.BURST_DATA_COLUMNS
+        sql = "INSERT INTO `{}` ({}) VALUES ({})".format(
+            self._burst_table,
+            ", ".join("`{}`".format(column) for column in columns),
+            ", ".join(["%s"] * len(columns)),
+        )
+        values = [tuple(sample[column] for column in columns) for sample in samples]
 
+        cursor = self._port.cursor()
+        try:
+            cursor.executemany(sql, values)
+            self._port.commit()
+            return True
+        except mysql.connector.Error as error:
+            self._port.rollback()
+            print("Failed to write burst samples to database: {}".format(error))
+            return False
+        finally:
+            cursor.close()
+
+    def write_register_images(self, images):
+        """Write register archive rows of ``ts``, ``generator`` and ``registers``.
+
+        ``registers`` is the blob returned by ``RegisterImage.to_blob()``.
+        Returns ``True`` after a successful commit, or when there is nothing
+        to write, and ``False`` after a MySQL error.
+        """
+        images = list(images)
+        if not images:
+            return True
+        if self._port == 0 or not self._port.is_connected():
+            raise RuntimeError("MySQL connection is not open")
+        if self._register_archive_table is None:
+            raise RuntimeError("MySQL register archive table is not configured")
+
+        columns = ("ts", "generator", "registers")
+        sql = "INSERT INTO `{}` ({}) VALUES ({})".format(
+            self._register_archive_table,
+            ", ".join("`{}`".format(column) for column in columns),
+            ", ".join(["%s"] * len(columns)),
+        )
+        values = [tuple(image[column] for column in columns) for image in images]
+
+        cursor = self._port.cursor()
+        try:
+            cursor.executemany(sql, values)
+            self._port.commit()
+            return True
+        except mysql.connector.Error as error:
+            self._port.rollback()
+            print("Failed to write register images to database: {}".format(error))
+            return False
+        finally:
+            cursor.close()
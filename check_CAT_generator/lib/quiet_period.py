@@ -0,0 +1,177 @@
+"""Self-tuning quiet period between Modbus RTU transactions.
+
+The controller/Moxa path needs a short pause between transactions: sent back
+to back, every second request times out.  The shortest safe pause differs per
+Moxa and baud rate, so a fixed ``Serial_Request_Delay`` is either unsafe or
+wasted time on every request.
+
+``QuietPeriodTuner`` starts at the configured delay and probes downwards after
+a run of successful transactions.  A timeout marks the current delay as unsafe
+and backs off above it; probing never returns to a delay that has timed out
+until a long run of successes lowers that bound again.  The learned delay and
+bound are saved per port so a restarted monitor continues where it left off.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+# Tuners for different ports may run in different threads and share one state
+# file; its read-modify-write cycle must not interleave.
+_STATE_FILE_LOCK = threading.Lock()
+
+
+class QuietPeriodTuner:
+    """Learn the minimum safe delay between transactions on one port.
+
+    Args:
+        port_key: identifies the link in the state file, for example the port
+            URL and baud rate.
+        initial_delay: delay used when no learned value has been saved.
+        minimum_delay / maximum_delay: limits of the learned delay in seconds.
+        state_file: optional JSON file shared by all ports.
+        probe_after: successful transactions before a lower delay is tried.
+        step_down: factor applied to the delay when probing downwards.
+        back_off: factor applied to a delay that timed out.
+        relax_after: successful transactions at the lowest safe delay after
+            which the timeout bound is lowered so probing can resume.
+    """
+
+    def __init__(
+        self,
+        port_key: str,
+        initial_delay: float = 0.1,
+        minimum_delay: float = 0.0,
+        maximum_delay: float = 0.5,
+        state_file: str | os.PathLike[str] | None = None,
+        probe_after: int = 20,
+        step_down: float = 0.8,
+        back_off: float = 2.0,
+        relax_after: int = 1000,
+    ) -> None:
+        if not 0.0 <= minimum_delay <= maximum_delay:
+            raise ValueError("Quiet period limits must satisfy 0 <= minimum <= maximum")
+        if not 0.0 < step_down < 1.0:
+            raise ValueError("step_down must be between 0 and 1")
+        if back_off <= 1.0:
+            raise ValueError("back_off must be greater than 1")
+        self.port_key = port_key
+        self.minimum_delay = float(minimum_delay)
+        self.maximum_delay = float(maximum_delay)
+        self.probe_after = max(1, int(probe_after))
+        self.step_down = float(step_down)
+        self.back_off = float(back_off)
+        self.relax_after = max(self.probe_after, int(relax_after))
+        self._state_file = Path(state_file) if state_file else None
+        self._lock = threading.Lock()
+
+        self.delay = self._clamp(initial_delay)
+        # Highest delay known to have caused a timeout; probing stays above it.
+        self.unsafe_delay: float | None = None
+        self.successes = 0
+        self.timeouts = 0
+        self.probes = 0
+        self._streak = 0
+        self._load()
+
+    def _clamp(self, delay: float) -> float:
+        return min(self.maximum_delay, max(self.minimum_delay, float(delay)))
+
+    def record_success(self) -> None:
+        """Record a completed transaction and probe downwards when due."""
+        with self._lock:
+            self.successes += 1
+            self._streak += 1
+            if self._streak % self.probe_after:
+                return
+            candidate = self.delay * self.step_down
+            # Finish the approach instead of creeping towards the minimum.
+            candidate = self._clamp(
+                self.minimum_delay if candidate < self.minimum_delay + 0.001 else candidate
+            )
+            if candidate < self.delay and (
+                self.unsafe_delay is None or candidate > self.unsafe_delay
+            ):
+                self.delay = candidate
+                self.probes += 1
+                self._save()
+            elif self.unsafe_delay is not None and self._streak >= self.relax_after:
+                # Links change (Moxa firmware, cabling, load); retry below the
+                # old bound after a long stable run.
+                self.unsafe_delay *= self.step_down
+                self._streak = 0
+                self._save()
+
+    def record_timeout(self) -> None:
+        """Record a timed-out transaction and back off above the current delay."""
+        with self._lock:
+            self.timeouts += 1
+            self._streak = 0
+            failed_delay = self.delay
+            if self.unsafe_delay is None or failed_delay > self.unsafe_delay:
+                self.unsafe_delay = failed_delay
+            self.delay = self._clamp(
+                max(failed_delay * self.back_off, failed_delay + 0.01)
+            )
+            self._save()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the learned delay and tuning counters."""
+        with self._lock:
+            return {
+                "port": self.port_key,
+                "delay_s": round(self.delay, 4),
+                "unsafe_delay_s": (
+                    None if self.unsafe_delay is None else round(self.unsafe_delay, 4)
+                ),
+                "successes": self.successes,
+                "timeouts": self.timeouts,
+                "probes": self.probes,
+            }
+
+    def _read_state_file(self) -> dict[str, Any]:
+        if self._state_file is None:
+            return {}
+        try:
+            with self._state_file.open("r", encoding="utf-8") as state:
+                data = json.load(state)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            # A damaged state file must not stop the monitor; relearn instead.
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _load(self) -> None:
+        entry = self._read_state_file().get(self.port_key)
+        if not isinstance(entry, dict):
+            return
+        try:
+            self.delay = self._clamp(entry["delay_s"])
+            unsafe_delay = entry.get("unsafe_delay_s")
+            self.unsafe_delay = None if unsafe_delay is None else float(unsafe_delay)
+        except (KeyError, TypeError, ValueError):
+            return
+
+    def _save(self) -> None:
+        if self._state_file is None:
+            return
+        with _STATE_FILE_LOCK:
+            data = self._read_state_file()
+            data[self.port_key] = {
+                "delay_s": self.delay,
+                "unsafe_delay_s": self.unsafe_delay,
+            }
+            temporary = self._state_file.with_name(self._state_file.name + ".tmp")
+            try:
+                self._state_file.parent.mkdir(parents=True, exist_ok=True)
+                with temporary.open("w", encoding="utf-8") as state:
+                    json.dump(data, state, indent=2, sort_keys=True)
+                os.replace(temporary, self._state_file)
+            except OSError:
+                # Persistence is an optimisation; keep tuning in memory.
+                pass
@@ -0,0 +1,229 @@
+"""Archive of the raw register images of every readout.
+
+A generator row stores about 30 decoded columns, but the GenComm blocks they
+are decoded from hold only a few hundred bytes.  With ``Register_Archive``
+enabled, ``D300GC.read_generator_data()`` keeps a copy of every response of
+the readout as a ``RegisterImage`` and ``main.py`` writes it, one compact
+blob per generator and cycle, to ``SQL_Register_Archive_Table``.  The
+archive is lossless: any field of the blocks read, including fields that are
+not database columns today, can be decoded later without polling again.
+
+    image = RegisterImage.from_blob(row["registers"], ts=row["ts"])
+    image["engine_speed_rpm"]              # decoded now, cached afterwards
+    image["status_flags"]                  # register fields without a column
+    image.value(4, 14, bits=32, scale=0.1) # any offset read, e.g. L1-L2 voltage
+    image.page(8).registers(1, 8)          # raw registers, None where not read
+
+Nothing is decoded when an image is captured or written; a blob read back is
+only unpacked when a value is first accessed.  Registers that the readout
+did not request, for example those of a slow tier that was not due, read as
+``None``.
+
+Blob format, version 1:
+
+    format version (uint8), flags (uint8, bit 0: body compressed with zlib)
+    body: per response, register address (uint16 big-endian, page * 256 +
+          offset), register count (uint8), data bytes (2 per register)
+"""
+
+from __future__ import annotations
+
+import datetime
+import struct
+import zlib
+from typing import Any, Mapping
+
+from gencomm_map import PAGE_SIZE, REGISTER_FIELDS, GenCommField
+from gencomm_snapshot import PAGE_BYTES, MissingRange, PageSnapshot
+
+FORMAT_VERSION = 1
+FLAG_COMPRESSED = 0x01
+
+_HEADER = struct.Struct(">BB")
+_BLOCK = struct.Struct(">HB")
+
+_REGISTER_FIELDS: dict[str, GenCommField] = {field.name: field for field in REGISTER_FIELDS}
+
+
+class RegisterImage:
+    """The raw responses of one readout, decoded on access.
+
+    Args:
+        blocks: data bytes of every response keyed by its register address
+            (``page * 256 + offset``).
+        ts: time of the readout.
+    """
+
+    def __init__(
+        self,
+        blocks: Mapping[int, bytes | bytearray | memoryview],
+        ts: datetime.datetime | None = None,
+    ) -> None:
+        self._blocks: dict[int, bytes] | None = {
+            address: bytes(data) for address, data in blocks.items()
+        }
+        for address, data in self._blocks.items():
+            self._validate_block(address, data)
+        self._blob: bytes | None = None
+        self.ts = ts or datetime.datetime.now()
+        self._pages: dict[int, PageSnapshot] = {}
+
+    @staticmethod
+    def _validate_block(address: int, data: bytes) -> None:
+        count = len(data) // 2
+        if len(data) % 2 or not 0 < count <= 255:
+            raise ValueError(f"Register block at {address} must hold 1 to 255 whole registers")
+        if not 0 <= address <= 0xFFFF or address % PAGE_SIZE + count > PAGE_SIZE:
+            raise ValueError(f"Register block at {address} must lie within one GenComm page")
+
+    @classmethod
+    def from_blob(cls, blob: bytes, ts: datetime.datetime | None = None) -> RegisterImage:
+        """Return the image stored in *blob*; it is unpacked on first access."""
+        blob = bytes(blob)
+        if len(blob) < _HEADER.size:
+            raise ValueError("Register image blob is truncated")
+        version, _ = _HEADER.unpack_from(blob)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported register image format version {version}")
+        image = cls({}, ts)
+        image._blocks = None
+        image._blob = blob
+        return image
+
+    @property
+    def blocks(self) -> dict[int, bytes]:
+        """Data bytes of every response keyed by register address."""
+        if self._blocks is None:
+            self._blocks = self._unpack(self._blob)
+        return self._blocks
+
+    @classmethod
+    def _unpack(cls, blob: bytes) -> dict[int, bytes]:
+        _, flags = _HEADER.unpack_from(blob)
+        body = memoryview(blob)[_HEADER.size :]
+        if flags & FLAG_COMPRESSED:
+            body = memoryview(zlib.decompress(body))
+        blocks: dict[int, bytes] = {}
+        position = 0
+        while position < len(body):
+            if position + _BLOCK.size > len(body):
+                raise ValueError("Register image blob is truncated")
+            address, count = _BLOCK.unpack_from(body, position)
+            position += _BLOCK.size
+            data = bytes(body[position : position + count * 2])
+            if len(data) != count * 2:
+                raise ValueError("Register image blob is truncated")
+            cls._validate_block(address, data)
+            blocks[address] = data
+            position += count * 2
+        return blocks
+
+    def to_blob(self, compress: bool = True) -> bytes:
+        """Return the image in the blob format described in the module docstring.
+
+        With *compress*, the body is compressed if that makes it smaller.
+        """
+        body = b"".join(
+            _BLOCK.pack(address, len(data) // 2) + data for address, data in self.blocks.items()
+        )
+        flags = 0
+        if compress:
+            compressed = zlib.compress(body)
+            if len(compressed) < len(body):
+                body, flags = compressed, FLAG_COMPRESSED
+        return _HEADER.pack(FORMAT_VERSION, flags) + body
+
+    @property
+    def pages(self) -> tuple[int, ...]:
+        """GenComm pages with at least one register in the image."""
+        return tuple(sorted({address // PAGE_SIZE for address in self.blocks}))
+
+    @property
+    def nbytes(self) -> int:
+        """Register data bytes held by the image."""
+        return sum(len(data) for data in self.blocks.values())
+
+    def page(self, page: int) -> PageSnapshot:
+        """Return *page* as a snapshot; registers not read are missing ranges."""
+        try:
+            return self._pages[page]
+        except KeyError:
+            pass
+        data = bytearray(PAGE_BYTES)
+        read = [False] * PAGE_SIZE
+        for address, block in self.blocks.items():
+            if address // PAGE_SIZE != page:
+                continue
+            offset = address % PAGE_SIZE
+            data[offset * 2 : offset * 2 + len(block)] = block
+            read[offset : offset + len(block) // 2] = [True] * (len(block) // 2)
+        missing = []
+        offset = 0
+        while offset < PAGE_SIZE:
+            if read[offset]:
+                offset += 1
+                continue
+            end = offset
+            while end < PAGE_SIZE and not read[end]:
+                end += 1
+            missing.append(MissingRange(offset, end - offset, "not read"))
+            offset = end
+        snapshot = self._pages[page] = PageSnapshot(page, data, missing, self.ts)
+        return snapshot
+
+    def register(self, page: int, offset: int) -> int | None:
+        """Return the raw value of one register, ``None`` if it was not read."""
+        return self.page(page).register(offset)
+
+    def value(
+        self,
+        page: int,
+        offset: int,
+        *,
+        bits: int = 16,
+        signed: bool = False,
+        scale: float = 1.0,
+    ) -> int | float | None:
+        """Decode a value at a page offset, ``None`` for sentinels and registers not read."""
+        return self.page(page).value(offset, bits=bits, signed=signed, scale=scale)
+
+    @staticmethod
+    def _field(name: str) -> GenCommField:
+        try:
+            return _REGISTER_FIELDS[name]
+        except KeyError:
+            raise KeyError(f"{name} is not a GenComm register field") from None
+
+    def __getitem__(self, name: str) -> int | float | None:
+        field = self._field(name)
+        return self.page(field.page)[name]
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether every register of field *name* is in the image."""
+        field = _REGISTER_FIELDS.get(name)  # type: ignore[arg-type]
+        return field is not None and self.page(field.page).is_available(
+            field.offset, field.bits // 16
+        )
+
+    def sentinel(self, name: str) -> str | None:
+        """Return the sentinel reason of field *name*, ``None`` for a valid value."""
+        field = self._field(name)
+        return self.page(field.page).sentinel(name)
+
+    def fields(self) -> dict[str, int | float | None]:
+        """Decode every GenComm register field whose registers were read."""
+        return {name: self[name] for name in _REGISTER_FIELDS if name in self}
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ts": self.ts.isoformat(timespec="milliseconds"),
+            "blocks": [
+                {
+                    "page": address // PAGE_SIZE,
+                    "offset": address % PAGE_SIZE,
+                    "registers": list(struct.unpack(f">{len(data) // 2}H", data)),
+                }
+                for address, data in self.blocks.items()
+            ],
+            "fields": self.fields(),
+        }
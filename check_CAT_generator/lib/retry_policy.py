@@ -0,0 +1,62 @@
+"""Retry policy for transient Modbus transaction failures.
+
+A single lost or corrupted frame on the RS-485 line should not cost a whole
+recording cycle.  ``RetryPolicy`` decides which failures are worth repeating
+and how long to wait first:
+
+* timeouts (``GeneratorTimeoutError``),
+* CRC mismatches (``GeneratorCrcError``),
+* Modbus exception 6, slave device busy.
+
+Other failures, such as an illegal data address or a closed connection, are
+not transient and are raised immediately.  The default policy does not retry.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from modbus_rtu import GeneratorCrcError, GeneratorTimeoutError, ModbusExceptionResponse
+
+MODBUS_SLAVE_DEVICE_BUSY = 6
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how quickly a failed transaction is repeated.
+
+    Args:
+        retries: repetitions after the first attempt of one transaction.
+        backoff: seconds to wait before the first repetition.
+        backoff_factor: multiplier applied to the wait for every further
+            repetition.
+        max_backoff: longest wait between two attempts.
+    """
+
+    retries: int = 0
+    backoff: float = 0.05
+    backoff_factor: float = 2.0
+    max_backoff: float = 1.0
+
+    def __post_init__(self) -> None:
+        if self.retries < 0:
+            raise ValueError("retries must not be negative")
+        if self.backoff < 0 or self.max_backoff < 0:
+            raise ValueError("Retry backoff must not be negative")
+        if self.backoff_factor < 1:
+            raise ValueError("backoff_factor must be at least 1")
+
+    @staticmethod
+    def is_transient(error: BaseException) -> bool:
+        """Return whether repeating the transaction may succeed."""
+        if isinstance(error, ModbusExceptionResponse):
+            return error.code == MODBUS_SLAVE_DEVICE_BUSY
+        return isinstance(error, (GeneratorTimeoutError, GeneratorCrcError))
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """Return whether to repeat after failed attempt number *attempt*."""
+        return attempt <= self.retries and self.is_transient(error)
+
+    def delay(self, attempt: int) -> float:
+        """Return the wait in seconds before repeating failed attempt *attempt*."""
+        return min(self.max_backoff, self.backoff * self.backoff_factor ** (attempt - 1))
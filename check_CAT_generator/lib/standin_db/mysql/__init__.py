@@ -0,0 +1 @@
+"""SQLite stand-in for the ``mysql`` package; see ``mysql.connector``."""
@@ -0,0 +1,107 @@
+"""SQLite stand-in for the parts of ``mysql.connector`` used by this package.
+
+``benchmark_generator_stack.py`` puts the ``standin_db`` directory first on
+the module path so that ``mysql_write.MySQL_com`` and
+``check_CAT_generator.py`` run unchanged against a local SQLite file instead
+of a MySQL server.  Only the statements issued by those two modules are
+supported: ``%s`` placeholders become ``?`` and the row age expression of the
+Nagios plugin is rewritten for SQLite.  Connection options other than the
+database name are ignored; the database file is taken from the environment
+variable named by ``DATABASE_PATH_ENV``.
+
+This is not a MySQL emulation and must not be installed next to the real
+mysql-connector-python package.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import re
+import sqlite3
+from typing import Any, Iterable, Sequence
+
+DATABASE_PATH_ENV = "CHECK_CAT_GENERATOR_STANDIN_DB"
+
+_ROW_AGE = re.compile(
+    r"TIMESTAMPDIFF\(\s*SECOND,\s*(`?\w+`?),\s*CURRENT_TIMESTAMP\(3\)\s*\)",
+    re.IGNORECASE,
+)
+
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" "))
+
+
+class Error(Exception):
+    """Raised for every failed statement, like ``mysql.connector.Error``."""
+
+
+def _translate(query: str) -> str:
+    query = _ROW_AGE.sub(
+        r"CAST(ROUND((julianday('now', 'localtime') - julianday(\1)) * 86400) AS INTEGER)",
+        query,
+    )
+    return query.replace("%s", "?")
+
+
+class Cursor:
+    def __init__(self, connection: sqlite3.Connection, dictionary: bool) -> None:
+        self._cursor = connection.cursor()
+        self._dictionary = dictionary
+
+    def _row(self, row: Sequence[Any] | None) -> Any:
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        try:
+            self._cursor.execute(_translate(query), tuple(params))
+        except sqlite3.Error as error:
+            raise Error(str(error)) from error
+
+    def executemany(self, query: str, seq_params: Iterable[Sequence[Any]]) -> None:
+        try:
+            self._cursor.executemany(_translate(query), [tuple(row) for row in seq_params])
+        except sqlite3.Error as error:
+            raise Error(str(error)) from error
+
+    def fetchone(self) -> Any:
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self) -> list[Any]:
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class Connection:
+    def __init__(self, path: str) -> None:
+        self._connection: sqlite3.Connection | None = sqlite3.connect(path)
+
+    def is_connected(self) -> bool:
+        return self._connection is not None
+
+    def cursor(self, dictionary: bool = False) -> Cursor:
+        if self._connection is None:
+            raise Error("Connection is closed")
+        return Cursor(self._connection, dictionary)
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def connect(**options: Any) -> Connection:
+    """Open the stand-in database named by the environment."""
+    path = os.environ.get(DATABASE_PATH_ENV)
+    if not path:
+        raise Error(f"{DATABASE_PATH_ENV} does not name a stand-in database file")
+    return Connection(path)
@@ -11,6 +11,22 @@ UNAVAILABLE rather than being mistaken for real measurements.
 Example:
 
     python3 test_generator_readout.py --port /dev/ttys001
+
+With --capture the raw RTU frames of the test are written to a capture log,
+and --replay runs the same test against such a log instead of the controller:
+
+    python3 test_generator_readout.py --port /dev/ttys001 --capture readout.gcap
+    python3 test_generator_readout.py --replay readout.gcap
+
+With --dump the script reads every register of the GenComm pages used by the
+monitor (or those given with --pages) in one pass and writes them, with the
+decoded fields, to a JSON file instead of running the readout tests:
+
+    python3 test_generator_readout.py --port /dev/ttys001 --dump site.json
+
+After three failed requests in a row the remaining queries fail at once
+instead of waiting for their timeouts; --circuit-breaker changes the count,
+0 waits for every query.
 """
 
 from __future__ import annotations
@@ -21,10 +37,14 @@ import json
 import sys
 import traceback
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Callable
 
 import serial
 
+from circuit_breaker import CircuitBreaker
+from frame_capture import FrameCapture, ReplayTransport
+from gencomm_map import GENERATOR_FIELDS, PAGE_SIZE
 from generator_com import D300GC, GeneratorCommunicationError
 
 
@@ -40,56 +60,18 @@ class ReadoutTest:
     allow_none: bool = True
 
 
-READOUT_TESTS = (
-    ReadoutTest("read_communication_status", "Communication status", allow_none=False),
-    ReadoutTest("read_overall_status", "Overall status", allow_none=False),
-    ReadoutTest("read_control_mode_code", "Control mode code", minimum=0, maximum=7),
-    ReadoutTest("read_control_mode", "Control mode", allow_none=False),
-    ReadoutTest("read_auto_start_enabled", "Automatic start enabled"),
-    ReadoutTest("read_transfer_to_generator", "Transferred to generator"),
-    ReadoutTest("read_transfer_status", "Transfer status", allow_none=False),
-    ReadoutTest("read_engine_state_code", "Engine state code", minimum=0, maximum=15),
-    ReadoutTest("read_engine_state", "Engine state", allow_none=False),
-    ReadoutTest("read_oil_pressure", "Oil pressure", "kPa", 0, 10000),
-    ReadoutTest("read_coolant_temperature", "Coolant temperature", "deg C", -50, 200),
-    ReadoutTest("read_oil_temperature", "Oil temperature", "deg C", -50, 200),
-    ReadoutTest("read_fuel_level", "Fuel level", "%", 0, 130),
+# One test per read method in the GenComm field table, in table order.
+READOUT_TESTS = tuple(
     ReadoutTest(
-        "read_charge_alternator_voltage",
-        "Charge alternator voltage",
-        "V",
-        0,
-        40,
-    ),
-    ReadoutTest("read_battery_voltage", "Starter battery voltage", "V", 0, 40),
-    ReadoutTest("read_engine_speed", "Engine speed", "RPM", 0, 6000),
-    ReadoutTest("read_generator_frequency", "Generator frequency", "Hz", 0, 70),
-    ReadoutTest("read_generator_l1_n_voltage", "Generator L1-N voltage", "V", 0, 18000),
-    ReadoutTest("read_generator_l2_n_voltage", "Generator L2-N voltage", "V", 0, 18000),
-    ReadoutTest("read_generator_l3_n_voltage", "Generator L3-N voltage", "V", 0, 18000),
-    ReadoutTest("read_generator_l1_current", "Generator L1 current", "A", 0, 99999.9),
-    ReadoutTest("read_generator_l2_current", "Generator L2 current", "A", 0, 99999.9),
-    ReadoutTest("read_generator_l3_current", "Generator L3 current", "A", 0, 99999.9),
-    ReadoutTest(
-        "read_generator_total_power",
-        "Generator total real power",
-        "W",
-        -99999999,
-        99999999,
-    ),
-    ReadoutTest("read_generator_power_factor", "Generator power factor", "", -1, 1),
-    ReadoutTest("read_engine_run_time", "Engine run time", "s", 0, 4294967295),
-    ReadoutTest("read_number_of_starts", "Number of starts", "", 0, 99999),
-    ReadoutTest(
-        "read_generator_positive_kwh",
-        "Generator positive energy",
-        "kWh",
-        0,
-        429496729.5,
-    ),
-    ReadoutTest("read_named_alarm_count", "Implemented named alarms", "", 0, 256),
-    ReadoutTest("read_active_alarms", "Active alarms", allow_none=False),
-    ReadoutTest("read_active_alarm_count", "Active alarm count", "", 0, 256),
+        field.method,
+        field.label,
+        field.unit,
+        field.minimum,
+        field.maximum,
+        field.allow_none,
+    )
+    for field in GENERATOR_FIELDS
+    if field.method is not None
 )
 
 
@@ -132,11 +114,53 @@ def parse_arguments() -> argparse.Namespace:
         default=0.1,
         help="Minimum quiet period between Modbus requests in seconds (default: 0.1)",
     )
+    parser.add_argument(
+        "--per-value",
+        action="store_true",
+        help="Read the combined result with one request per value instead of block reads",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
         help="Print Python tracebacks for failed queries",
     )
+    parser.add_argument(
+        "--dump",
+        metavar="FILE",
+        help="Write whole GenComm pages to a JSON file instead of running the tests",
+    )
+    parser.add_argument(
+        "--pages",
+        type=lambda value: [int(page) for page in value.split(",")],
+        default=list(D300GC.DIAGNOSTIC_PAGES),
+        help="Comma-separated pages for --dump (default: "
+        + ",".join(str(page) for page in D300GC.DIAGNOSTIC_PAGES)
+        + ")",
+    )
+    parser.add_argument(
+        "--bus-lock-directory",
+        default=str(Path(__file__).resolve().parent.parent / "var" / "lock"),
+        help="Directory of the per-port lock files shared with the monitor; "
+        "empty disables them (default: var/lock of this installation)",
+    )
+    parser.add_argument(
+        "--circuit-breaker",
+        type=int,
+        default=3,
+        metavar="N",
+        help="Fail the remaining queries at once after N failed requests in a row; "
+        "0 disables (default: 3)",
+    )
+    parser.add_argument(
+        "--capture",
+        metavar="FILE",
+        help="Write the raw RTU request and response frames to a capture log",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="Answer the requests from a capture log instead of the controller",
+    )
     return parser.parse_args()
 
 
@@ -201,7 +225,12 @@ def test_readout(generator: D300GC, test: ReadoutTest, verbose: bool) -> str:
 def discover_untested_read_methods() -> list[str]:
     """Find newly added no-argument read methods missing from READOUT_TESTS."""
     tested = {test.method for test in READOUT_TESTS}
-    excluded = {"read_register", "read_generator_data"}
+    excluded = {
+        "read_register",
+        "read_generator_data",
+        "read_transfer_watch",
+        "read_burst_sample",
+    }
     methods = []
     for name, method in inspect.getmembers(D300GC, predicate=inspect.isfunction):
         if not name.startswith("read_") or name in tested or name in excluded:
@@ -220,8 +249,35 @@ def discover_untested_read_methods() -> list[str]:
     return methods
 
 
+def dump_pages(generator: D300GC, pages: list[int], path: str) -> int:
+    """Read whole GenComm pages and write them to *path*."""
+    try:
+        snapshot = generator.read_pages(pages)
+    except (serial.SerialException, OSError, GeneratorCommunicationError) as error:
+        print(f"[FAILED     ] Read pages: {type(error).__name__}: {error}")
+        return 2
+    snapshot.write(path)
+    for page in snapshot.pages.values():
+        if page.complete:
+            status = "COMPLETE"
+        elif page.missing_count == PAGE_SIZE:
+            status = "UNAVAILABLE"
+        else:
+            status = "PARTIAL"
+        print(
+            f"[{status:<11}] Page {page.page:3d}: {PAGE_SIZE - page.missing_count} registers, "
+            f"{len(page.field_names)} known fields"
+        )
+    print("-" * 78)
+    print(f"Wrote {len(snapshot.pages)} pages to {path}")
+    return 0
+
+
 def main() -> int:
     args = parse_arguments()
+    capture = FrameCapture(args.capture) if args.capture else None
+    # The test order may differ from the captured run, so replay by request frame.
+    transport = ReplayTransport(args.replay, strict=False) if args.replay else None
     generator = D300GC(
         port=args.port,
         slave_id=args.slave_id,
@@ -229,10 +285,19 @@ def main() -> int:
         timeout=args.timeout,
         alarm_page=args.alarm_page,
         request_delay=args.request_delay,
+        block_read=not args.per_value,
+        transport=transport,
+        capture=capture,
+        bus_lock_directory=args.bus_lock_directory or None,
+        circuit_breaker=(
+            CircuitBreaker(failure_threshold=args.circuit_breaker)
+            if args.circuit_breaker > 0
+            else None
+        ),
     )
 
     print("D300GC generator live readout test")
-    print(f"Port      : {args.port}")
+    print(f"Port      : {args.replay + ' (replay)' if args.replay else args.port}")
     print(f"Slave ID  : {args.slave_id}")
     print(f"Serial    : {args.baudrate},8,N,1")
     print(f"Timeout   : {args.timeout:.2f} seconds")
@@ -245,6 +310,14 @@ def main() -> int:
         print(f"[FAILED     ] Open serial connection: {type(error).__name__}: {error}")
         return 2
 
+    if args.dump:
+        try:
+            return dump_pages(generator, args.pages, args.dump)
+        finally:
+            generator.close()
+            if capture is not None:
+                capture.close()
+
     results: list[str] = []
     try:
         for test in READOUT_TESTS:
@@ -263,6 +336,8 @@ def main() -> int:
             results.append("FAILED")
     finally:
         generator.close()
+        if capture is not None:
+            capture.close()
 
     untested = discover_untested_read_methods()
     if untested:
@@ -0,0 +1,141 @@
+"""Watch the transfer LED and engine state between full readouts.
+
+A full readout every ``Cadance`` seconds finds a utility outage up to a whole
+cycle late.  With ``Watch_Interval`` set, the monitor reads only the transfer
+LED (page 190, offset 19) and the engine state code (page 5, offset 128) of
+every generator in between, at urgent bus priority: two short requests per
+generator instead of a full readout.
+
+``TransferWatcher`` compares every watch and full readout with the previous
+state of the same generator and reports each change as a ``WatchChange``.
+On a change the monitor starts the next full cycle at once, so the new state
+reaches the database within seconds.  With a Nagios external command file
+configured, a change of the transfer state is also submitted as a passive
+result of the emergency-power service through ``NagiosCommandFile``.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+WATCHED_COLUMNS = ("transfer_to_generator", "engine_state_code")
+
+# Nagios plugin return codes used for passive results.
+NAGIOS_OK = 0
+NAGIOS_CRITICAL = 2
+
+
+@dataclass(frozen=True)
+class WatchChange:
+    """A watched column of one generator changed between two readouts."""
+
+    ts: datetime.datetime
+    generator: str
+    column: str
+    previous: Any
+    value: Any
+
+    def as_dict(self) -> dict[str, Any]:
+        change = asdict(self)
+        change["ts"] = self.ts.isoformat(timespec="milliseconds")
+        return change
+
+
+class TransferWatcher:
+    """Keep the last watched values per generator and report their changes.
+
+    A value of ``None`` (a sentinel or a failed field) is not compared; the
+    last known value is kept.  The first readout of a generator only sets its
+    state.
+    """
+
+    def __init__(self) -> None:
+        self._state: dict[str, dict[str, Any]] = {}
+        self.readouts = 0
+        self.changes_seen = 0
+
+    def update(
+        self,
+        generator: str,
+        values: dict[str, Any],
+        ts: datetime.datetime | None = None,
+    ) -> list[WatchChange]:
+        """Record a readout of *generator* and return the columns that changed."""
+        ts = ts or datetime.datetime.now()
+        self.readouts += 1
+        state = self._state.setdefault(generator, {})
+        changes = []
+        for column in WATCHED_COLUMNS:
+            value = values.get(column)
+            if value is None:
+                continue
+            previous = state.get(column)
+            state[column] = value
+            if previous is not None and previous != value:
+                changes.append(WatchChange(ts, generator, column, previous, value))
+        self.changes_seen += len(changes)
+        return changes
+
+    def forget(self, generator: str) -> None:
+        """Drop the state of *generator*."""
+        self._state.pop(generator, None)
+
+    def statistics(self) -> dict[str, int]:
+        return {"readouts": self.readouts, "changes": self.changes_seen}
+
+
+def emergency_power_result(transferred: bool) -> tuple[int, str]:
+    """Return the Nagios status and output of the emergency-power check."""
+    if transferred:
+        return (
+            NAGIOS_CRITICAL,
+            "load is on emergency generator power; utility power outage indicated",
+        )
+    return NAGIOS_OK, "load is not on emergency generator power"
+
+
+class NagiosCommandFile:
+    """Submit passive service results through the Nagios external command file.
+
+    Args:
+        path: the command pipe, for example ``/usr/local/nagios/var/rw/nagios.cmd``.
+        host: Nagios host name of the generators.
+        service: service description; ``{generator}`` is replaced by the
+            generator name.
+    """
+
+    def __init__(self, path: str, host: str, service: str) -> None:
+        self.path = path
+        self.host = host
+        self.service = service
+        self.submitted = 0
+
+    def submit(
+        self,
+        generator: str,
+        status: int,
+        output: str,
+        ts: datetime.datetime | None = None,
+    ) -> None:
+        """Write one ``PROCESS_SERVICE_CHECK_RESULT`` command.
+
+        The pipe is opened without blocking, so a stopped Nagios raises
+        ``OSError`` instead of stalling the monitor.
+        """
+        timestamp = int(ts.timestamp() if ts is not None else time.time())
+        output = output.replace("\n", " ").replace("|", "/")
+        service = self.service.format(generator=generator)
+        command = (
+            f"[{timestamp}] PROCESS_SERVICE_CHECK_RESULT;"
+            f"{self.host};{service};{status};{output}\n"
+        )
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_NONBLOCK)
+        try:
+            os.write(descriptor, command.encode("utf-8"))
+        finally:
+            os.close(descriptor)
+        self.submitted += 1